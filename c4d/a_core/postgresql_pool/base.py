@@ -0,0 +1,205 @@
+"""
+PostgreSQL backend with a process-wide connection pool.
+
+Django 5.0 has no built-in pool for psycopg2, so this wraps the stock backend:
+``get_new_connection`` checks a raw connection out of a bounded pool and
+``_close`` hands it back instead of closing it. Keep ``CONN_MAX_AGE = 0`` so
+Django returns the connection at the end of every request.
+
+Configured through a ``POOL`` entry in the database settings::
+
+    "POOL": {"MAX_SIZE": 10, "TIMEOUT": 5, "MAX_IDLE": 300}
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.db.utils import OperationalError
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    Bounded pool of raw psycopg connections with wait-time metrics.
+    """
+
+    def __init__(self, max_size=10, timeout=5.0, max_idle=300.0):
+        if max_size < 1:
+            raise ImproperlyConfigured("POOL MAX_SIZE must be at least 1.")
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = deque()  # (connection, returned_at)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._stats = {
+            "checkouts": 0,
+            "connections_created": 0,
+            "connections_discarded": 0,
+            "timeouts": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        }
+
+    def getconn(self, connect):
+        """
+        Borrow a connection, opening one with ``connect()`` if none is idle.
+        Waits up to ``timeout`` seconds when all ``max_size`` are in use.
+        """
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeout(
+                f"No database connection available within {self.timeout}s "
+                f"(pool size {self.max_size})."
+            )
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_total"] += waited
+            self._stats["wait_max"] = max(self._stats["wait_max"], waited)
+        if waited > 0.1:
+            logger.warning("Waited %.3fs for a pooled database connection", waited)
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, returned_at = self._idle.pop()
+                if self._usable(connection, returned_at):
+                    return connection
+                self._discard(connection)
+            connection = connect()
+            with self._lock:
+                self._stats["connections_created"] += 1
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, connection):
+        try:
+            if connection.closed or not self._reset(connection):
+                self._discard(connection)
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def _usable(self, connection, returned_at):
+        # Health check: drop closed connections and ones idle long enough to
+        # have been cut by the server or a proxy.
+        if connection.closed:
+            return False
+        return time.monotonic() - returned_at < self.max_idle
+
+    def _reset(self, connection):
+        """
+        Roll back anything left open so the next borrower starts clean.
+        """
+        try:
+            if connection.info.transaction_status != 0:  # not idle
+                connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, connection):
+        with self._lock:
+            self._stats["connections_discarded"] += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+        checkouts = stats["checkouts"] or 1
+        stats["wait_avg"] = stats["wait_total"] / checkouts
+        stats["max_size"] = self.max_size
+        return stats
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _returned_at in idle:
+            self._discard(connection)
+
+
+def get_pool(alias):
+    return _pools.get(alias)
+
+
+def pool_stats():
+    """
+    Metrics for every pool created in this process, keyed by alias.
+    """
+    return {alias: pool.stats() for alias, pool in _pools.items()}
+
+
+def close_pools():
+    """
+    Close every idle pooled connection, e.g. in a preloading master before
+    it forks, so no worker inherits its sockets.
+    """
+    for pool in list(_pools.values()):
+        pool.close_all()
+
+
+def forget_pools():
+    """
+    Drop this process's pools without closing their connections: in a
+    forked child they are the parent's sockets, and closing them would end
+    the parent's sessions. Locks copied mid-use by the fork go too.
+    """
+    global _pools_lock
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+
+    def _get_pool(self):
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None:
+                options = self.settings_dict.get("POOL", {})
+                pool = _pools[self.alias] = ConnectionPool(
+                    max_size=int(options.get("MAX_SIZE", 10)),
+                    timeout=float(options.get("TIMEOUT", 5)),
+                    max_idle=float(options.get("MAX_IDLE", 300)),
+                )
+            return pool
+
+    def get_new_connection(self, conn_params):
+        connection = self._get_pool().getconn(
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)
+        )
+        # The stock method records the isolation level on the wrapper; do the
+        # same when an existing connection is handed out again.
+        self.isolation_level = IsolationLevel(
+            self.settings_dict["OPTIONS"].get("isolation_level", IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            get_pool(self.alias).putconn(self.connection)
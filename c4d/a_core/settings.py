@@ -15,7 +15,82 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATIC_ROOT = os.environ.get('STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+
+# Static asset pipeline (authentication.staticfiles)
+# STATIC_PIPELINE: collectstatic writes content-hashed names plus .gz/.br
+#   variants, and {% static %} links to the hashed names
+# STATIC_SERVE: the app serves STATIC_ROOT itself (StaticFilesMiddleware) with
+#   immutable caching; leave off when a CDN or nginx serves /static/
+STATIC_PIPELINE = os.environ.get('STATIC_PIPELINE', 'False') == 'True'
+STATIC_SERVE = os.environ.get('STATIC_SERVE', str(STATIC_PIPELINE)) == 'True'
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 60))  # seconds, for unhashed names
+STATIC_BROTLI_QUALITY = int(os.environ.get('STATIC_BROTLI_QUALITY', 11))
+# STATIC_INCREMENTAL: collectstatic copies and post-processes only the sources
+#   whose content hash changed since the last run
+# STATIC_PRUNE: an incremental collectstatic also deletes outputs older than
+#   the previous run's (which it keeps for pages rendered before the deploy)
+# STATIC_WORKERS: threads for hashing, copying and compressing (0: one per CPU)
+STATIC_INCREMENTAL = os.environ.get('STATIC_INCREMENTAL', 'False') == 'True'
+STATIC_PRUNE = os.environ.get('STATIC_PRUNE', 'False') == 'True'
+STATIC_WORKERS = int(os.environ.get('STATIC_WORKERS', 0))
+# Tailwind bundles per layout (authentication.tailwind, manage.py build_tailwind)
+# TAILWIND_CLI: standalone binary or command; defaults to `tailwindcss` on
+#   PATH, then the binary at the repository root (kept in Git LFS)
+TAILWIND_CLI = os.environ.get('TAILWIND_CLI', '')
+TAILWIND_INPUT = BASE_DIR / 'static' / 'assets' / 'css' / 'input.css'
+TAILWIND_BUNDLES = ['layouts', '01_layouts', 'account']  # template directories
+# Python files that put Tailwind classes on widgets
+TAILWIND_EXTRA_SOURCES = [BASE_DIR / 'authentication' / 'forms.py']
+TAILWIND_BUNDLE_BUDGET = int(os.environ.get('TAILWIND_BUNDLE_BUDGET', 40 * 1024))  # minified bytes
+TAILWIND_BUILD_ON_COLLECTSTATIC = os.environ.get(
+    'TAILWIND_BUILD_ON_COLLECTSTATIC', str(STATIC_PIPELINE)
+) == 'True'
+# Icon fonts subset to the icons in use (authentication.iconfonts,
+# manage.py build_icon_fonts)
+ICON_FONTS = {
+    'remixicon': 'assets/icon-fonts/RemixIcons/fonts/remixicon.css',
+    'feather': 'assets/icon-fonts/feather/feather.css',
+    'bootstrap-icons': 'assets/icon-fonts/bootstrap-icons/icons/font/bootstrap-icons.css',
+    'tabler-icons': 'assets/icon-fonts/tabler-icons/webfont/tabler-icons.css',
+    'line-awesome': 'assets/icon-fonts/line-awesome/1.3.0/css/line-awesome.css',
+    'boxicons': 'assets/icon-fonts/boxicons/css/boxicons.css',
+}
+# stylesheets that inline the families above (scss/_icons.scss)
+ICON_FONT_STYLESHEETS = ['assets/css/styles.css']
+# files naming icons whose classes are not literal in the templates
+ICON_FONT_EXTRA_SOURCES = []
+ICON_FONT_BUILD_ON_COLLECTSTATIC = os.environ.get(
+    'ICON_FONT_BUILD_ON_COLLECTSTATIC', str(STATIC_PIPELINE)
+) == 'True'
+# Responsive images and video posters (authentication.responsive,
+# manage.py build_responsive_media); directories are relative to static/
+RESPONSIVE_IMAGE_SOURCES = ['assets/images']
+RESPONSIVE_VIDEO_SOURCES = ['assets/video']
+RESPONSIVE_IMAGE_WIDTHS = [320, 640, 960, 1280, 1920]
+RESPONSIVE_IMAGE_FORMATS = ['avif', 'webp']  # best first
+# FFMPEG_BINARY: for poster frames; defaults to `ffmpeg` on PATH
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', '')
+RESPONSIVE_BUILD_ON_COLLECTSTATIC = os.environ.get(
+    'RESPONSIVE_BUILD_ON_COLLECTSTATIC', str(STATIC_PIPELINE)
+) == 'True'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'authentication.staticfiles.CompressedManifestStaticFilesStorage'
+            if STATIC_PIPELINE
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+
+# Uploaded files (resumes, RFQ documents)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
 
 # SECURITY WARNING: keep the secret key used in production secret!
 
@@ -36,6 +111,8 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # before staticfiles so its collectstatic (Tailwind build first) wins
+    'authentication.apps.UsersConfig',
     'django.contrib.staticfiles',
 
     # Django Debug Toolbar 
@@ -44,9 +121,6 @@ INSTALLED_APPS = [
     # Allauth apps for authentication
     'allauth',
     'allauth.account',
-
-    # Our custom app 
-    'authentication.apps.UsersConfig',
 ]
 
 AUTH_USER_MODEL = 'authentication.CustomUser'
@@ -56,10 +130,12 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'authentication.middleware.StaticFilesMiddleware',  # no-op unless STATIC_SERVE
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'authentication.middleware.AccessStateMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
 
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -110,6 +186,71 @@ DATABASES = {
     }
 }
 
+# Connection handling (DB_POOL_MODE):
+#   persistent - keep one connection per worker thread for DB_CONN_MAX_AGE
+#                seconds, health-checked before reuse (default)
+#   pool       - process-wide bounded pool (a_core.postgresql_pool), returned
+#                to the pool at the end of each request
+#   pgbouncer  - connect through PgBouncer in transaction mode: no server-side
+#                cursors, and connections are persistent to the bouncer
+#   none       - a new connection per request
+# Under ASGI use 'pool' or 'none': persistent connections are per thread and
+# async requests do not reuse threads predictably.
+DB_POOL_MODE = os.environ.get('DB_POOL_MODE', 'persistent')
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+if DB_POOL_MODE == 'pool':
+    DATABASES['default']['ENGINE'] = 'a_core.postgresql_pool'
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['POOL'] = {
+        'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+        'MAX_IDLE': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+    }
+elif DB_POOL_MODE == 'pgbouncer':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+elif DB_POOL_MODE == 'none':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+# Cache configuration
+# 'default' holds caches a worker may keep to itself (page fragments, facet
+#   counts, dashboard summaries), all keyed on versions kept in 'shared':
+#   in-process locmem unless CACHE_URL is set.
+# 'shared' holds state every worker must agree on (the job-board version
+#   counter, per-user dashboard versions, profile summaries behind
+#   request.access): CACHE_URL (e.g. redis://redis:6379/1) when set, otherwise
+#   Django's database cache, whose table migration 0012 creates. A locmem
+#   'shared' alias fails the authentication.E001 system check.
+CACHE_URL = os.environ.get('CACHE_URL', '')
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    'shared': env.cache('CACHE_URL') if CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'shared_cache',
+    },
+}
+SHARED_CACHE_ALIAS = 'shared'
+# Seconds a worker reuses the job-board version read from the database cache
+# (no CACHE_URL), so cached pages cost no query; other workers may serve the
+# previous version's pages for that long after a job changes.
+JOB_BOARD_VERSION_LOCAL_TTL = int(os.environ.get('JOB_BOARD_VERSION_LOCAL_TTL', 5))
+
+# Chunked uploads
+# Partial uploads are written under UPLOAD_TEMP_DIR and moved into storage
+# once complete; post-processing runs on the in-process worker pool.
+UPLOAD_TEMP_DIR = os.environ.get('UPLOAD_TEMP_DIR', os.path.join(MEDIA_ROOT, 'tmp'))
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 2 * 1024 * 1024))
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 25 * 1024 * 1024))
+UPLOAD_ALLOWED_EXTENSIONS = {
+    'resume': ['pdf', 'doc', 'docx', 'rtf', 'txt'],
+    'rfq_file': ['pdf', 'doc', 'docx', 'xls', 'xlsx', 'csv', 'txt', 'zip'],
+}
+# Dotted path to a callable(path) -> bool (True when clean); unset skips scanning
+UPLOAD_VIRUS_SCANNER = os.environ.get('UPLOAD_VIRUS_SCANNER', '')
+BACKGROUND_WORKERS = int(os.environ.get('BACKGROUND_WORKERS', 2))
+
 # Password validation settings
 AUTH_PASSWORD_VALIDATORS = [
 
@@ -178,12 +319,95 @@ ACCOUNT_EMAIL_CONFIRMATION_EXPIRE_DAYS = 7
 ACCOUNT_SIGNUP_EMAIL_ENTER_TWICE = False
 
 # Form errors will be presented as messages
-MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
-
-# Email backend for development 
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+# (cookie first, session only for overflow, so flashing a message does not
+# rewrite the session row; home_view never serves a visitor holding the
+# message cookie from its shared page cache)
+MESSAGE_STORAGE = 'django.contrib.messages.storage.fallback.FallbackStorage'
+
+# Sessions
+# cached_db: authentication.session_store (cache in front of the DB, writes
+#   skipped when the data did not change); the cache is the shared alias, so
+#   a logout or key cycle on one worker reaches all of them. The default
+#   when CACHE_URL names a shared cache.
+# signed_cookies: no server-side state at all (sessions cannot be revoked
+#   server-side and must stay under the ~4 KB cookie limit)
+# db: Django's plain database sessions; the default without CACHE_URL
+# A session cache on locmem fails the authentication.E003 system check.
+SESSION_MODE = os.environ.get('SESSION_MODE', 'cached_db' if CACHE_URL else 'db')
+SESSION_ENGINE = {
+    'cached_db': 'authentication.session_store',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'db': 'django.contrib.sessions.backends.db',
+}[SESSION_MODE]
+SESSION_CACHE_ALIAS = SHARED_CACHE_ALIAS
+# re-save an unchanged session at most this often to keep its expiry current
+SESSION_WRITE_REFRESH = int(os.environ.get('SESSION_WRITE_REFRESH', 300))
+
+# MFA one-time passcodes (see authentication.otp), never in the session. They
+# go to the shared cache when there is one (OTP_CACHE_URL, else CACHE_URL);
+# otherwise OTP_STORE defaults to the database so a code issued by one worker
+# verifies on any other. A locmem OTP cache fails authentication.E002.
+OTP_TTL = int(os.environ.get('OTP_TTL', 600))
+OTP_MAX_ATTEMPTS = int(os.environ.get('OTP_MAX_ATTEMPTS', 5))
+OTP_RESEND_INTERVAL = int(os.environ.get('OTP_RESEND_INTERVAL', 60))
+OTP_CACHE_ALIAS = 'shared'
+if os.environ.get('OTP_CACHE_URL'):
+    CACHES['otp'] = env.cache('OTP_CACHE_URL')
+    OTP_CACHE_ALIAS = 'otp'
+OTP_STORE = os.environ.get(
+    'OTP_STORE',
+    '' if OTP_CACHE_ALIAS == 'otp' or CACHE_URL else 'authentication.otp.DatabaseOTPStore',
+)
+
+# Outbound mail
+# Everything is written to the OutboundEmail queue and delivered through
+# EMAIL_DELIVERY_BACKEND (console in development; use
+# django.core.mail.backends.smtp.EmailBackend in production, or
+# django.core.mail.backends.filebased.EmailBackend with EMAIL_FILE_PATH).
+EMAIL_BACKEND = "authentication.mail.QueuedEmailBackend"
+EMAIL_DELIVERY_BACKEND = os.environ.get('EMAIL_DELIVERY_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', os.path.join(BASE_DIR, 'sent_emails'))
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '') == 'True'
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', 10))
+EMAIL_QUEUE_BATCH_SIZE = int(os.environ.get('EMAIL_QUEUE_BATCH_SIZE', 50))
+EMAIL_QUEUE_MAX_ATTEMPTS = int(os.environ.get('EMAIL_QUEUE_MAX_ATTEMPTS', 5))
+EMAIL_QUEUE_RETRY_BASE = int(os.environ.get('EMAIL_QUEUE_RETRY_BASE', 30))  # seconds, doubled per attempt
+EMAIL_RECIPIENT_RATE_LIMIT = int(os.environ.get('EMAIL_RECIPIENT_RATE_LIMIT', 20))
+EMAIL_RECIPIENT_RATE_WINDOW = int(os.environ.get('EMAIL_RECIPIENT_RATE_WINDOW', 3600))
+# Kick delivery on the worker pool when mail is queued; turn off when a
+# dedicated `send_queued_mail --loop` process does the sending
+EMAIL_QUEUE_DELIVER_ON_COMMIT = os.environ.get('EMAIL_QUEUE_DELIVER_ON_COMMIT', 'True') == 'True'
 DEFAULT_FROM_EMAIL = "no-reply@example.com"
 
+# Serve the job-board read paths (home, job list/detail, my applications)
+# from their async views. Worth it only under ASGI; under WSGI every async
+# view would start its own event loop.
+ASYNC_VIEWS = os.environ.get(
+    'ASYNC_VIEWS', str(os.environ.get('SERVER_INTERFACE', 'wsgi') == 'asgi')
+) == 'True'
+
+# Live updates (authentication.realtime), served under ASGI only.
+# InMemoryChannelLayer reaches the connections of one process (development,
+# tests, a single worker); PostgresChannelLayer fans out across workers with
+# LISTEN/NOTIFY. With DB_POOL_MODE=pgbouncer set REALTIME_LISTEN_DSN to a
+# direct PostgreSQL DSN, since LISTEN needs a session-mode connection.
+# REALTIME_ENABLED: publish events at all; off under WSGI, where nothing
+#   listens (turn it on for WSGI workers that share a database with ASGI ones)
+REALTIME_ENABLED = os.environ.get(
+    'REALTIME_ENABLED', str(os.environ.get('SERVER_INTERFACE', 'wsgi') == 'asgi')
+) == 'True'
+REALTIME_CHANNEL_LAYER = os.environ.get(
+    'REALTIME_CHANNEL_LAYER', 'authentication.realtime.PostgresChannelLayer'
+)
+REALTIME_LISTEN_DSN = os.environ.get('REALTIME_LISTEN_DSN', '')
+REALTIME_KEEPALIVE = int(os.environ.get('REALTIME_KEEPALIVE', 20))  # seconds between SSE comments
+REALTIME_QUEUE_SIZE = int(os.environ.get('REALTIME_QUEUE_SIZE', 100))  # events buffered per connection
+REALTIME_WEBSOCKET_PATH = '/auth/ws/events/'
+
 # Authentication backends used by Django Allauth
 AUTHENTICATION_BACKENDS = [
     'allauth.account.auth_backends.AuthenticationBackend',
@@ -16,9 +16,11 @@ Including another URLconf
 """
 
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from authentication.views import home_view
+from authentication.urls import home_view  # sync or async, see ASYNC_VIEWS
 from django.views.generic import TemplateView
 
 
@@ -38,3 +40,7 @@ urlpatterns = [
          TemplateView.as_view(template_name='dashboard.html'),
          name='dashboard'),
 ]
+
+# Serve uploaded media from the dev server only
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,145 @@
+"""
+Request-scoped access state: who the user is, whether they passed MFA and
+whether onboarding is done, plus the profile fields the page header needs.
+
+``AccessStateMiddleware`` attaches it lazily as ``request.access`` so it is
+resolved at most once per request. The profile part is read through the
+shared cache and dropped whenever the ``Profile`` (or its user) is saved.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import redirect
+
+from .caching import shared_cache
+from .models import Profile
+
+ACCESS_CACHE_TIMEOUT = getattr(settings, "ACCESS_STATE_CACHE_TIMEOUT", 300)
+
+# skill_level only while the model has it (migration 0004 dropped the column)
+PROFILE_SUMMARY_FIELDS = tuple(
+    name
+    for name in ("first_name", "middle_name", "last_name", "onboarding_completed", "skill_level")
+    if any(field.name == name for field in Profile._meta.concrete_fields)
+)
+
+
+def profile_summary_key(user_id) -> str:
+    return f"profile-summary:{user_id}"
+
+
+def invalidate_profile_summary(user_id) -> None:
+    shared_cache().delete(profile_summary_key(user_id))
+
+
+def load_profile_summary(user_id) -> dict | None:
+    """
+    Header/onboarding fields of the user's profile, read through the shared
+    cache. ``None`` means the user has no profile yet.
+    """
+    key = profile_summary_key(user_id)
+    cache = shared_cache()
+    summary = cache.get(key)
+    if summary is None:
+        row = Profile.objects.filter(user_id=user_id).values(*PROFILE_SUMMARY_FIELDS).first()
+        summary = {"exists": row is not None, **(row or {})}
+        cache.set(key, summary, ACCESS_CACHE_TIMEOUT)
+    return summary if summary["exists"] else None
+
+
+@dataclass(frozen=True)
+class AccessState:
+    is_authenticated: bool = False
+    user_id: str | None = None
+    is_staff: bool = False
+    mfa_confirmed: bool = False
+    has_profile: bool = False
+    onboarding_completed: bool = False
+    first_name: str = ""
+    middle_name: str = ""
+    last_name: str = ""
+    skill_level: str = ""
+
+    @property
+    def display_name(self) -> str:
+        middle = f"{self.middle_name[0]}. " if self.middle_name else ""
+        return f"{self.first_name} {middle}{self.last_name}".strip()
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "display_name": self.display_name}
+
+
+ANONYMOUS = AccessState()
+
+
+def resolve_access_state(request) -> AccessState:
+    user = request.user
+    if not user.is_authenticated:
+        return ANONYMOUS
+    summary = load_profile_summary(user.pk) or {}
+    return AccessState(
+        is_authenticated=True,
+        user_id=str(user.pk),
+        is_staff=user.is_staff,
+        mfa_confirmed=bool(request.session.get("mfa_confirmed", False)),
+        has_profile=bool(summary),
+        onboarding_completed=summary.get("onboarding_completed", False),
+        first_name=summary.get("first_name") or "",
+        middle_name=summary.get("middle_name") or "",
+        last_name=summary.get("last_name") or "",
+        skill_level=summary.get("skill_level") or "",
+    )
+
+
+def get_access_state(request) -> AccessState:
+    """
+    ``request.access``, resolving it here when the middleware is not installed.
+    """
+    state = getattr(request, "access", None)
+    if state is None:
+        state = request.access = resolve_access_state(request)
+    return state
+
+
+def mfa_required(view_func):
+    """
+    Send users who have not completed MFA for this session to ``mfa_setup``.
+    Use under ``login_required`` (``async_login_required`` for async views).
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped(request, *args, **kwargs):
+            # session and profile reads are sync-only; request.access is
+            # lazy, so read the flag in the thread too
+            confirmed = await sync_to_async(lambda: get_access_state(request).mfa_confirmed)()
+            if not confirmed:
+                return redirect("mfa_setup")
+            return await view_func(request, *args, **kwargs)
+        return _wrapped
+
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        if not get_access_state(request).mfa_confirmed:
+            return redirect("mfa_setup")
+        return view_func(request, *args, **kwargs)
+    return _wrapped
+
+
+def async_login_required(view_func):
+    """
+    ``login_required`` for async views (Django 5.0's only wraps sync ones).
+    """
+    @wraps(view_func)
+    async def _wrapped(request, *args, **kwargs):
+        # resolve request.user itself (not request.auser()) so templates
+        # rendered later reuse the same lookup
+        if not await sync_to_async(lambda: request.user.is_authenticated)():
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return _wrapped
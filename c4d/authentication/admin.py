@@ -1,11 +1,22 @@
 from django import forms
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.db.models import Count
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.admin.widgets import AdminDateWidget
 from django.utils.translation import gettext_lazy as _
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import CustomUser, Profile, Job, JobApplication, Rfqt, Message
+from .models import CustomUser, Profile, Job, JobApplication, Rfqt, Message, StoredFile, OutboundEmail
 from .forms import CustomUserChangeForm
+from .caching import bump_job_board_version
+from .querybudget import QueryBudgetAdminMixin
+from .exports import export_response
+from .tasks import run_in_background
 
 
 # ──────── customize the admin date widget to use a UK locale ────────
@@ -140,8 +151,14 @@ class JobInline(admin.TabularInline):
     fields = ('title', 'location', 'job_type', 'salary', 'is_active')
 
 
+class RfqtImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV or XLSX; columns are RFQT field names plus job_* columns.")
+    dry_run = forms.BooleanField(required=False, help_text="Validate only, write nothing.")
+
+
 @admin.register(Rfqt)
 class RfqtAdmin(admin.ModelAdmin):
+    change_list_template = "admin/authentication/rfqt/change_list.html"
     list_display = ('rfqts_no', 'task_title', 'department', 'closing_date_for_quotation')
     search_fields = ('rfqts_no', 'task_title', 'department')
     list_filter = ('department', 'rfqts_type')
@@ -170,6 +187,43 @@ class RfqtAdmin(admin.ModelAdmin):
     )
     inlines = [JobInline]
 
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_view), name='authentication_rfqt_import'),
+        ]
+        return urls + super().get_urls()
+
+    def import_view(self, request):
+        """
+        Upload a spreadsheet and run it through the bulk importer. Django
+        spools large uploads to a temp file, which is read row by row.
+        """
+        from .importer import ImportFormatError, detect_format, import_rfqts
+
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = RfqtImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                result = import_rfqts(upload, detect_format(upload.name), dry_run=form.cleaned_data['dry_run'])
+            except ImportFormatError as exc:
+                form.add_error('file', str(exc))
+            else:
+                level = messages.WARNING if result.errors else messages.SUCCESS
+                prefix = "[dry run] " if form.cleaned_data['dry_run'] else ""
+                self.message_user(request, prefix + result.summary(), level)
+                for error in result.errors[:20]:
+                    self.message_user(request, str(error), messages.ERROR)
+                return redirect('admin:authentication_rfqt_changelist')
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'form': form,
+            'title': 'Import RFQTs',
+        }
+        return TemplateResponse(request, 'admin/authentication/rfqt/import.html', context)
+
 
 class JobApplicationInline(admin.TabularInline):
     model = JobApplication
@@ -179,7 +233,8 @@ class JobApplicationInline(admin.TabularInline):
 
 
 @admin.register(Job)
-class JobAdmin(admin.ModelAdmin):
+class JobAdmin(QueryBudgetAdminMixin, admin.ModelAdmin):
+    changelist_query_budget = 12
     list_display = ('title', 'location', 'job_type', 'clearance', 'salary', 'is_active', 'application_count')
     list_filter = ('is_active', 'job_type', 'location', 'clearance')
     search_fields = ('title', 'description', 'short_description')
@@ -201,28 +256,38 @@ class JobAdmin(admin.ModelAdmin):
     )
     inlines = [JobApplicationInline]
     
+    def get_queryset(self, request):
+        # one grouped query instead of a COUNT per row
+        return super().get_queryset(request).annotate(_application_count=Count('applications'))
+    
     def application_count(self, obj):
-        count = obj.applications.count()
+        count = obj._application_count
         return format_html('<a href="/admin/applications/?job__id__exact={}">{} application(s)</a>', obj.id, count)
     
     application_count.short_description = "Applications"
+    application_count.admin_order_field = "_application_count"
     
     def mark_active(self, request, queryset):
         queryset.update(is_active=True)
+        bump_job_board_version()  # update() skips the post_save signal
     
     def mark_inactive(self, request, queryset):
         queryset.update(is_active=False)
+        bump_job_board_version()
     
     mark_active.short_description = "Mark selected jobs as active"
     mark_inactive.short_description = "Mark selected jobs as inactive"
 
 
 @admin.register(JobApplication)
-class JobApplicationAdmin(admin.ModelAdmin):
+class JobApplicationAdmin(QueryBudgetAdminMixin, admin.ModelAdmin):
+    changelist_query_budget = 12
     list_display = ('full_name', 'job_title', 'current_clearance', 'location_of_residence', 'submission_date', 'status')
+    list_select_related = ('job',)
     list_filter = ('status', 'current_clearance', 'job__title')
     search_fields = ('full_name', 'user__email', 'job__title')
     readonly_fields = ('submission_date',)
+    actions = ['export_csv', 'export_json']
     fieldsets = (
         ('Application Info', {
             'fields': ('job', 'user', 'status', 'submission_date')
@@ -247,10 +312,21 @@ class JobApplicationAdmin(admin.ModelAdmin):
     job_title.short_description = "Job"
     job_title.admin_order_field = "job__title"
 
+    def export_csv(self, request, queryset):
+        return export_response(queryset, 'csv', asynchronous=isinstance(request, ASGIRequest))
+
+    def export_json(self, request, queryset):
+        return export_response(queryset, 'json', asynchronous=isinstance(request, ASGIRequest))
+
+    export_csv.short_description = "Export selected applications (CSV)"
+    export_json.short_description = "Export selected applications (JSON)"
+
 
 @admin.register(Message)
-class MessageAdmin(admin.ModelAdmin):
+class MessageAdmin(QueryBudgetAdminMixin, admin.ModelAdmin):
+    changelist_query_budget = 12
     list_display = ('sender', 'recipient', 'job_reference', 'timestamp', 'is_read')
+    list_select_related = ('sender', 'recipient', 'job')
     list_filter = ('is_read', 'timestamp')
     search_fields = ('content', 'sender__email', 'recipient__email')
     readonly_fields = ('timestamp',)
@@ -260,4 +336,46 @@ class MessageAdmin(admin.ModelAdmin):
             return obj.job.title
         return "General"
     
-    job_reference.short_description = "Related Job"
\ No newline at end of file
+    job_reference.short_description = "Related Job"
+
+
+@admin.register(StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = ('original_name', 'content_type', 'size', 'scan_status', 'processing_status', 'created')
+    list_filter = ('scan_status', 'processing_status', 'content_type')
+    search_fields = ('original_name', 'sha256')
+    readonly_fields = ('sha256', 'size', 'created', 'processing_error', 'extracted_text')
+    actions = ['reprocess']
+
+    def reprocess(self, request, queryset):
+        from .uploads import process_stored_file
+
+        ids = list(queryset.values_list('pk', flat=True))
+        StoredFile.objects.filter(pk__in=ids).update(processing_status='pending')
+        for pk in ids:
+            run_in_background(process_stored_file, pk)
+        self.message_user(request, f"{len(ids)} file(s) queued for processing.")
+
+    reprocess.short_description = "Re-run scan / text extraction"
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient', 'subject')
+    readonly_fields = ('created', 'sent_at', 'claimed_at', 'last_error')
+    # codes and reset links; see authentication.mail
+    exclude = ('body', 'alternatives', 'attachments')
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        from .mail import deliver_queued
+
+        updated = queryset.exclude(status='sent').update(
+            status='queued', attempts=0, next_attempt_at=timezone.now(), claimed_at=None
+        )
+        run_in_background(deliver_queued)
+        self.message_user(request, f"{updated} message(s) queued for delivery.")
+
+    retry_now.short_description = "Retry delivery now"
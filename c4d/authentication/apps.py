@@ -5,4 +5,5 @@ class UsersConfig(AppConfig):
     name = 'authentication'
 
     def ready(self):
+        import authentication.checks  # noqa: F401
         import authentication.signals 
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Shared cache helpers.
+
+Cached job-board data is keyed on a version that is replaced whenever a
+``Job`` is written, so invalidation is a single write instead of a scan for
+stale keys. The version lives in the ``shared`` cache (``SHARED_CACHE_ALIAS``:
+``CACHE_URL`` or the database cache) so a bump on one worker invalidates
+every worker's copies; the entries themselves stay in the default cache.
+
+A bump stores a fresh value (the clock in nanoseconds) rather than ``incr``,
+which the database cache implements as a read then a write: two concurrent
+bumps both change the version, and a version lost to eviction never comes
+back as a value that old entries were keyed on.
+
+When the shared cache is the database cache, each worker keeps its own copy
+of the version for ``JOB_BOARD_VERSION_LOCAL_TTL`` seconds, so cached pages
+are served without a query. The trade-off: after a job is written, the other
+workers may keep serving the previous version's pages for up to that long.
+With ``CACHE_URL`` set, every read goes to the shared cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.db import DatabaseCache
+
+JOB_BOARD_VERSION_KEY = "job-board:version"
+JOB_BOARD_VERSION_LOCAL_TTL = getattr(settings, "JOB_BOARD_VERSION_LOCAL_TTL", 5)
+
+# (version, monotonic expiry) while the shared cache is the database cache
+_local_version: tuple[int, float] | None = None
+
+
+def shared_cache():
+    """
+    The cache for state all workers must agree on.
+    """
+    return caches[getattr(settings, "SHARED_CACHE_ALIAS", DEFAULT_CACHE_ALIAS)]
+
+
+def _cached_locally() -> int | None:
+    if _local_version is not None and _local_version[1] > time.monotonic():
+        return _local_version[0]
+    return None
+
+
+def _remember(version: int) -> int:
+    global _local_version
+    if JOB_BOARD_VERSION_LOCAL_TTL and isinstance(shared_cache(), DatabaseCache):
+        _local_version = (version, time.monotonic() + JOB_BOARD_VERSION_LOCAL_TTL)
+    return version
+
+
+def job_board_version() -> int:
+    """
+    Current job-board version, initialised on first use.
+    """
+    version = _cached_locally()
+    if version is not None:
+        return version
+    shared = shared_cache()
+    version = shared.get(JOB_BOARD_VERSION_KEY)
+    if version is None:
+        shared.add(JOB_BOARD_VERSION_KEY, time.time_ns(), timeout=None)
+        version = shared.get(JOB_BOARD_VERSION_KEY, 0)
+    return _remember(version)
+
+
+async def ajob_board_version() -> int:
+    """
+    ``job_board_version`` for async callers.
+    """
+    version = _cached_locally()
+    if version is not None:
+        return version
+    shared = shared_cache()
+    version = await shared.aget(JOB_BOARD_VERSION_KEY)
+    if version is None:
+        await shared.aadd(JOB_BOARD_VERSION_KEY, time.time_ns(), timeout=None)
+        version = await shared.aget(JOB_BOARD_VERSION_KEY, 0)
+    return _remember(version)
+
+
+def bump_job_board_version() -> None:
+    """
+    Invalidate every cache entry derived from job listings.
+    """
+    version = time.time_ns()
+    shared_cache().set(JOB_BOARD_VERSION_KEY, version, timeout=None)
+    # this worker sees its own write at once
+    _remember(version)
+
+
+def forget_job_board_version() -> None:
+    """
+    Drop this worker's copy of the version (tests, after clearing caches).
+    """
+    global _local_version
+    _local_version = None
+
+
+def make_key(prefix: str, *parts, version: int | None = None) -> str:
+    """
+    Build a cache key from ``prefix``, a version and arbitrary JSON-able parts.
+    """
+    digest = hashlib.md5(
+        json.dumps(parts, sort_keys=True, default=str).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    if version is None:
+        return f"{prefix}:{digest}"
+    return f"{prefix}:v{version}:{digest}"
+
+
+def get_or_build(key: str, builder, timeout: int, *, lock_timeout: int = 30, wait: float = 2.0):
+    """
+    ``cache.get_or_set`` with stampede protection.
+
+    Entries carry a soft expiry and are kept for twice ``timeout``. Once the
+    soft expiry passes, one caller takes a short lock and rebuilds while the
+    others keep serving the stale copy. A brand-new key (e.g. after a version
+    bump) has no stale copy, so other callers poll briefly for the builder's
+    result before building it themselves.
+    """
+    now = time.time()
+    entry = cache.get(key)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            value = builder()
+            cache.set(key, (time.time() + timeout, value), timeout * 2)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry[1]
+
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[1]
+    return builder()
+
+
+async def aget_or_build(key: str, builder, timeout: int, **kwargs):
+    """
+    ``get_or_build`` for async callers: a fresh entry is served straight
+    from the async cache API; anything else (rebuild, lock, wait) runs in
+    a thread. ``builder`` is a sync callable.
+    """
+    entry = await cache.aget(key)
+    if entry is not None and entry[0] > time.time():
+        return entry[1]
+    return await sync_to_async(get_or_build)(key, builder, timeout, **kwargs)
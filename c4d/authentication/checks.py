@@ -0,0 +1,64 @@
+"""
+System checks for settings that only hold up with a single worker process.
+
+The prod profile runs several gunicorn workers, each with its own locmem
+cache, so anything that has to be seen by every worker must not live in one.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, register
+
+LOCMEM_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+# session engines that read sessions from SESSION_CACHE_ALIAS
+CACHED_SESSION_ENGINES = {
+    "authentication.session_store",
+    "django.contrib.sessions.backends.cache",
+    "django.contrib.sessions.backends.cached_db",
+}
+
+
+def _process_local(alias: str) -> bool:
+    return settings.CACHES.get(alias, {}).get("BACKEND") == LOCMEM_BACKEND
+
+
+@register()
+def check_shared_caches(app_configs, **kwargs):
+    errors = []
+    alias = getattr(settings, "SHARED_CACHE_ALIAS", "default")
+    if _process_local(alias):
+        errors.append(Error(
+            f"The shared cache ('{alias}') is a per-process locmem cache.",
+            hint="Job-board invalidation would only reach one worker. Set CACHE_URL to a "
+                 "shared backend (Redis, memcached) or use the database cache.",
+            id="authentication.E001",
+        ))
+    return errors
+
+
+@register()
+def check_otp_store(app_configs, **kwargs):
+    errors = []
+    alias = getattr(settings, "OTP_CACHE_ALIAS", "default")
+    if not getattr(settings, "OTP_STORE", "") and _process_local(alias):
+        errors.append(Error(
+            f"MFA codes are kept in a per-process locmem cache ('{alias}').",
+            hint="A code issued by one worker would be missing on the worker that verifies it. "
+                 "Set OTP_CACHE_URL or CACHE_URL to a shared backend, or "
+                 "OTP_STORE='authentication.otp.DatabaseOTPStore'.",
+            id="authentication.E002",
+        ))
+    return errors
+
+
+@register()
+def check_session_cache(app_configs, **kwargs):
+    errors = []
+    alias = settings.SESSION_CACHE_ALIAS
+    if settings.SESSION_ENGINE in CACHED_SESSION_ENGINES and _process_local(alias):
+        errors.append(Error(
+            f"Sessions are cached in a per-process locmem cache ('{alias}').",
+            hint="A logout, flush or key cycle on one worker would leave the session valid on the "
+                 "others. Set CACHE_URL to a shared backend or SESSION_MODE=db.",
+            id="authentication.E003",
+        ))
+    return errors
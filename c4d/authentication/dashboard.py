@@ -0,0 +1,146 @@
+"""
+Dashboard data service.
+
+Everything the dashboard summary shows comes from a fixed number of
+aggregate queries, whatever the number of jobs or applications, and is
+cached per user in each worker's cache. The key includes the job-board
+version (job counts) and a per-user version kept in the shared cache, which
+is replaced when the user's applications or messages change, so a change
+handled by one worker invalidates every worker's copy.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .caching import job_board_version, shared_cache
+from .models import Job, JobApplication, Message, UnreadMessageCounter
+
+DASHBOARD_CACHE_TIMEOUT = getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 300)
+RECENT_ACTIVITY_LIMIT = 5
+
+
+def _version_key(user_id) -> str:
+    return f"dashboard-version:{user_id}"
+
+
+def _user_version(user_id) -> int:
+    shared = shared_cache()
+    key = _version_key(user_id)
+    version = shared.get(key)
+    if version is None:
+        # a fresh value, never one an evicted key may have had
+        shared.add(key, time.time_ns(), DASHBOARD_CACHE_TIMEOUT)
+        version = shared.get(key, 0)
+    return version
+
+
+def dashboard_cache_key(user_id) -> str:
+    return f"dashboard:{user_id}:v{job_board_version()}:u{_user_version(user_id)}"
+
+
+def invalidate_dashboard(user_id) -> None:
+    # a new value rather than incr: no read-modify-write to race
+    shared_cache().set(_version_key(user_id), time.time_ns(), DASHBOARD_CACHE_TIMEOUT)
+
+
+def _job_counts() -> dict:
+    return Job.objects.aggregate(
+        total=Count("pk"),
+        active=Count("pk", filter=Q(is_active=True)),
+    )
+
+
+def _application_counts(user) -> dict:
+    counts = {status: 0 for status, _label in JobApplication.APPLICATION_STATUS}
+    rows = (
+        JobApplication.objects
+        .filter(user=user)
+        .order_by()
+        .values_list("status")
+        .annotate(total=Count("pk"))
+    )
+    for status, total in rows:
+        counts[status] = total
+    return counts
+
+
+def _recent_applications(user) -> list[dict]:
+    rows = (
+        JobApplication.objects
+        .filter(user=user)
+        .order_by("-submission_date", "-id")
+        .values("id", "status", "submission_date", "job_id", "job__title")
+        [:RECENT_ACTIVITY_LIMIT]
+    )
+    return [
+        {
+            "id": row["id"],
+            "status": row["status"],
+            "submitted": row["submission_date"].isoformat(),
+            "job_id": row["job_id"],
+            "job_title": row["job__title"],
+        }
+        for row in rows
+    ]
+
+
+def _recent_messages(user) -> list[dict]:
+    rows = (
+        Message.objects
+        .filter(recipient=user)
+        .order_by("-timestamp", "-id")
+        .values("id", "is_read", "timestamp", "application_id", "sender__email", "job__title")
+        [:RECENT_ACTIVITY_LIMIT]
+    )
+    return [
+        {
+            "id": row["id"],
+            "is_read": row["is_read"],
+            "sent": row["timestamp"].isoformat(),
+            "application_id": row["application_id"],
+            "sender": row["sender__email"],
+            "job_title": row["job__title"] or "General",
+        }
+        for row in rows
+    ]
+
+
+def _unread_messages(user) -> int:
+    unread = UnreadMessageCounter.objects.filter(user=user).values_list("unread", flat=True).first()
+    if unread is None:
+        unread = Message.objects.filter(recipient=user, is_read=False).count()
+    return unread
+
+
+def build_dashboard_summary(user) -> dict:
+    """
+    Uncached summary: five queries in total.
+    """
+    applications = _application_counts(user)
+    return {
+        "jobs": _job_counts(),
+        "applications": {
+            "total": sum(applications.values()),
+            "by_status": applications,
+        },
+        "recent_applications": _recent_applications(user),
+        "recent_messages": _recent_messages(user),
+        "unread_messages": _unread_messages(user),
+    }
+
+
+def dashboard_summary(user) -> dict:
+    """
+    Cached dashboard summary for ``user``.
+    """
+    key = dashboard_cache_key(user.pk)
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_dashboard_summary(user)
+        cache.set(key, summary, DASHBOARD_CACHE_TIMEOUT)
+    return summary
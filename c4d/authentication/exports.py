@@ -0,0 +1,178 @@
+"""
+Streaming exports of job applications for staff.
+
+Rows are fetched as tuples (no model instances) in fixed-size chunks, over
+a server-side cursor on PostgreSQL or by keyset on the primary key where
+server-side cursors are unavailable (PgBouncer transaction pooling, SQLite),
+and encoded one at a time into a ``StreamingHttpResponse``. Memory use does
+not depend on how many applications match. Under ASGI the blocks are handed
+over through an async iterator; Django would otherwise collect a sync one
+into a list before sending any of it.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import JobApplication
+
+EXPORT_CHUNK_SIZE = 2000
+# encoded rows are sent in blocks of about this many characters
+WRITE_BUFFER_SIZE = 64 * 1024
+
+# (column, lookup) pairs; joined fields come through the same SELECT
+EXPORT_COLUMNS = [
+    ("application_id", "id"),
+    ("submitted", "submission_date"),
+    ("status", "status"),
+    ("full_name", "full_name"),
+    ("email", "user__email"),
+    ("job_id", "job_id"),
+    ("job_title", "job__title"),
+    ("job_type", "job__job_type"),
+    ("job_location", "job__location"),
+    ("job_clearance", "job__clearance"),
+    ("rfqts_no", "job__rfqts_no__rfqts_no"),
+    ("rfqt_task_title", "job__rfqts_no__task_title"),
+    ("rfqt_department", "job__rfqts_no__department"),
+    ("current_clearance", "current_clearance"),
+    ("clearance_number", "clearance_number"),
+    ("clearance_expiry_date", "clearance_expiry_date"),
+    ("location_of_residence", "location_of_residence"),
+    ("earliest_start_date", "earliest_start_date"),
+    ("proposed_rate", "proposed_rate"),
+    ("proposed_salary", "proposed_salary"),
+    ("planned_leave", "planned_leave"),
+    ("available_for_interview", "available_for_interview"),
+    ("resume", "resume"),
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+}
+
+# a leading =, +, - or @ makes spreadsheet apps evaluate the cell
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def filter_applications(queryset=None, *, job_id=None, status=None):
+    """
+    The ``admin_applications`` filters: by job and by status.
+    """
+    if queryset is None:
+        queryset = JobApplication.objects.all()
+    if job_id:
+        queryset = queryset.filter(job_id=job_id)
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+def _server_side_cursors(alias: str) -> bool:
+    connection = connections[alias]
+    return connection.vendor == "postgresql" and not connection.settings_dict.get("DISABLE_SERVER_SIDE_CURSORS")
+
+
+def iter_export_rows(queryset, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    Yield one tuple per application, in primary-key order.
+    """
+    lookups = [lookup for _column, lookup in EXPORT_COLUMNS]
+    rows = queryset.order_by("pk").values_list("pk", *lookups)
+    if _server_side_cursors(queryset.db):
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield row[1:]
+        return
+
+    last_pk = None
+    while True:
+        chunk = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        for row in chunk:
+            yield row[1:]
+        last_pk = chunk[-1][0]
+
+
+class _Echo:
+    # csv.writer target that hands back each encoded line
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    value = str(value)
+    if value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow([column for column, _lookup in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def stream_json(rows):
+    columns = [column for column, _lookup in EXPORT_COLUMNS]
+    separator = "[\n"
+    for row in rows:
+        yield separator + json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder)
+        separator = ",\n"
+    yield "[]\n" if separator == "[\n" else "\n]\n"
+
+
+def _buffered(pieces, size: int = WRITE_BUFFER_SIZE):
+    # join small rows into larger writes to cut per-chunk overhead
+    buffer, length = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+async def _aiter(blocks):
+    # one block per thread hop, always on the request's sync thread, so a
+    # server-side cursor stays on the connection that opened it
+    done = object()
+    try:
+        while (block := await sync_to_async(next)(blocks, done)) is not done:
+            yield block
+    finally:
+        await sync_to_async(blocks.close)()
+
+
+def export_response(queryset, fmt: str = "csv", asynchronous: bool = False) -> StreamingHttpResponse:
+    """
+    Stream ``queryset`` (JobApplications) as a CSV or JSON download.
+    ``asynchronous`` (served under ASGI) streams through an async iterator.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    encode = stream_csv if fmt == "csv" else stream_json
+    blocks = _buffered(encode(iter_export_rows(queryset)))
+    response = StreamingHttpResponse(
+        _aiter(blocks) if asynchronous else blocks,
+        content_type=EXPORT_FORMATS[fmt],
+    )
+    stamp = timezone.localtime().strftime("%Y%m%d-%H%M")
+    response["Content-Disposition"] = f'attachment; filename="applications-{stamp}.{fmt}"'
+    return response
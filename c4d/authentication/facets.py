@@ -0,0 +1,101 @@
+"""
+Facet counts for the job board filter sidebar.
+
+One grouped query over (job_type, location, clearance) returns every
+combination present in the result set; the per-facet counts are folded in
+Python. Each facet is counted with the *other* selected filters applied, so a
+dropdown still lists its alternatives after one value has been picked.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .caching import ajob_board_version, job_board_version, make_key
+from .models import Job
+
+FACET_FIELDS: tuple[str, ...] = ("job_type", "location", "clearance")
+
+FACET_CACHE_TIMEOUT = getattr(settings, "JOB_FACET_CACHE_TIMEOUT", 600)
+
+
+def _combination_counts(queryset) -> list[tuple]:
+    """
+    [(job_type, location, clearance, count), ...] in a single GROUP BY query.
+    """
+    rows = (
+        queryset
+        .order_by()
+        .values_list(*FACET_FIELDS)
+        .annotate(total=Count("pk"))
+    )
+    return [tuple(row) for row in rows]
+
+
+async def _acombination_counts(queryset) -> list[tuple]:
+    rows = (
+        queryset
+        .order_by()
+        .values_list(*FACET_FIELDS)
+        .annotate(total=Count("pk"))
+    )
+    return [tuple(row) async for row in rows]
+
+
+def _fold(combinations: list[tuple], selected: dict[str, str]) -> dict[str, list[dict]]:
+    facets = {}
+    for index, field in enumerate(FACET_FIELDS):
+        others = [
+            (i, selected[f]) for i, f in enumerate(FACET_FIELDS)
+            if f != field and selected.get(f)
+        ]
+        counts: dict[str, int] = {}
+        for row in combinations:
+            value = row[index]
+            counts.setdefault(value, 0)
+            if all(row[i] == wanted for i, wanted in others):
+                counts[value] += row[-1]
+
+        choices = dict(Job._meta.get_field(field).choices)
+        order = {value: pos for pos, value in enumerate(choices)}
+        facets[field] = [
+            {
+                "value": value,
+                "label": choices.get(value, value),
+                "count": counts[value],
+                "selected": selected.get(field) == value,
+            }
+            for value in sorted(counts, key=lambda v: (order.get(v, len(order)), v))
+        ]
+    return facets
+
+
+def job_facets(queryset, selected: dict[str, str] | None = None, *, key: str = "") -> dict[str, list[dict]]:
+    """
+    Facet values and counts for ``queryset`` (before the facet filters
+    themselves are applied). ``key`` must identify everything else that
+    shaped the queryset, e.g. the search keyword, since it is part of the
+    cache key.
+    """
+    selected = {f: v for f, v in (selected or {}).items() if f in FACET_FIELDS and v}
+    cache_key = make_key("job-facets", key, version=job_board_version())
+    combinations = cache.get(cache_key)
+    if combinations is None:
+        combinations = _combination_counts(queryset)
+        cache.set(cache_key, combinations, FACET_CACHE_TIMEOUT)
+    return _fold(combinations, selected)
+
+
+async def ajob_facets(queryset, selected: dict[str, str] | None = None, *, key: str = "") -> dict[str, list[dict]]:
+    """
+    ``job_facets`` for async views (async cache and ORM calls).
+    """
+    selected = {f: v for f, v in (selected or {}).items() if f in FACET_FIELDS and v}
+    cache_key = make_key("job-facets", key, version=await ajob_board_version())
+    combinations = await cache.aget(cache_key)
+    if combinations is None:
+        combinations = await _acombination_counts(queryset)
+        await cache.aset(cache_key, combinations, FACET_CACHE_TIMEOUT)
+    return _fold(combinations, selected)
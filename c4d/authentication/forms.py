@@ -1,12 +1,17 @@
 from datetime import date
 from django import forms
+from django.db import IntegrityError, transaction
 from django.forms import ModelForm
+from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserChangeForm
 from allauth.account.forms import SignupForm, AddEmailForm as AllauthAddEmailForm
+from django.shortcuts import redirect
 from django.utils.translation import gettext as _
 from allauth.account.models import EmailAddress
 
+from .managers import normalize_email
+
 # Import Profile and choices which should always be available
 try:
     from .models import Profile, STATE_CHOICES, CLEARANCE_LEVEL_CHOICES
@@ -30,13 +35,13 @@ class AddEmailForm(AllauthAddEmailForm):
     # For adding emails in "Add email" section
     # Prevents duplicates and disallowed local parts
     def clean_email(self):
-        email = super().clean_email()
+        email = normalize_email(super().clean_email())
         if not email:
             return email
-        local_part = email.split("@")[0].lower()
+        local_part = email.split("@")[0]
         if local_part in ["root", "admin", "sa"]:
             raise forms.ValidationError(_("This email local part is not allowed."))
-        if EmailAddress.objects.filter(email__iexact=email).exists():
+        if EmailAddress.objects.filter(email=email).exists():
             raise forms.ValidationError(
                 _("That email is already in use. Please sign in or choose another.")
             )
@@ -46,19 +51,28 @@ class AddEmailForm(AllauthAddEmailForm):
 class CustomUserSignupForm(SignupForm):
     # Custom signup form with Allauth integration
     def clean_email(self):
-        email = super().clean_email()
+        email = normalize_email(super().clean_email())
         if not email:
             return email
-        local_part = email.split("@")[0].lower()
+        local_part = email.split("@")[0]
         if local_part in ["root", "admin", "sa"]:
             raise forms.ValidationError(_("This email local part is not allowed."))
-        if (User.objects.filter(email__iexact=email).exists() or
-            EmailAddress.objects.filter(email__iexact=email).exists()):
+        if (User.objects.filter(email=email).exists() or
+            EmailAddress.objects.filter(email=email).exists()):
             raise forms.ValidationError(
                 _("That email is already in use, please sign in or use a different one.")
             )
         return email
 
+    def try_save(self, request):
+        # clean_email can pass for two racing signups; the unique index decides
+        try:
+            with transaction.atomic():
+                return super().try_save(request)
+        except IntegrityError:
+            messages.error(request, _("That email is already in use, please sign in or use a different one."))
+            return None, redirect("account_signup")
+
     def save(self, request):
         user = super().save(request)
         return user
@@ -268,8 +282,55 @@ class EmailForm(forms.Form):
 
 # ---------- JOB RELATED FORMS ---------- #
 
+class ChunkedUploadMixin:
+    """
+    Lets a ModelForm take a file sent earlier through the chunked upload
+    endpoint instead of (or as well as) a multipart file field.
+
+    ``upload_fields`` maps a hidden form field holding the upload id to the
+    model FileField it fills, e.g. ``{'resume_upload_id': 'resume'}``; the
+    upload kind is the model field name. Pass ``upload_user`` to only accept
+    uploads owned by that user.
+    """
+    upload_fields = {}
+
+    def __init__(self, *args, upload_user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_user = upload_user
+        self.uploads = {}
+        for name in self.upload_fields:
+            self.fields[name] = forms.UUIDField(required=False, widget=forms.HiddenInput)
+
+    def clean(self):
+        from .uploads import completed_upload
+
+        cleaned_data = super().clean()
+        for name, model_field in self.upload_fields.items():
+            upload_id = cleaned_data.get(name)
+            if not upload_id:
+                continue
+            session = completed_upload(upload_id, kind=model_field, user=self.upload_user)
+            if session is None:
+                self.add_error(name, _("The uploaded file could not be found. Please upload it again."))
+            else:
+                self.uploads[model_field] = session.stored_file
+        return cleaned_data
+
+    def save(self, commit=True):
+        instance = super().save(commit=False)
+        for model_field, stored in self.uploads.items():
+            # point at the stored copy, no bytes are copied
+            setattr(instance, model_field, stored.file.name)
+        if commit:
+            instance.save()
+            self.save_m2m()
+        return instance
+
+
 if JOB_MODELS_EXIST:
-    class RfqtForm(forms.ModelForm):
+    class RfqtForm(ChunkedUploadMixin, forms.ModelForm):
+        upload_fields = {'rfq_upload_id': 'rfq_file'}
+
         class Meta:
             model = Rfqt
             fields = '__all__'
@@ -307,7 +368,9 @@ if JOB_MODELS_EXIST:
             }
 
 
-    class JobApplicationForm(forms.ModelForm):
+    class JobApplicationForm(ChunkedUploadMixin, forms.ModelForm):
+        upload_fields = {'resume_upload_id': 'resume'}
+
         class Meta:
             model = JobApplication
             fields = [
@@ -0,0 +1,548 @@
+"""
+Icon fonts cut down to the icons the templates use.
+
+``ICON_FONTS`` names each family's stylesheet (RemixIcons, bootstrap-icons,
+boxicons, feather, line-awesome, tabler-icons). The build reads every
+template together with everything it extends and includes and the scripts
+it loads with ``{% static %}``, and keeps the icon classes it finds there
+(plus ``ICON_FONT_EXTRA_SOURCES``). It then writes under
+``assets/icon-fonts/subset/``:
+
+* ``<family>.css``: the family's base rules, the rules of the used icons
+  only, and ``@font-face`` rules pointing at the subsets
+* ``<family>.<hash>.woff2``: each font face reduced to the used glyphs
+* ``icons.json``: the families each page needs, and the trimmed stylesheets
+
+Each stylesheet in ``ICON_FONT_STYLESHEETS`` that inlines the families
+(``styles.css`` compiles them in from ``scss/_icons.scss``) gets a copy
+without them, ``<name>.noicons.css``. Pages link it through
+``{% without_icon_fonts %}`` and the subsets through ``{% icon_fonts %}``
+(templatetags ``assets``). Both fall back to the full files before the first
+build.
+
+Only literal class names count, so an icon whose class is assembled at run
+time (``ri-{{ name }}``) has to be named in ``ICON_FONT_EXTRA_SOURCES``.
+Subsetting needs fontTools (``brotli`` for WOFF2).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import os
+import posixpath
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from django.conf import settings
+
+from authentication.tailwind import TemplateGraph
+
+try:
+    from fontTools import subset as font_subset
+    from fontTools.ttLib import TTFont
+    FONTTOOLS_AVAILABLE = True
+except ImportError:
+    FONTTOOLS_AVAILABLE = False
+
+SUBSET_DIR = getattr(settings, "ICON_FONT_SUBSET_DIR", "assets/icon-fonts/subset")
+MANIFEST_NAME = "icons.json"
+TRIMMED_SUFFIX = ".noicons.css"
+
+# the source format fontTools reads best, when a face ships several
+SOURCE_FORMATS = [".woff2", ".woff", ".ttf", ".otf"]
+
+_STATIC_RE = re.compile(r"""\{%\s*static\s+["']([^"']+\.m?js)["']""")
+_TOKEN_RE = re.compile(r"[\w-]+")
+_CLASS_RE = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+_URL_RE = re.compile(r"""url\(\s*["']?([^"')]+?)["']?\s*\)""")
+_CONTENT_RE = re.compile(r"""(?:^|;)\s*content\s*:\s*(["'])(.*?)\1""", re.DOTALL)
+_ESCAPE_RE = re.compile(r"\\([0-9a-fA-F]{1,6})\s?|\\(.)")
+_FAMILY_RE = re.compile(r"""font-family\s*:\s*["']?([^"';]+?)["']?\s*(?:;|$)""")
+
+
+class IconFontError(Exception):
+    pass
+
+
+# ---------- CSS ---------- #
+
+@dataclass
+class Rule:
+    prelude: str
+    body: str
+    # source text, comments before it included
+    text: str
+
+    @property
+    def at_rule(self) -> str | None:
+        if self.prelude.startswith("@"):
+            return self.prelude[1:].split(None, 1)[0].lower() if len(self.prelude) > 1 else ""
+        return None
+
+    @property
+    def selectors(self) -> list[str]:
+        return [" ".join(selector.split()) for selector in self.prelude.split(",") if selector.strip()]
+
+    def key(self) -> tuple:
+        """
+        Selectors and declarations, ignoring layout and vendor prefixes, so
+        the same rule matches after Sass and autoprefixer have been through
+        it.
+        """
+        selectors = tuple(sorted(selector.replace("::", ":") for selector in self.selectors))
+        declarations = set()
+        for declaration in self.body.split(";"):
+            name, _, value = declaration.partition(":")
+            name, value = name.strip().lower(), " ".join(value.split())
+            if name and not name.startswith("-") and "-webkit-" not in value and "-moz-" not in value:
+                declarations.add((name, value))
+        return selectors, frozenset(declarations)
+
+
+def parse_rules(css: str) -> list[Rule]:
+    """
+    Top-level rules of ``css``; nested blocks (``@media``, ``@keyframes``)
+    stay inside their rule's body. Text after the last rule is dropped.
+    """
+    rules = []
+    start = 0
+    depth = 0
+    position, length = 0, len(css)
+    while position < length:
+        char = css[position]
+        if css.startswith("/*", position):
+            end = css.find("*/", position + 2)
+            position = length if end < 0 else end + 2
+            continue
+        if char in "\"'":
+            end = position + 1
+            while end < length and css[end] != char:
+                end += 2 if css[end] == "\\" else 1
+            position = end + 1
+            continue
+        if char == "{":
+            if depth == 0:
+                body_start = position + 1
+                prelude_end = position
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                prelude = _strip_comments(css[start:prelude_end]).strip()
+                rules.append(Rule(prelude=prelude, body=css[body_start:position], text=css[start:position + 1]))
+                start = position + 1
+        elif char == ";" and depth == 0:
+            # @charset / @import
+            prelude = _strip_comments(css[start:position]).strip()
+            rules.append(Rule(prelude=prelude, body="", text=css[start:position + 1]))
+            start = position + 1
+        position += 1
+    return rules
+
+
+def _strip_comments(text: str) -> str:
+    return re.sub(r"/\*.*?\*/", "", text, flags=re.DOTALL)
+
+
+def _codepoints(content: str) -> set[int]:
+    points = set()
+    position = 0
+    for match in _ESCAPE_RE.finditer(content):
+        points.update(ord(char) for char in content[position:match.start()])
+        points.add(int(match.group(1), 16) if match.group(1) else ord(match.group(2)))
+        position = match.end()
+    points.update(ord(char) for char in content[position:])
+    return points
+
+
+def _font_family(body: str) -> str | None:
+    match = _FAMILY_RE.search(_strip_comments(body))
+    return match.group(1).strip() if match else None
+
+
+# ---------- FAMILIES ---------- #
+
+@dataclass
+class Face:
+    font_family: str
+    rule: Rule
+    # static name of the file to subset
+    source: str | None
+
+
+@dataclass
+class Family:
+    name: str
+    stylesheet: str
+    rules: list[Rule]
+    faces: list[Face]
+    # icon class -> code points of its glyph
+    icons: dict[str, set[int]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, name: str, stylesheet: str, context: list[str]) -> "Family":
+        path = _find(stylesheet)
+        if path is None:
+            raise IconFontError(f"Icon font stylesheet {stylesheet} not found")
+        rules = parse_rules(Path(path).read_text(encoding="utf-8"))
+        family = cls(name=name, stylesheet=stylesheet, rules=rules, faces=[])
+
+        base_classes = set()
+        for rule in rules:
+            if rule.at_rule is None and not _CONTENT_RE.search(rule.body):
+                base_classes.update(_CLASS_RE.findall(rule.prelude))
+        for rule in rules:
+            if rule.at_rule == "font-face":
+                family.faces.append(Face(
+                    font_family=_font_family(rule.body) or name,
+                    rule=rule,
+                    source=_face_source(rule.body, [stylesheet, *context]),
+                ))
+                continue
+            content = _CONTENT_RE.search(rule.body) if rule.at_rule is None else None
+            if content is None:
+                continue
+            points = _codepoints(content.group(2))
+            for selector in rule.selectors:
+                for icon in set(_CLASS_RE.findall(selector)) - base_classes:
+                    family.icons.setdefault(icon, set()).update(points)
+        return family
+
+    def used_rules(self, used: set[str]) -> list[str]:
+        """
+        The stylesheet's rules without the icons outside ``used`` and
+        without its ``@font-face`` rules.
+        """
+        kept = []
+        for rule in self.rules:
+            if rule.at_rule in ("font-face", "charset"):
+                continue
+            if rule.at_rule is None and _CONTENT_RE.search(rule.body):
+                selectors = [
+                    selector for selector in rule.selectors
+                    if not (icons := set(_CLASS_RE.findall(selector)) & self.icons.keys()) or icons & used
+                ]
+                if not selectors:
+                    continue
+                if len(selectors) < len(rule.selectors):
+                    kept.append(f"{', '.join(selectors)} {{{rule.body}}}")
+                    continue
+            kept.append(f"{rule.prelude} {{{rule.body}}}" if rule.prelude else rule.text.strip())
+        return kept
+
+
+def _find(name: str) -> str | None:
+    from django.contrib.staticfiles import finders
+
+    return finders.find(name)
+
+
+def _face_source(body: str, context: list[str]) -> str | None:
+    """
+    The best font file a ``@font-face`` names. Inlined stylesheets write
+    their URLs relative to the stylesheet that inlines them, so each of
+    ``context`` is tried as the base.
+    """
+    candidates = {}
+    for reference in _URL_RE.findall(body):
+        path = urlsplit(reference).path
+        extension = posixpath.splitext(path)[1].lower()
+        if extension not in SOURCE_FORMATS or extension in candidates:
+            continue
+        for base in context:
+            name = posixpath.normpath(urljoin(base, path))
+            if _find(name):
+                candidates[extension] = name
+                break
+    for extension in SOURCE_FORMATS:
+        if extension in candidates:
+            return candidates[extension]
+    return None
+
+
+def configured_families() -> list[Family]:
+    context = list(getattr(settings, "ICON_FONT_STYLESHEETS", ()))
+    return [
+        Family.load(name, stylesheet, context)
+        for name, stylesheet in getattr(settings, "ICON_FONTS", {}).items()
+    ]
+
+
+# ---------- USAGE ---------- #
+
+class UsageScanner:
+    """
+    Class-like tokens per template closure, from the templates and the
+    scripts they load. Each file is read once.
+    """
+
+    def __init__(self, graph: TemplateGraph):
+        self.graph = graph
+        self._tokens: dict[str, set[str]] = {}
+
+    def _file_tokens(self, path) -> set[str]:
+        key = str(path)
+        if key not in self._tokens:
+            try:
+                text = Path(path).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                text = ""
+            tokens = set(_TOKEN_RE.findall(text))
+            self._tokens[key] = tokens
+            for script in _STATIC_RE.findall(text):
+                if found := _find(script):
+                    tokens |= self._file_tokens(found)
+        return self._tokens[key]
+
+    def page_tokens(self, page: str) -> set[str]:
+        tokens = set()
+        for template in self.graph.closure([page]):
+            if template in self.graph.paths:
+                tokens |= self._file_tokens(self.graph.paths[template])
+        return tokens
+
+    def extra_tokens(self) -> set[str]:
+        tokens = set()
+        for source in getattr(settings, "ICON_FONT_EXTRA_SOURCES", ()):
+            source = Path(source)
+            files = sorted(source.rglob("*")) if source.is_dir() else [source]
+            for path in files:
+                if path.is_file():
+                    tokens |= self._file_tokens(path)
+        return tokens
+
+
+# ---------- BUILD ---------- #
+
+@dataclass
+class FamilyResult:
+    name: str
+    static_name: str
+    icons: list[str]
+    total_icons: int
+    css_size: int
+    source_css_size: int
+    # (static name, bytes, source bytes)
+    fonts: list[tuple[str, int, int]]
+    digest: str
+    pages: int = 0
+
+
+@dataclass
+class TrimResult:
+    stylesheet: str
+    static_name: str
+    size: int
+    source_size: int
+    removed_rules: int
+    digest: str
+
+
+def _static_dir() -> Path:
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.md5(data, usedforsecurity=False).hexdigest()[:12]
+
+
+def subset_font(source: str, codepoints: set[int]) -> bytes | None:
+    """
+    WOFF2 of ``source`` keeping only ``codepoints``, or None when the font
+    has none of them.
+    """
+    # fontTools warns about every quirk of the vendored fonts
+    logging.getLogger("fontTools").setLevel(logging.ERROR)
+    font = TTFont(source)
+    if not codepoints & set(font.getBestCmap()):
+        return None
+    options = font_subset.Options()
+    options.flavor = "woff2"
+    # icons are addressed by code point: ligature and positioning tables
+    # are dead weight (and tabler-icons ships a malformed GSUB)
+    options.drop_tables += ["GSUB", "GPOS", "GDEF", "FFTM"]
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    output = io.BytesIO()
+    font.save(output)
+    return output.getvalue()
+
+
+def _face_rule(face: Face, url: str) -> str:
+    """
+    ``face``'s descriptors with ``src`` replaced by the subset.
+    """
+    descriptors = []
+    for declaration in _strip_comments(face.rule.body).split(";"):
+        name = declaration.partition(":")[0].strip().lower()
+        if name and name != "src":
+            descriptors.append(" ".join(declaration.split()))
+    descriptors.append(f'src: url("{url}") format("woff2")')
+    return "@font-face { " + "; ".join(descriptors) + "; }"
+
+
+def trim_stylesheet(css: str, families: list[Family]) -> tuple[str, int]:
+    """
+    ``css`` without the rules it inlined from ``families``: their
+    ``@font-face`` rules and every top-level rule identical to one of theirs.
+    Returns the CSS and the number of rules removed.
+    """
+    keys = {rule.key() for family in families for rule in family.rules if rule.at_rule is None}
+    font_families = {face.font_family for family in families for face in family.faces}
+    kept, removed = [], 0
+    for rule in parse_rules(css):
+        if rule.at_rule == "font-face":
+            drop = _font_family(rule.body) in font_families
+        else:
+            drop = rule.at_rule is None and rule.key() in keys
+        if drop:
+            removed += 1
+        else:
+            kept.append(rule.text)
+    return "".join(kept) + "\n", removed
+
+
+def build_icon_fonts(graph: TemplateGraph | None = None) -> tuple[list[FamilyResult], list[TrimResult]]:
+    """
+    Subset every configured family to the icons in use, trim the
+    stylesheets that inline them, and write ``icons.json``.
+    """
+    if not FONTTOOLS_AVAILABLE:
+        raise IconFontError("Icon font subsetting needs fontTools: pip install fonttools brotli")
+    graph = graph or TemplateGraph.scan()
+    families = configured_families()
+    scanner = UsageScanner(graph)
+    extra = scanner.extra_tokens()
+    page_icons = {}
+    for page in sorted(graph.paths):
+        tokens = scanner.page_tokens(page) | extra
+        page_icons[page] = {family.name: tokens & family.icons.keys() for family in families}
+
+    output_dir = _static_dir() / SUBSET_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in [*output_dir.glob("*.woff2"), *output_dir.glob("*.css")]:
+        stale.unlink()
+    manifest = {"families": {}, "pages": {}, "stylesheets": {}}
+    results = []
+    for family in families:
+        # one subset per family for the whole site, so it is cached once
+        used = set().union(*(icons[family.name] for icons in page_icons.values()))
+        if not used:
+            continue
+        codepoints = set().union(*(family.icons[icon] for icon in used))
+        faces, fonts = [], []
+        for position, face in enumerate(family.faces):
+            if face.source is None:
+                continue
+            data = subset_font(_find(face.source), codepoints)
+            if data is None:
+                continue
+            stem = f"{family.name}-{position}" if len(family.faces) > 1 else family.name
+            # named by content, so the CSS and the preload links agree on
+            # one URL with or without the pipeline
+            filename = f"{stem}.{_digest(data)}.woff2"
+            (output_dir / filename).write_bytes(data)
+            faces.append(_face_rule(face, filename))
+            fonts.append((f"{SUBSET_DIR}/{filename}", len(data), os.path.getsize(_find(face.source))))
+        css = ("\n".join([*faces, *family.used_rules(used)]) + "\n").encode("utf-8")
+        (output_dir / f"{family.name}.css").write_bytes(css)
+        result = FamilyResult(
+            name=family.name,
+            static_name=f"{SUBSET_DIR}/{family.name}.css",
+            icons=sorted(used),
+            total_icons=len(family.icons),
+            css_size=len(css),
+            source_css_size=os.path.getsize(_find(family.stylesheet)),
+            fonts=fonts,
+            digest=_digest(css),
+        )
+        results.append(result)
+        manifest["families"][family.name] = {
+            "file": result.static_name,
+            "hash": result.digest,
+            "bytes": result.css_size,
+            "fonts": [name for name, _size, _source_size in fonts],
+        }
+
+    built = set(manifest["families"])
+    for page, icons in page_icons.items():
+        manifest["pages"][page] = [name for name in icons if icons[name] and name in built]
+    for result in results:
+        result.pages = sum(1 for names in manifest["pages"].values() if result.name in names)
+
+    trims = []
+    for stylesheet in getattr(settings, "ICON_FONT_STYLESHEETS", ()):
+        source = _find(stylesheet)
+        if source is None:
+            raise IconFontError(f"Stylesheet {stylesheet} not found")
+        source_css = Path(source).read_text(encoding="utf-8")
+        css, removed = trim_stylesheet(source_css, families)
+        data = css.encode("utf-8")
+        # next to the original so its relative URLs still resolve
+        static_name = stylesheet[: -len(".css")] + TRIMMED_SUFFIX
+        (_static_dir() / static_name).parent.mkdir(parents=True, exist_ok=True)
+        (_static_dir() / static_name).write_bytes(data)
+        trims.append(TrimResult(
+            stylesheet=stylesheet,
+            static_name=static_name,
+            size=len(data),
+            source_size=len(source_css.encode("utf-8")),
+            removed_rules=removed,
+            digest=_digest(data),
+        ))
+        manifest["stylesheets"][stylesheet] = {"file": static_name, "hash": _digest(data)}
+
+    (output_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return results, trims
+
+
+# ---------- LOOKUP ---------- #
+
+_manifest_cache: tuple[float, dict] | None = None
+
+
+def icon_manifest() -> dict:
+    """
+    The built ``icons.json`` (empty before the first build), re-read when it
+    changes.
+    """
+    global _manifest_cache
+
+    path = _find(f"{SUBSET_DIR}/{MANIFEST_NAME}")
+    if not path:
+        return {}
+    mtime = os.path.getmtime(path)
+    if _manifest_cache is None or _manifest_cache[0] != mtime:
+        with open(path, encoding="utf-8") as handle:
+            _manifest_cache = (mtime, json.load(handle))
+    return _manifest_cache[1]
+
+
+def icon_stylesheets_for(template_name: str | None) -> list[dict]:
+    """
+    Manifest entries of the subsets a page links: the families it uses, or
+    all of them for a page the last build did not see.
+    """
+    manifest = icon_manifest()
+    families = manifest.get("families", {})
+    names = manifest.get("pages", {}).get(template_name or "")
+    if names is None:
+        names = sorted(families)
+    return [families[name] for name in names if name in families]
+
+
+def trimmed_stylesheet(stylesheet: str) -> tuple[str, str | None]:
+    """
+    (static name, content hash or None) of ``stylesheet`` without its icon
+    fonts, or of ``stylesheet`` itself before the first build.
+    """
+    entry = icon_manifest().get("stylesheets", {}).get(stylesheet)
+    if entry is None:
+        return stylesheet, None
+    return entry["file"], entry.get("hash")
@@ -0,0 +1,306 @@
+"""
+Bulk import of RFQTs (and the jobs derived from them) from CSV or XLSX.
+
+Rows are read one at a time, validated with the same rules as the admin and
+job forms (``RfqtForm`` / ``JobForm``) and written in batches: one
+transaction per batch, existing RFQTs matched on ``rfqts_no`` and updated,
+new ones inserted with ``bulk_create``. Every row needs an ``rfqts_no``;
+rows without one are rejected rather than falling back to the model default.
+Column names are the model field names; job columns carry a ``job_`` prefix
+(``job_title``, ``job_short_description``, ``job_type``, ...). A row without
+``job_title`` only touches the RFQT. Jobs are matched on (RFQT, title).
+
+Matching is a lookup followed by ``bulk_update``/``bulk_create``, not a
+database upsert: ``rfqts_no`` has no unique constraint (existing data may hold
+duplicates; the first is updated). Two imports running at the same
+time can both create the same new RFQT or job, so run one at a time.
+
+Bulk writes skip ``Job.save``, so the search index and the job-board
+version are refreshed once at the end.
+"""
+
+from __future__ import annotations
+
+import codecs
+import copy
+import csv
+import datetime
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.forms.models import model_to_dict
+
+from .caching import bump_job_board_version
+from .forms import JobForm, RfqtForm
+from .models import Job, Rfqt
+from .search import reindex_jobs
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+DEFAULT_BATCH_SIZE = 500
+JOB_PREFIX = "job_"
+# RfqtForm fields that never come from a spreadsheet
+RFQT_SKIP_FIELDS = ("rfq_file", "rfq_upload_id")
+
+RFQT_FIELDS = [f.name for f in Rfqt._meta.concrete_fields if f.name not in ("id",) + RFQT_SKIP_FIELDS]
+JOB_FIELDS = [name for name in JobForm.Meta.fields if name != "rfqts_no"]
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+@dataclass
+class RowError:
+    line: int
+    errors: dict
+
+    def __str__(self):
+        details = "; ".join(f"{name}: {' '.join(messages)}" for name, messages in self.errors.items())
+        return f"row {self.line}: {details}"
+
+
+@dataclass
+class ImportResult:
+    rfqts_created: int = 0
+    rfqts_updated: int = 0
+    jobs_created: int = 0
+    jobs_updated: int = 0
+    rows: int = 0
+    errors: list[RowError] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"{self.rows} rows: {self.rfqts_created} RFQTs created, {self.rfqts_updated} updated; "
+            f"{self.jobs_created} jobs created, {self.jobs_updated} updated; {len(self.errors)} rows rejected"
+        )
+
+
+# ---------- READERS ---------- #
+
+def _normalise_header(name) -> str:
+    return str(name or "").strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def iter_csv(fileobj):
+    """
+    Stream a CSV file (binary or text) as ``(line_number, row_dict)``.
+    """
+    if "b" in getattr(fileobj, "mode", "b"):
+        fileobj = codecs.getreader("utf-8-sig")(fileobj)
+    reader = csv.reader(fileobj)
+    try:
+        header = [_normalise_header(name) for name in next(reader)]
+    except StopIteration:
+        return
+    for row in reader:
+        if any(cell.strip() for cell in row):
+            yield reader.line_num, dict(zip(header, (cell.strip() for cell in row)))
+
+
+def iter_xlsx(fileobj):
+    """
+    Stream the first worksheet of an XLSX workbook (read-only mode, so rows
+    are not all held in memory).
+    """
+    if not OPENPYXL_AVAILABLE:
+        raise ImportFormatError("XLSX import needs openpyxl (pip install openpyxl).")
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        try:
+            header = [_normalise_header(name) for name in next(rows)]
+        except StopIteration:
+            return
+        for line, row in enumerate(rows, start=2):
+            values = [_cell(value) for value in row]
+            if any(values):
+                yield line, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, fmt: str):
+    if fmt == "csv":
+        return iter_csv(fileobj)
+    if fmt == "xlsx":
+        return iter_xlsx(fileobj)
+    raise ImportFormatError(f"Unsupported format '{fmt}' (use csv or xlsx).")
+
+
+def detect_format(filename: str) -> str:
+    return filename.rsplit(".", 1)[-1].lower() if "." in filename else "csv"
+
+
+# ---------- VALIDATION ---------- #
+
+def _defaults(model, names) -> dict:
+    defaults = {}
+    for name in names:
+        model_field = model._meta.get_field(name)
+        value = model_field.get_default()
+        defaults[name] = "" if value is None else value
+    return defaults
+
+
+RFQT_DEFAULTS = _defaults(Rfqt, RFQT_FIELDS)
+JOB_DEFAULTS = _defaults(Job, JOB_FIELDS)
+
+
+def job_column(name: str) -> str:
+    """
+    Spreadsheet column for a JobForm field: ``title`` -> ``job_title``
+    (``job_type`` is already prefixed).
+    """
+    return name if name.startswith(JOB_PREFIX) else f"{JOB_PREFIX}{name}"
+
+
+def validate_row(row: dict, existing: Rfqt | None = None):
+    """
+    Validate one row. Returns ``(rfqt, job, errors)``: unsaved instances
+    (``job`` is None for RFQT-only rows) or a dict of field errors.
+    Columns missing from the file keep the existing (or default) value.
+    """
+    base = model_to_dict(existing, fields=RFQT_FIELDS) if existing else dict(RFQT_DEFAULTS)
+    base.update({name: row[name] for name in RFQT_FIELDS if name in row})
+    # validate against a copy: is_valid() writes the data onto the instance
+    rfqt_form = RfqtForm(data=base, instance=copy.copy(existing) if existing else Rfqt())
+    errors = {}
+    if not rfqt_form.is_valid():
+        errors.update(rfqt_form.errors)
+
+    job = None
+    if row.get(job_column("title")):
+        job_data = dict(JOB_DEFAULTS)
+        job_data.update({name: row[job_column(name)] for name in JOB_FIELDS if job_column(name) in row})
+        # checkbox semantics: present means True
+        if row.get(job_column("is_active"), "true").strip().lower() in ("false", "0", "no"):
+            job_data.pop("is_active", None)
+        else:
+            job_data["is_active"] = "on"
+        job_form = JobForm(data=job_data)
+        if job_form.is_valid():
+            job = job_form.save(commit=False)
+        else:
+            errors.update({job_column(name): messages for name, messages in job_form.errors.items()})
+
+    if errors:
+        return None, None, errors
+    return rfqt_form.save(commit=False), job, {}
+
+
+# ---------- WRITES ---------- #
+
+def _write_batch(batch: list, result: ImportResult) -> list[int]:
+    """
+    Validate and write one batch of ``(line, row)`` pairs. Returns the ids
+    of the jobs written.
+    """
+    keys = {row.get("rfqts_no", "").strip() for _line, row in batch} - {""}
+    existing = {}
+    for rfqt in Rfqt.objects.filter(rfqts_no__in=keys).order_by("pk"):
+        existing.setdefault(rfqt.rfqts_no, rfqt)
+
+    rfqts = {}      # rfqts_no -> instance (last row for a number wins)
+    jobs = []       # (rfqts_no, job)
+    for line, row in batch:
+        key = row.get("rfqts_no", "").strip()
+        if not key:
+            result.errors.append(RowError(line, {"rfqts_no": ["This field is required."]}))
+            continue
+        rfqt, job, errors = validate_row(row, rfqts.get(key) or existing.get(key))
+        if errors:
+            result.errors.append(RowError(line, errors))
+            continue
+        rfqts[rfqt.rfqts_no] = rfqt
+        if job is not None:
+            jobs.append((rfqt.rfqts_no, job))
+
+    to_create = [rfqt for rfqt in rfqts.values() if rfqt.pk is None]
+    to_update = [rfqt for rfqt in rfqts.values() if rfqt.pk is not None]
+    result.rfqts_created += len(to_create)
+    result.rfqts_updated += len(to_update)
+
+    with transaction.atomic():
+        Rfqt.objects.bulk_create(to_create)
+        if to_update:
+            Rfqt.objects.bulk_update(to_update, RFQT_FIELDS)
+
+        current = {
+            (job.rfqts_no_id, job.title): job
+            for job in Job.objects.filter(rfqts_no__in=[rfqt.pk for rfqt in rfqts.values()])
+        }
+        new_jobs, changed_jobs = [], {}
+        for key, job in jobs:
+            job.rfqts_no = rfqts[key]
+            match = current.get((job.rfqts_no_id, job.title))
+            if match is None:
+                new_jobs.append(job)
+                current[(job.rfqts_no_id, job.title)] = job
+            elif match.pk is None:
+                # repeated within this batch: keep the later row
+                new_jobs[new_jobs.index(match)] = job
+                current[(job.rfqts_no_id, job.title)] = job
+            else:
+                job.pk = match.pk
+                changed_jobs[job.pk] = job
+        Job.objects.bulk_create(new_jobs)
+        if changed_jobs:
+            Job.objects.bulk_update(list(changed_jobs.values()), ["rfqts_no", *JOB_FIELDS])
+    result.jobs_created += len(new_jobs)
+    result.jobs_updated += len(changed_jobs)
+    return [job.pk for job in new_jobs] + list(changed_jobs)
+
+
+def _import(fileobj, fmt: str, batch_size: int, progress) -> tuple[ImportResult, list[int]]:
+    result = ImportResult()
+    job_ids = []
+    batch = []
+    for line, row in iter_rows(fileobj, fmt):
+        batch.append((line, row))
+        result.rows += 1
+        if len(batch) >= batch_size:
+            job_ids += _write_batch(batch, result)
+            batch = []
+            if progress:
+                progress(result)
+    if batch:
+        job_ids += _write_batch(batch, result)
+        if progress:
+            progress(result)
+    return result, job_ids
+
+
+def import_rfqts(fileobj, fmt: str = "csv", *, batch_size: int = DEFAULT_BATCH_SIZE,
+                 dry_run: bool = False, progress=None) -> ImportResult:
+    """
+    Import RFQT/job rows from ``fileobj``. Invalid rows are reported in
+    ``result.errors`` and skipped; valid rows are committed batch by batch.
+    A dry run does the same work inside one transaction that is rolled back,
+    so its counts are exact. ``progress`` is called after each batch.
+    """
+    if dry_run:
+        with transaction.atomic():
+            result, _job_ids = _import(fileobj, fmt, batch_size, progress)
+            transaction.set_rollback(True)
+        return result
+
+    result, job_ids = _import(fileobj, fmt, batch_size, progress)
+    if job_ids:
+        reindex_jobs(Job.objects.filter(pk__in=job_ids))
+        bump_job_board_version()
+    return result
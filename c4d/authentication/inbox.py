@@ -0,0 +1,86 @@
+"""
+Unread-message state.
+
+Each recipient's unread total is kept in ``UnreadMessageCounter`` and
+changed in the same transaction as the messages themselves, so the header
+badge and dashboard read one row by primary key instead of counting
+``is_read=False`` messages. Read-marking is done in bulk: opening an
+application thread flips all of its unread messages with one UPDATE and
+moves the counter by the number of rows changed.
+"""
+
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
+
+from .dashboard import invalidate_dashboard
+from .models import Message, UnreadMessageCounter
+
+
+def rebuild_unread_counter(user_id) -> int:
+    """
+    Recount the user's unread messages and store the result.
+    """
+    unread = Message.objects.filter(recipient_id=user_id, is_read=False).count()
+    UnreadMessageCounter.objects.update_or_create(user_id=user_id, defaults={"unread": unread})
+    return unread
+
+
+def rebuild_all_unread_counters() -> int:
+    """
+    Recount every user's unread messages (repair after raw SQL or a restore).
+    Returns the number of counters written.
+    """
+    totals = dict(
+        Message.objects
+        .filter(is_read=False)
+        .order_by()
+        .values_list("recipient")
+        .annotate(total=Count("pk"))
+    )
+    user_ids = get_user_model().objects.values_list("pk", flat=True)
+    counters = [UnreadMessageCounter(user_id=pk, unread=totals.get(pk, 0)) for pk in user_ids]
+    with transaction.atomic():
+        UnreadMessageCounter.objects.bulk_create(
+            counters,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["unread"],
+        )
+    return len(counters)
+
+
+def unread_count(user_id) -> int:
+    """
+    The user's unread message total, from the counter row.
+    """
+    unread = UnreadMessageCounter.objects.filter(user_id=user_id).values_list("unread", flat=True).first()
+    if unread is None:
+        unread = rebuild_unread_counter(user_id)
+    return unread
+
+
+def mark_read(user_id, messages=None) -> int:
+    """
+    Mark the user's unread messages in ``messages`` (a Message queryset,
+    default all of them) as read. Returns how many changed.
+    """
+    if messages is None:
+        messages = Message.objects.all()
+    with transaction.atomic():
+        marked = messages.filter(recipient_id=user_id, is_read=False).update(is_read=True)
+        if marked:
+            UnreadMessageCounter.adjust(user_id, -marked)
+    if marked:
+        invalidate_dashboard(user_id)
+    return marked
+
+
+def mark_thread_read(user_id, application_id) -> int:
+    """
+    Mark every message to the user on one application as read.
+    """
+    return mark_read(user_id, Message.objects.filter(application_id=application_id))
@@ -0,0 +1,249 @@
+"""
+Outbound mail queue.
+
+``QueuedEmailBackend`` is the project's ``EMAIL_BACKEND``: ``send_mail``,
+allauth and everything else only write an ``OutboundEmail`` row, so no SMTP
+round trip happens inside a request. Delivery goes through the real backend
+(``EMAIL_DELIVERY_BACKEND``) in batches over one connection, either on the
+worker pool right after the enqueuing transaction commits or from
+``manage.py send_queued_mail``. Failures are retried with exponential
+backoff, and each recipient is limited to ``EMAIL_RECIPIENT_RATE_LIMIT``
+messages per ``EMAIL_RECIPIENT_RATE_WINDOW`` seconds.
+
+Bodies carry MFA codes and password-reset and confirmation links, so a
+delivered row keeps only its envelope: body, alternatives and attachments
+are cleared when it is sent.
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+from datetime import timedelta
+from email import message_from_string
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .tasks import run_in_background
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_BACKEND = getattr(
+    settings, "EMAIL_DELIVERY_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+BATCH_SIZE = getattr(settings, "EMAIL_QUEUE_BATCH_SIZE", 50)
+MAX_ATTEMPTS = getattr(settings, "EMAIL_QUEUE_MAX_ATTEMPTS", 5)
+RETRY_BASE_SECONDS = getattr(settings, "EMAIL_QUEUE_RETRY_BASE", 30)
+RETRY_MAX_SECONDS = 6 * 3600
+RATE_LIMIT = getattr(settings, "EMAIL_RECIPIENT_RATE_LIMIT", 20)
+RATE_WINDOW = getattr(settings, "EMAIL_RECIPIENT_RATE_WINDOW", 3600)
+# a claimed row not finished within this is assumed to belong to a dead worker
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+# ---------- ENQUEUE ---------- #
+
+def _attachment_payload(attachment) -> dict:
+    if not isinstance(attachment, tuple):
+        # MIMEBase instance: keep the rendered part
+        return {"mime": attachment.as_string()}
+    filename, content, mimetype = attachment
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return {
+        "filename": filename,
+        "content": base64.b64encode(content).decode("ascii"),
+        "mimetype": mimetype,
+    }
+
+
+def enqueue(message) -> OutboundEmail | None:
+    """
+    Persist an ``EmailMessage`` to the outbox. Messages without recipients
+    are dropped, as the SMTP backend would.
+    """
+    recipients = message.recipients()
+    if not recipients:
+        return None
+    return OutboundEmail.objects.create(
+        recipient=recipients[0].lower()[:254],
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+        subject=message.subject,
+        body=message.body,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+        alternatives=[list(alt) for alt in getattr(message, "alternatives", [])],
+        attachments=[_attachment_payload(att) for att in message.attachments],
+    )
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Email backend that writes to the outbox instead of sending.
+    """
+
+    def send_messages(self, email_messages):
+        queued = 0
+        with transaction.atomic():
+            for message in email_messages:
+                if enqueue(message) is not None:
+                    queued += 1
+        if queued and getattr(settings, "EMAIL_QUEUE_DELIVER_ON_COMMIT", True):
+            run_in_background(deliver_queued)
+        return queued
+
+
+# ---------- DELIVERY ---------- #
+
+def build_message(email: OutboundEmail, connection=None) -> EmailMultiAlternatives:
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        alternatives=[tuple(alt) for alt in email.alternatives],
+        connection=connection,
+    )
+    for attachment in email.attachments:
+        if "mime" in attachment:
+            message.attach(message_from_string(attachment["mime"]))
+        else:
+            message.attach(
+                attachment["filename"],
+                base64.b64decode(attachment["content"]),
+                attachment["mimetype"],
+            )
+    return message
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def _claim_batch(limit: int) -> list[OutboundEmail]:
+    """
+    Mark up to ``limit`` due messages as ``sending`` and return them. Rows
+    locked by another worker are skipped (PostgreSQL).
+    """
+    now = timezone.now()
+    OutboundEmail.objects.filter(status="sending", claimed_at__lt=now - CLAIM_TIMEOUT).update(status="queued")
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status="queued", next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:limit]
+        )
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+            status="sending", claimed_at=now
+        )
+    for email in batch:
+        email.status, email.claimed_at = "sending", now
+    return batch
+
+
+def _sent_in_window(recipients) -> dict[str, int]:
+    since = timezone.now() - timedelta(seconds=RATE_WINDOW)
+    rows = (
+        OutboundEmail.objects
+        .filter(status="sent", recipient__in=recipients, sent_at__gte=since)
+        .order_by()
+        .values_list("recipient")
+        .annotate(total=Count("pk"))
+    )
+    return dict(rows)
+
+
+def _defer(email: OutboundEmail, until) -> None:
+    email.status = "queued"
+    email.next_attempt_at = until
+    email.claimed_at = None
+    email.save(update_fields=["status", "next_attempt_at", "claimed_at"])
+
+
+def _record_failure(email: OutboundEmail, exc: Exception) -> None:
+    email.attempts += 1
+    email.last_error = f"{type(exc).__name__}: {exc}"
+    email.claimed_at = None
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = "failed"
+        logger.error("Giving up on mail %s to %s: %s", email.pk, email.recipient, email.last_error)
+    else:
+        email.status = "queued"
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=["status", "attempts", "last_error", "claimed_at", "next_attempt_at"])
+
+
+def deliver_batch(batch_size: int = BATCH_SIZE, backend: str | None = None) -> dict:
+    """
+    Send one batch of due messages over a single backend connection.
+    Returns counts of sent, deferred (rate limited) and failed messages.
+    """
+    stats = {"sent": 0, "deferred": 0, "failed": 0}
+    batch = _claim_batch(batch_size)
+    if not batch:
+        return stats
+
+    sent_counts = _sent_in_window({email.recipient for email in batch})
+    window_end = timezone.now() + timedelta(seconds=RATE_WINDOW)
+    connection = get_connection(backend or DELIVERY_BACKEND, fail_silently=False)
+    try:
+        connection.open()
+        for email in batch:
+            if sent_counts.get(email.recipient, 0) >= RATE_LIMIT:
+                _defer(email, window_end)
+                stats["deferred"] += 1
+                continue
+            try:
+                connection.send_messages([build_message(email, connection)])
+            except Exception as exc:
+                _record_failure(email, exc)
+                stats["failed"] += 1
+                # the connection may be unusable after an SMTP error
+                connection.close()
+                continue
+            email.status = "sent"
+            email.sent_at = timezone.now()
+            email.claimed_at = None
+            email.attempts += 1
+            email.body, email.alternatives, email.attachments = "", [], []
+            email.save(update_fields=[
+                "status", "sent_at", "claimed_at", "attempts", "body", "alternatives", "attachments",
+            ])
+            sent_counts[email.recipient] = sent_counts.get(email.recipient, 0) + 1
+            stats["sent"] += 1
+    except Exception as exc:
+        # could not connect at all: put the rest back with a backoff
+        for email in batch:
+            if email.status == "sending":
+                _record_failure(email, exc)
+                stats["failed"] += 1
+    finally:
+        connection.close()
+    return stats
+
+
+def deliver_queued(batch_size: int = BATCH_SIZE, backend: str | None = None) -> dict:
+    """
+    Deliver batches until nothing is due.
+    """
+    totals = {"sent": 0, "deferred": 0, "failed": 0}
+    while True:
+        stats = deliver_batch(batch_size, backend)
+        for key, value in stats.items():
+            totals[key] += value
+        if sum(stats.values()) < batch_size:
+            return totals
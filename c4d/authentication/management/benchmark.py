@@ -0,0 +1,19 @@
+"""
+Helpers shared by the benchmark_* management commands.
+"""
+
+import statistics
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_line(label, samples_ms):
+    return (
+        f"{label:<28} mean {statistics.mean(samples_ms):7.3f} ms   "
+        f"p50 {percentile(samples_ms, 50):7.3f} ms   "
+        f"p95 {percentile(samples_ms, 95):7.3f} ms"
+    )
@@ -0,0 +1,183 @@
+"""
+Concurrency benchmark for the sync and async job-board views.
+
+Runs each variant in a fresh process (``ASYNC_VIEWS`` off, then on) and
+drives the ASGI application in-process with ``--concurrency`` overlapping
+requests from one signed-in, MFA-confirmed user, the way uvicorn would
+with that many open connections. Reports requests per second, latency,
+peak memory and the peak number of threads for each. Any response outside
+2xx fails the run, so an error page is never timed as a result.
+
+    python manage.py benchmark_async_views --requests 2000 --concurrency 64
+    python manage.py benchmark_async_views --email staff@example.com
+"""
+
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from authentication.management.benchmark import latency_line
+
+# views with an async variant whose templates are in this tree; the job
+# list, job detail and my-applications templates are not
+DEFAULT_PATHS = ["/"]
+
+
+def _rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _signed_in_cookie(user) -> tuple[str, str]:
+    """
+    A stored session for ``user`` with MFA confirmed; returns the cookie
+    header value and the session key.
+    """
+    session = import_string(f"{settings.SESSION_ENGINE}.SessionStore")()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[-1]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session["mfa_confirmed"] = True
+    session.create()
+    return f"{settings.SESSION_COOKIE_NAME}={session.session_key}", session.session_key
+
+
+async def _request(application, path: str, cookie: str) -> int:
+    path, _, query = path.partition("?")
+    body = asyncio.Queue()
+    body.put_nowait({"type": "http.request", "body": b"", "more_body": False})
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"cookie", cookie.encode())],
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await application(scope, body.get, send)
+    return status[0] if status else 0
+
+
+def _check_status(path: str, status: int) -> None:
+    if not 200 <= status < 300:
+        raise CommandError(f"{path} answered {status}; benchmark only pages that render.")
+
+
+class Command(BaseCommand):
+    help = "Compare requests/second of the sync and async job-board views under concurrency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", action="append", dest="paths", help=f"repeatable (default: {' '.join(DEFAULT_PATHS)})")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=64)
+        parser.add_argument("--email", default="", help="user to sign in as (default: first active user)")
+        parser.add_argument("--variant", choices=["sync", "async"], help="run one variant in this process and print JSON")
+
+    def handle(self, *args, **options):
+        if options["variant"]:
+            self.stdout.write(json.dumps(self._run_variant(options)))
+            return
+
+        results = {variant: self._spawn(variant, options) for variant in ("sync", "async")}
+        self.stdout.write(
+            f"{options['requests']} requests, concurrency {options['concurrency']}, "
+            f"paths {' '.join(options['paths'] or DEFAULT_PATHS)}"
+        )
+        for variant, result in results.items():
+            self.stdout.write(latency_line(f"{variant} views", result["samples"]))
+            self.stdout.write(
+                f"{'':<28} {result['rps']:,.1f} req/s, peak RSS {result['rss_kb'] / 1024:,.1f} MiB, "
+                f"{result['threads']} threads, statuses {result['statuses']}"
+            )
+        if results["sync"]["rps"]:
+            self.stdout.write(f"async/sync throughput: {results['async']['rps'] / results['sync']['rps']:.2f}x")
+
+    def _spawn(self, variant: str, options) -> dict:
+        command = [
+            sys.executable, "-m", "django", "benchmark_async_views",
+            "--variant", variant,
+            "--requests", str(options["requests"]),
+            "--concurrency", str(options["concurrency"]),
+        ]
+        for path in options["paths"] or ():
+            command += ["--path", path]
+        if options["email"]:
+            command += ["--email", options["email"]]
+        env = {**os.environ, "ASYNC_VIEWS": str(variant == "async")}
+        completed = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(f"{variant} run failed:\n{completed.stderr}")
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def _run_variant(self, options) -> dict:
+        if settings.ASYNC_VIEWS != (options["variant"] == "async"):
+            raise CommandError("Run through the parent command, which sets ASYNC_VIEWS per variant.")
+        users = get_user_model().objects.filter(is_active=True)
+        user = users.filter(email=options["email"]).first() if options["email"] else users.order_by("pk").first()
+        if user is None:
+            raise CommandError("No user to sign in as.")
+        cookie, session_key = _signed_in_cookie(user)
+        try:
+            return asyncio.run(self._drive(options, cookie))
+        finally:
+            import_string(f"{settings.SESSION_ENGINE}.SessionStore")(session_key).delete()
+
+    async def _drive(self, options, cookie: str) -> dict:
+        from a_core.asgi import application
+
+        paths = options["paths"] or DEFAULT_PATHS
+        total, concurrency = options["requests"], options["concurrency"]
+        # one untimed pass per path to import, compile templates and fill caches
+        for path in paths:
+            _check_status(path, await _request(application, path, cookie))
+
+        samples, statuses = [], Counter()
+        peak_threads = threading.active_count()
+        issued = 0
+
+        async def client():
+            nonlocal issued, peak_threads
+            while issued < total:
+                path = paths[issued % len(paths)]
+                issued += 1
+                started = time.perf_counter()
+                status = await _request(application, path, cookie)
+                samples.append((time.perf_counter() - started) * 1000)
+                statuses[status] += 1
+                peak_threads = max(peak_threads, threading.active_count())
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+        failed = {status: count for status, count in statuses.items() if not 200 <= status < 300}
+        if failed:
+            raise CommandError(f"Non-2xx responses during the run: {failed}")
+        return {
+            "samples": samples,
+            "rps": len(samples) / wall,
+            "rss_kb": _rss_kb(),
+            "threads": peak_threads,
+            "statuses": dict(sorted(statuses.items())),
+        }
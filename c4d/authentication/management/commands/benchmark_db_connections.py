@@ -0,0 +1,107 @@
+"""
+Measure how much connection setup adds to request latency.
+
+Each iteration fires Django's request_started / request_finished signals
+around a trivial query, exactly like a request cycle, so CONN_MAX_AGE, health
+checks and the pool behave as they do under the server. The baseline, a new
+connection for every request, always runs first (in pool mode through the
+stock backend), so the configured mode is shown against it with the
+per-request setup cost it saves.
+
+    python manage.py benchmark_db_connections --iterations 500
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.utils import load_backend
+
+from authentication.management.benchmark import latency_line, percentile
+
+POOL_ENGINE = "a_core.postgresql_pool"
+STOCK_ENGINE = "django.db.backends.postgresql"
+
+
+class Command(BaseCommand):
+    help = "Compare per-request database latency with and without connection reuse."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--database", default="default")
+
+    def _run(self, alias, iterations):
+        connection = connections[alias]
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            samples.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        return samples
+
+    def _report(self, label, samples):
+        self.stdout.write(latency_line(label, samples))
+
+    def _compare(self, baseline, reused):
+        saved = percentile(baseline, 50) - percentile(reused, 50)
+        self.stdout.write(f"{'':<28} connection setup saved per request: p50 {saved:.3f} ms")
+
+    def _run_unpooled(self, alias, iterations):
+        """
+        ``_run`` with the pool swapped for the stock backend and no reuse.
+        """
+        pooled = connections[alias]
+        connections[alias] = load_backend(STOCK_ENGINE).DatabaseWrapper(
+            {**pooled.settings_dict, "ENGINE": STOCK_ENGINE, "CONN_MAX_AGE": 0}, alias
+        )
+        try:
+            return self._run(alias, iterations)
+        finally:
+            connections[alias] = pooled
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        iterations = options["iterations"]
+        settings_dict = connections[alias].settings_dict
+        configured_age = settings_dict["CONN_MAX_AGE"]
+        pooled = settings_dict["ENGINE"] == POOL_ENGINE
+
+        self.stdout.write(
+            f"{iterations} simulated requests against '{alias}' "
+            f"({settings_dict['ENGINE']}, CONN_MAX_AGE={configured_age})\n"
+        )
+
+        if not pooled:
+            # Baseline: a fresh connection for every request
+            settings_dict["CONN_MAX_AGE"] = 0
+            try:
+                baseline = self._run(alias, iterations)
+            finally:
+                settings_dict["CONN_MAX_AGE"] = configured_age
+            self._report("new connection per request", baseline)
+            if configured_age == 0:
+                return
+            persistent = self._run(alias, iterations)
+            self._report("persistent connection", persistent)
+            self._compare(baseline, persistent)
+            return
+
+        baseline = self._run_unpooled(alias, iterations)
+        self._report("new connection per request", baseline)
+        reused = self._run(alias, iterations)
+        self._report("pooled connection", reused)
+        self._compare(baseline, reused)
+        from a_core.postgresql_pool.base import get_pool
+
+        stats = get_pool(alias).stats()
+        self.stdout.write(
+            f"\npool: {stats['connections_created']} opened, {stats['checkouts']} checkouts, "
+            f"wait avg {stats['wait_avg'] * 1000:.3f} ms / max {stats['wait_max'] * 1000:.3f} ms, "
+            f"{stats['timeouts']} timeouts"
+        )
@@ -0,0 +1,152 @@
+"""
+Fan-out benchmark for the live-update channel layer.
+
+Opens ``--connections`` subscriptions spread over ``--users`` user groups
+(as one event loop of an ASGI worker would hold them), then publishes from
+a worker thread the way a sync view does, through ``layer.publish`` (so
+``--layer authentication.realtime.PostgresChannelLayer`` goes through
+pg_notify and the LISTEN thread): ``--events`` events to single users, then
+``--broadcasts`` events to every user. Reports delivery latency from publish
+to the connection's queue, deliveries per second and memory per connection.
+
+    python manage.py benchmark_realtime --connections 3000 --users 1000 --events 2000
+"""
+
+import asyncio
+import random
+import resource
+import time
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from authentication.management.benchmark import latency_line
+from authentication.realtime import InMemoryChannelLayer, user_group
+
+
+def _rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Command(BaseCommand):
+    help = "Measure channel-layer fan-out to many concurrent connections."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=3000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--events", type=int, default=2000, help="events to single users")
+        parser.add_argument("--broadcasts", type=int, default=20, help="events to every user")
+        parser.add_argument(
+            "--layer",
+            default="",
+            help="dotted path of the layer class (default: in-process layer, no database)",
+        )
+
+    def handle(self, *args, **options):
+        layer = import_string(options["layer"])() if options["layer"] else InMemoryChannelLayer()
+        results = asyncio.run(self._run(layer, options))
+        connections, users = options["connections"], options["users"]
+        self.stdout.write(
+            f"{type(layer).__name__}: {connections} connections over {users} users, "
+            f"{results['subscribe_ms']:.1f} ms to subscribe, "
+            f"~{results['rss_kb'] * 1024 / connections:,.0f} bytes per connection"
+        )
+        for phase in ("targeted", "broadcast"):
+            samples, wall, deliveries = results[phase]
+            if not samples:
+                continue
+            self.stdout.write(latency_line(f"{phase} delivery", samples))
+            self.stdout.write(f"{'':<28} {deliveries:,} deliveries in {wall:.2f}s ({deliveries / wall:,.0f}/s)")
+        if results["dropped"]:
+            self.stdout.write(self.style.WARNING(f"{results['dropped']} connection(s) overflowed and were resynced"))
+
+    async def _run(self, layer, options):
+        connections, users = options["connections"], options["users"]
+        loop = asyncio.get_running_loop()
+        rss_before = _rss_kb()
+        with ExitStack() as stack:
+            started = time.perf_counter()
+            subscriptions = [
+                stack.enter_context(layer.subscribe([user_group(index % users)], maxsize=10_000))
+                for index in range(connections)
+            ]
+            subscribe_ms = (time.perf_counter() - started) * 1000
+            results = {"subscribe_ms": subscribe_ms, "rss_kb": max(_rss_kb() - rss_before, 0)}
+            await self._wait_until_listening(loop, layer, subscriptions)
+
+            targets = [random.randrange(users) for _ in range(options["events"])]
+            results["targeted"] = await self._phase(
+                loop, layer, subscriptions, [[user] for user in targets],
+            )
+            everyone = list(range(users))
+            results["broadcast"] = await self._phase(
+                loop, layer, subscriptions, [everyone] * options["broadcasts"],
+            )
+            results["dropped"] = sum(subscription.overflowed for subscription in subscriptions)
+        return results
+
+    async def _wait_until_listening(self, loop, layer, subscriptions, timeout: float = 10.0):
+        """
+        Publish probes to the first subscription's group until one arrives;
+        a cross-process layer starts listening in the background.
+        """
+        probed = subscriptions[0]
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            await loop.run_in_executor(None, self._publish, layer, probed.groups, {"type": "probe"})
+            if await probed.get(timeout=0.5) is not None:
+                # drop probes still in flight, on every member of the group
+                await asyncio.sleep(0.5)
+                for subscription in subscriptions:
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                return
+        raise CommandError(f"{type(layer).__name__} delivered nothing within {timeout:.0f}s")
+
+    @staticmethod
+    def _publish(layer, groups, event):
+        try:
+            for group in groups:
+                layer.publish(group, event)
+        finally:
+            # executor threads keep their own connections
+            connections.close_all()
+
+    async def _phase(self, loop, layer, subscriptions, recipients):
+        """
+        Publish one event per entry of ``recipients`` (a list of user
+        indexes) from a thread and wait until every copy has been received.
+        """
+        expected = sum(layer.group_size(user_group(user)) for users in recipients for user in users)
+        if not expected:
+            return [], 0.0, 0
+        samples = []
+        done = asyncio.Event()
+
+        async def consume(subscription):
+            while True:
+                event = await subscription.queue.get()
+                samples.append((time.perf_counter() - event["sent"]) * 1000)
+                if len(samples) >= expected:
+                    done.set()
+
+        def produce():
+            try:
+                for users in recipients:
+                    event = {"type": "benchmark", "sent": time.perf_counter()}
+                    for user in users:
+                        layer.publish(user_group(user), event)
+            finally:
+                connections.close_all()
+
+        consumers = [asyncio.ensure_future(consume(subscription)) for subscription in subscriptions]
+        started = time.perf_counter()
+        await loop.run_in_executor(None, produce)
+        await done.wait()
+        wall = time.perf_counter() - started
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        return samples, wall, expected
@@ -0,0 +1,68 @@
+"""
+Compare the per-request cost of the session engines.
+
+Each iteration is what SessionMiddleware does around a typical view here:
+load the session by key, read the auth/MFA flags, re-assign ``mfa_confirmed``
+(the dashboard does this on every hit) and save if modified.
+
+    python manage.py benchmark_sessions --iterations 500
+"""
+
+import time
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+
+from authentication.management.benchmark import latency_line
+from authentication.querybudget import count_queries
+
+ENGINES = [
+    ("db", "django.contrib.sessions.backends.db"),
+    ("cached_db", "django.contrib.sessions.backends.cached_db"),
+    ("cached_db + coalescing", "authentication.session_store"),
+    ("signed_cookies", "django.contrib.sessions.backends.signed_cookies"),
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark session load/save cost per request for each session engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def _seed(self, store_class):
+        session = store_class()
+        session.update({
+            "_auth_user_id": "1",
+            "_auth_user_backend": "django.contrib.auth.backends.ModelBackend",
+            "mfa_confirmed": True,
+        })
+        session.save()
+        return session
+
+    def _run(self, store_class, iterations):
+        session = self._seed(store_class)
+        # signed cookies carry the data in the "key"
+        key = session.session_key
+        samples, queries = [], 0
+        for _ in range(iterations):
+            with count_queries() as counter:
+                started = time.perf_counter()
+                session = store_class(key)
+                session.get("_auth_user_id")
+                session["mfa_confirmed"] = True
+                if session.modified:
+                    session.save()
+                    key = session.session_key
+                samples.append((time.perf_counter() - started) * 1000)
+            queries += len(counter)
+        session.delete()
+        return samples, queries / iterations
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        self.stdout.write(f"{iterations} simulated requests per engine\n")
+        for label, engine in ENGINES:
+            store_class = import_module(engine).SessionStore
+            samples, queries = self._run(store_class, iterations)
+            self.stdout.write(f"{latency_line(label, samples)}   {queries:4.2f} queries/request")
@@ -0,0 +1,64 @@
+"""
+HTTP throughput benchmark for comparing serving setups, e.g. runserver on
+:8009 against the gunicorn `app` profile on :8010.
+
+    python manage.py benchmark_throughput http://localhost:8009/ --requests 2000 --concurrency 32
+    python manage.py benchmark_throughput http://localhost:8010/ --requests 2000 --concurrency 32
+"""
+
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from authentication.management.benchmark import latency_line
+
+
+class Command(BaseCommand):
+    help = "Fire concurrent GET requests at a URL and report requests/second and latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("url")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--timeout", type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        url = options["url"]
+        total = options["requests"]
+        timeout = options["timeout"]
+        samples = []
+        errors = []
+        lock = threading.Lock()
+
+        def fetch(_):
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    response.read()
+                    ok = response.status < 500
+            except urllib.error.HTTPError as exc:
+                ok = exc.code < 500
+            except (urllib.error.URLError, OSError) as exc:
+                with lock:
+                    errors.append(str(exc))
+                return
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                if ok:
+                    samples.append(elapsed)
+                else:
+                    errors.append("5xx")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            list(pool.map(fetch, range(total)))
+        wall = time.perf_counter() - started
+
+        self.stdout.write(f"{url}: {total} requests, concurrency {options['concurrency']}")
+        if samples:
+            self.stdout.write(latency_line("latency", samples))
+        self.stdout.write(f"throughput {len(samples) / wall:,.1f} req/s over {wall:.2f}s, {len(errors)} errors")
@@ -0,0 +1,43 @@
+"""
+Subset the icon fonts to the icons the templates use and trim the
+stylesheets that inline them (authentication.iconfonts).
+
+    python manage.py build_icon_fonts
+    python manage.py build_icon_fonts -v 2    # list the icons kept
+
+Also run by ``collectstatic`` when ``ICON_FONT_BUILD_ON_COLLECTSTATIC`` is on.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.iconfonts import IconFontError, build_icon_fonts
+
+
+def _kib(size: int) -> str:
+    return f"{size / 1024:,.1f} KiB"
+
+
+class Command(BaseCommand):
+    help = "Write icon-font subsets and trimmed CSS for the icons used in templates."
+
+    def handle(self, *args, **options):
+        try:
+            results, trims = build_icon_fonts()
+        except IconFontError as exc:
+            raise CommandError(str(exc))
+
+        for result in results:
+            fonts = sum(size for _name, size, _source in result.fonts)
+            source_fonts = sum(source for _name, _size, source in result.fonts)
+            self.stdout.write(
+                f"{result.static_name}: {len(result.icons)} of {result.total_icons} icons on {result.pages} pages, "
+                f"CSS {_kib(result.source_css_size)} -> {_kib(result.css_size)}, "
+                f"fonts {_kib(source_fonts)} -> {_kib(fonts)}"
+            )
+            if options["verbosity"] > 1:
+                self.stdout.write("    " + " ".join(result.icons))
+        for trim in trims:
+            self.stdout.write(
+                f"{trim.static_name}: {trim.stylesheet} without {trim.removed_rules:,} icon-font rules, "
+                f"{_kib(trim.source_size)} -> {_kib(trim.size)}"
+            )
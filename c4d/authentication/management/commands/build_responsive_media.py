@@ -0,0 +1,55 @@
+"""
+Write the responsive image derivatives and video posters
+(authentication.responsive). Only missing or stale files are encoded.
+
+    python manage.py build_responsive_media
+    python manage.py build_responsive_media --jobs 4 -v 2    # per-image sizes
+
+Also run by ``collectstatic`` when ``RESPONSIVE_BUILD_ON_COLLECTSTATIC`` is on.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.responsive import ResponsiveError, build_derivatives
+
+
+def _kib(size: int) -> str:
+    return f"{size / 1024:,.1f} KiB"
+
+
+class Command(BaseCommand):
+    help = "Generate WebP/AVIF images at several widths and video poster frames."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=0, help="encoder threads (default: one per CPU)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            result = build_derivatives(jobs=options["jobs"] or None)
+        except ResponsiveError as exc:
+            raise CommandError(str(exc))
+
+        originals = smallest = 0
+        for image in result.images:
+            # what a browser with the best format fetches at full width
+            best = min((variants[-1][2] for variants in image.sources.values()), default=image.size)
+            originals += image.size
+            smallest += best
+            if options["verbosity"] > 1:
+                formats = ", ".join(
+                    f"{name} {len(variants)}x up to {_kib(variants[-1][2])}" for name, variants in image.sources.items()
+                ) or "original only"
+                self.stdout.write(f"    {image.name} {image.width}x{image.height} {_kib(image.size)}: {formats}")
+        for video, poster in result.posters.items():
+            self.stdout.write(f"{video}: poster {poster}")
+        if result.skipped_posters:
+            self.stdout.write(self.style.WARNING(
+                f"No ffmpeg (FFMPEG_BINARY): no poster for {', '.join(result.skipped_posters)}"
+            ))
+        self.stdout.write(
+            f"{len(result.images)} images, {result.written} derivatives written in "
+            f"{time.perf_counter() - started:.1f}s; full-width bytes {_kib(originals)} -> {_kib(smallest)}"
+        )
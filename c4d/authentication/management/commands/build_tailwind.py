@@ -0,0 +1,51 @@
+"""
+Build the per-layout Tailwind bundles (authentication.tailwind) and fail
+when one is over the size budget.
+
+    python manage.py build_tailwind
+    python manage.py build_tailwind --bundle account --budget 30000
+
+Also run by ``collectstatic`` when ``TAILWIND_BUILD_ON_COLLECTSTATIC`` is on.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.tailwind import TailwindError, build_bundles
+
+
+class Command(BaseCommand):
+    help = "Build purged, minified Tailwind CSS bundles per layout and enforce the size budget."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bundle", action="append", dest="bundles", help="repeatable (default: TAILWIND_BUNDLES)")
+        parser.add_argument(
+            "--budget",
+            type=int,
+            default=getattr(settings, "TAILWIND_BUNDLE_BUDGET", 0),
+            help="maximum minified bytes per bundle, 0 for none (default: TAILWIND_BUNDLE_BUDGET)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            results = build_bundles(options["bundles"])
+        except TailwindError as exc:
+            raise CommandError(str(exc))
+
+        budget = options["budget"]
+        over = []
+        for result in results:
+            line = (
+                f"{result.static_name}: {result.size:,} bytes minified, {result.gzip_size:,} gzipped, "
+                f"{len(result.pages)} pages from {result.sources} sources, hash {result.digest}"
+            )
+            if budget and result.size > budget:
+                over.append(result)
+                self.stdout.write(self.style.ERROR(f"{line} (over budget by {result.size - budget:,} bytes)"))
+            else:
+                self.stdout.write(line)
+        if over:
+            raise CommandError(
+                f"{len(over)} Tailwind bundle(s) over the {budget:,}-byte budget: "
+                + ", ".join(result.name for result in over)
+            )
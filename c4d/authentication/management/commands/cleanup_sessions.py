@@ -0,0 +1,33 @@
+"""
+Delete expired sessions in batches.
+
+Unlike ``clearsessions`` this never issues one unbounded DELETE, so it can
+run from cron against a large session table without long locks.
+
+    python manage.py cleanup_sessions --batch-size 5000
+"""
+
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.management.base import BaseCommand
+
+from authentication.session_store import SessionStore as CoalescingStore
+
+
+class Command(BaseCommand):
+    help = "Remove expired session rows in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        engine = import_module(settings.SESSION_ENGINE)
+        if not issubclass(engine.SessionStore, DBStore):
+            self.stdout.write(f"{settings.SESSION_ENGINE} keeps no session rows; nothing to do.")
+            return
+        started = time.perf_counter()
+        removed = CoalescingStore.clear_expired(batch_size=options["batch_size"])
+        self.stdout.write(f"Removed {removed} expired session(s) in {time.perf_counter() - started:.2f}s.")
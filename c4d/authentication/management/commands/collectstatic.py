@@ -0,0 +1,267 @@
+"""
+``collectstatic`` that builds the Tailwind bundles, the icon-font subsets and
+the responsive image derivatives first, so the collected (and, under
+STATIC_PIPELINE, hashed and compressed) assets are never stale. A bundle
+over budget fails the collection.
+
+``--incremental`` (default ``STATIC_INCREMENTAL``) keeps a content-hash
+index of the sources in ``STATIC_ROOT`` (authentication.staticfiles
+``SourceIndex``) and copies only the files whose content changed since the
+last run, on ``STATIC_WORKERS`` threads. Under the pipeline, unchanged files
+keep their hashed copies and compressed variants; with nothing changed,
+post-processing is skipped altogether. Every run ends with per-phase
+timings, which the index also records.
+
+``--prune`` (default ``STATIC_PRUNE``, off) also deletes outputs that no
+source produces any more. The previous run's hashed files and their
+compressed variants are kept for one more generation, so pages rendered
+before the deploy still find their assets.
+
+    python manage.py collectstatic --noinput --incremental
+    python manage.py collectstatic --noinput --incremental --workers 8 --prune
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.contrib.staticfiles.management.commands.collectstatic import Command as CollectStaticCommand
+from django.core.management import call_command
+
+from authentication.staticfiles import ENCODINGS, INDEX_NAME, STATIC_WORKERS, SourceIndex, prune
+
+# (option dest, command, timing label), run in this order
+BUILD_STEPS = [
+    ("tailwind", "build_tailwind", "tailwind"),
+    ("icon_fonts", "build_icon_fonts", "icon fonts"),
+    ("responsive", "build_responsive_media", "responsive"),
+]
+
+
+class Command(CollectStaticCommand):
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--no-tailwind",
+            action="store_false",
+            dest="tailwind",
+            default=getattr(settings, "TAILWIND_BUILD_ON_COLLECTSTATIC", False),
+            help="do not build the Tailwind bundles first",
+        )
+        parser.add_argument(
+            "--no-icon-fonts",
+            action="store_false",
+            dest="icon_fonts",
+            default=getattr(settings, "ICON_FONT_BUILD_ON_COLLECTSTATIC", False),
+            help="do not subset the icon fonts first",
+        )
+        parser.add_argument(
+            "--no-responsive",
+            action="store_false",
+            dest="responsive",
+            default=getattr(settings, "RESPONSIVE_BUILD_ON_COLLECTSTATIC", False),
+            help="do not generate the responsive image derivatives first",
+        )
+        parser.add_argument(
+            "--incremental",
+            action=argparse.BooleanOptionalAction,
+            default=getattr(settings, "STATIC_INCREMENTAL", False),
+            help="only copy and process files whose content changed",
+        )
+        parser.add_argument("--workers", type=int, default=0, help="threads for hashing, copying and compressing (default: STATIC_WORKERS)")
+        parser.add_argument(
+            "--prune",
+            action=argparse.BooleanOptionalAction,
+            default=getattr(settings, "STATIC_PRUNE", False),
+            help="with --incremental, delete outputs older than the previous run's",
+        )
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+    def handle(self, **options):
+        started = time.perf_counter()
+        self.timings = {}
+        self.incremental = options["incremental"]
+        self.workers = options["workers"] or STATIC_WORKERS
+        self.prune_outputs = options["prune"]
+        self.index = None
+        self.pruned = []
+        for dest, command, label in BUILD_STEPS:
+            if options[dest] and not options["dry_run"]:
+                with self.phase(label):
+                    call_command(command, verbosity=options["verbosity"], stdout=self.stdout, stderr=self.stderr)
+
+        summary = super().handle(**options)
+        self.timings["total"] = time.perf_counter() - started
+        if self.index is not None and not self.dry_run:
+            self.index.save(self.fingerprints, self.timings)
+        if options["verbosity"] < 1:
+            return summary
+        lines = [summary or ""]
+        if self.pruned:
+            lines.append(f"{len(self.pruned)} stale output{'' if len(self.pruned) == 1 else 's'} pruned.")
+        lines.append("Timings: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.timings.items()))
+        return "\n".join(lines)
+
+    def collect(self):
+        if hasattr(self.storage, "workers"):
+            self.storage.workers = self.workers
+        if self.incremental and not self.symlink and self.is_local_storage():
+            return self.collect_incremental()
+        if self.incremental:
+            self.log("--incremental needs a local destination and copies, not links; collecting everything.", level=1)
+        with self.phase("collect"):
+            collected = super().collect()
+        self._storage_timings(nested_in="collect")
+        return collected
+
+    def _storage_timings(self, nested_in=None):
+        storage_timings = getattr(self.storage, "timings", {})
+        for name, seconds in storage_timings.items():
+            self.timings[name] = seconds
+            if nested_in:
+                # keep the phases additive
+                self.timings[nested_in] -= seconds
+
+    # ---------- INCREMENTAL ---------- #
+
+    def collect_incremental(self):
+        if self.clear:
+            with self.phase("clear"):
+                self.clear_dir("")
+        storage_class = type(self.storage._wrapped if hasattr(self.storage, "_wrapped") else self.storage)
+        self.index = SourceIndex.load(
+            os.path.join(self.storage.location, INDEX_NAME),
+            f"{storage_class.__module__}.{storage_class.__qualname__}",
+        )
+
+        with self.phase("scan"):
+            found_files = self.find_files()
+            names = list(found_files)
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                fingerprints = pool.map(
+                    lambda name: self.index.fingerprint(name, found_files[name][0].path(found_files[name][1])),
+                    names,
+                )
+                self.fingerprints = dict(zip(names, fingerprints))
+            changed = [
+                name for name in names
+                if self.fingerprints[name][0] != self.index.digest(name) or not self.storage.exists(name)
+            ]
+            removed = set(self.index.sources) - set(found_files)
+
+        with self.phase("copy"):
+            if self.dry_run:
+                for name in changed:
+                    self.log(f"Pretending to copy '{found_files[name][0].path(found_files[name][1])}'", level=1)
+            else:
+                with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                    list(pool.map(lambda name: self.replace_file(name, *found_files[name]), changed))
+        self.copied_files = changed
+        changed_set = set(changed)
+        self.unmodified_files = [name for name in names if name not in changed_set]
+
+        hashed = hasattr(self.storage, "load_manifest")
+        previous = self.storage.load_manifest()[0] if hashed else {}
+        if self.post_process and hasattr(self.storage, "post_process"):
+            if hashed and previous and not changed and not removed:
+                self.log("Nothing changed; keeping the manifest and post-processed files.", level=1)
+            else:
+                if hashed:
+                    self.storage.unchanged = self.reusable(found_files, changed_set, previous)
+                self.run_post_process(found_files)
+                self._storage_timings()
+
+        if self.prune_outputs:
+            with self.phase("prune"):
+                # the previous generation stays for pages rendered before this run
+                outputs = set(previous.values())
+                if hashed:
+                    outputs |= set(self.storage.hashed_files.values())
+                self.pruned = prune(self.storage.location, self.expected_outputs(found_files, outputs), self.dry_run)
+            for name in self.pruned:
+                self.log(f"{'Pretending to prune' if self.dry_run else 'Pruned'} '{name}'", level=2)
+
+        return {
+            "modified": self.copied_files,
+            "unmodified": self.unmodified_files,
+            "post_processed": self.post_processed_files,
+        }
+
+    def find_files(self) -> dict:
+        """
+        Destination path -> (source storage, path), first finder wins, as in
+        ``collect``.
+        """
+        found_files = {}
+        for finder in get_finders():
+            for path, storage in finder.list(self.ignore_patterns):
+                if getattr(storage, "prefix", None):
+                    prefixed_path = os.path.join(storage.prefix, path)
+                else:
+                    prefixed_path = path
+                if prefixed_path not in found_files:
+                    found_files[prefixed_path] = (storage, path)
+                else:
+                    self.log(
+                        f"Found another file with the destination path '{prefixed_path}'. It will be ignored "
+                        "since only the first encountered file is collected.",
+                        level=1,
+                    )
+        return found_files
+
+    def replace_file(self, prefixed_path, source_storage, path):
+        self.log(f"Copying '{source_storage.path(path)}'", level=2)
+        if self.storage.exists(prefixed_path):
+            # save() would pick a new name next to the old file
+            self.storage.delete(prefixed_path)
+        with source_storage.open(path) as source_file:
+            self.storage.save(prefixed_path, source_file)
+
+    def reusable(self, found_files, changed, previous) -> dict[str, str]:
+        """
+        Unchanged files whose hashed copy from the last run is still there.
+        """
+        reusable = {}
+        for name in found_files:
+            if name in changed:
+                continue
+            hashed_name = previous.get(self.storage.hash_key(self.storage.clean_name(name)))
+            if hashed_name and self.storage.exists(hashed_name):
+                reusable[name] = hashed_name
+        return reusable
+
+    def run_post_process(self, found_files):
+        # as in collect(), which does not let the file list be passed in
+        processor = self.storage.post_process(found_files, dry_run=self.dry_run)
+        for original_path, processed_path, processed in processor:
+            if isinstance(processed, Exception):
+                self.stderr.write(f"Post-processing '{original_path}' failed!")
+                self.stderr.write()
+                raise processed
+            if processed:
+                self.log(f"Post-processed '{original_path}' as '{processed_path}'", level=2)
+                self.post_processed_files.append(original_path)
+            else:
+                self.log(f"Skipped post-processing '{original_path}'")
+
+    def expected_outputs(self, found_files, hashed_names) -> set[str]:
+        expected = {name.replace(os.sep, "/") for name in found_files}
+        expected |= {INDEX_NAME}
+        for name in hashed_names:
+            expected.add(name)
+            expected.update(name + suffix for _encoding, suffix in ENCODINGS)
+        manifest_name = getattr(self.storage, "manifest_name", None)
+        if manifest_name:
+            expected.add(manifest_name)
+        return expected
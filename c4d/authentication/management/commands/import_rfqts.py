@@ -0,0 +1,52 @@
+"""
+Bulk-load RFQTs and their jobs from a CSV or XLSX export.
+
+    python manage.py import_rfqts rfqts.xlsx --batch-size 1000
+    python manage.py import_rfqts rfqts.csv --dry-run
+
+See authentication.importer for the column layout.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.importer import (
+    DEFAULT_BATCH_SIZE, ImportFormatError, detect_format, import_rfqts,
+)
+
+
+class Command(BaseCommand):
+    help = "Import RFQTs (matched on rfqts_no) and derived jobs from CSV/XLSX."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "xlsx"], default=None,
+                            help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing.")
+        parser.add_argument("--max-errors", type=int, default=50, help="Row errors to print.")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or detect_format(options["path"])
+        verbosity = options["verbosity"]
+
+        def progress(result):
+            if verbosity > 1:
+                self.stdout.write(f"  ... {result.rows} rows, {len(result.errors)} rejected")
+
+        try:
+            with open(options["path"], "rb") as fileobj:
+                result = import_rfqts(
+                    fileobj, fmt,
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                    progress=progress,
+                )
+        except (OSError, ImportFormatError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors[:options["max_errors"]]:
+            self.stderr.write(str(error))
+        if len(result.errors) > options["max_errors"]:
+            self.stderr.write(f"... and {len(result.errors) - options['max_errors']} more")
+        prefix = "[dry run] " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(prefix + result.summary()))
@@ -0,0 +1,63 @@
+"""
+Finish upload post-processing the worker pool did not get to (e.g. after a
+restart), finish uploads whose last request died while storing the file and
+clear out abandoned partial uploads.
+
+    python manage.py process_uploads --retry-failed --stale-hours 24
+"""
+
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from authentication.models import StoredFile, UploadSession
+from authentication.uploads import complete_upload, process_stored_file, temp_path
+
+
+class Command(BaseCommand):
+    help = "Process pending uploaded files and delete stale partial uploads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retry-failed", action="store_true", help="Also re-run files whose processing failed.")
+        parser.add_argument("--stale-hours", type=int, default=24, help="Drop unfinished uploads idle for this long.")
+
+    def handle(self, *args, **options):
+        statuses = ["pending", "failed"] if options["retry_failed"] else ["pending"]
+        # rows left in "processing" by a worker that died mid-way (a retried
+        # old file is only stuck an hour after its latest run started)
+        stuck_before = timezone.now() - timedelta(hours=1)
+        StoredFile.objects.filter(processing_status="processing").filter(
+            Q(processing_started__lt=stuck_before) | Q(processing_started__isnull=True)
+        ).update(processing_status="pending")
+
+        assembled = 0
+        for session in UploadSession.objects.filter(status="assembling", updated__lt=stuck_before).iterator():
+            if os.path.exists(temp_path(session)):
+                complete_upload(session)
+                assembled += 1
+            else:
+                UploadSession.objects.filter(pk=session.pk).update(status="failed")
+
+        processed = 0
+        for pk in StoredFile.objects.filter(processing_status__in=statuses).values_list("pk", flat=True).iterator():
+            StoredFile.objects.filter(pk=pk, processing_status="failed").update(processing_status="pending")
+            process_stored_file(pk)
+            processed += 1
+
+        cutoff = timezone.now() - timedelta(hours=options["stale_hours"])
+        stale = UploadSession.objects.filter(status="uploading", updated__lt=cutoff)
+        removed = 0
+        for session in stale.iterator():
+            try:
+                os.remove(temp_path(session))
+            except FileNotFoundError:
+                pass
+            removed += 1
+        stale.update(status="failed")
+
+        self.stdout.write(
+            f"Assembled {assembled} upload(s); processed {processed} file(s); expired {removed} stale upload(s)."
+        )
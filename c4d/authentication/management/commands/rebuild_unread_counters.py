@@ -0,0 +1,23 @@
+"""
+Recount every user's unread messages into ``UnreadMessageCounter``.
+
+The counters are kept in step by ``Message.save`` and ``inbox.mark_read``;
+run this after changing messages with raw SQL or restoring a dump.
+
+    python manage.py rebuild_unread_counters
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from authentication.inbox import rebuild_all_unread_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-user unread message counters."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_all_unread_counters()
+        self.stdout.write(f"Rebuilt {written} counter(s) in {time.perf_counter() - started:.2f}s.")
@@ -0,0 +1,45 @@
+"""
+Deliver the outbound mail queue.
+
+    python manage.py send_queued_mail               # drain once
+    python manage.py send_queued_mail --loop        # long-running worker
+    python manage.py send_queued_mail --purge-days 30
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from authentication.mail import BATCH_SIZE, deliver_queued
+from authentication.models import OutboundEmail
+
+
+class Command(BaseCommand):
+    help = "Send queued outbound email in batches over a reused connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new mail.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--backend", default=None, help="Delivery backend override (dotted path).")
+        parser.add_argument("--purge-days", type=int, default=None, help="Delete sent mail older than this.")
+
+    def handle(self, *args, **options):
+        if options["purge_days"] is not None:
+            cutoff = timezone.now() - timedelta(days=options["purge_days"])
+            deleted, _ = OutboundEmail.objects.filter(status="sent", sent_at__lt=cutoff).delete()
+            self.stdout.write(f"Purged {deleted} sent message(s).")
+
+        while True:
+            close_old_connections()
+            stats = deliver_queued(options["batch_size"], options["backend"])
+            if any(stats.values()):
+                self.stdout.write(
+                    f"sent {stats['sent']}, deferred {stats['deferred']}, failed {stats['failed']}"
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,160 @@
+"""
+Bytes on the wire for the static assets of a few pages, before and after
+the static pipeline (authentication.staticfiles).
+
+Each page is rendered through the test client. Its stylesheets, scripts,
+images and icons under ``STATIC_URL`` are collected, together with the
+images those stylesheets reference and, per font, the one format a modern
+browser would pick. For every asset the report compares:
+
+* before: the source file as the default storage serves it, uncompressed,
+  revalidated on every visit
+* after: the hashed copy in ``STATIC_ROOT`` in the smallest variant a
+  browser accepts (brotli, else gzip), cached as immutable
+
+Run ``collectstatic`` with ``STATIC_PIPELINE=True`` first.
+
+    python manage.py static_report / /accounts/login/
+    python manage.py static_report /auth/jobs/ --email someone@example.com
+"""
+
+import json
+import os
+import posixpath
+import re
+from urllib.parse import unquote, urljoin, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from authentication.staticfiles import StaticFileIndex
+
+_ASSET_ATTR_RE = re.compile(r"""<(?:link|script|img|source|video)\b[^>]*?\b(?:href|src)\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+_CSS_URL_RE = re.compile(r"""url\(\s*["']?([^"')]+?)["']?\s*\)""")
+# a browser downloads the first @font-face format it supports
+FONT_PREFERENCE = [".woff2", ".woff", ".ttf", ".otf", ".eot", ".svg"]
+
+
+def _static_name(url: str) -> str | None:
+    path = unquote(urlsplit(url).path)
+    if not path.startswith(settings.STATIC_URL):
+        return None
+    return path[len(settings.STATIC_URL):]
+
+
+def _fmt(size: int) -> str:
+    return f"{size / 1024:,.1f} KiB"
+
+
+class Command(BaseCommand):
+    help = "Compare static bytes per page before and after the precompressed, hashed pipeline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*", default=["/"])
+        parser.add_argument("--email", default="", help="sign in as this user (MFA confirmed) to fetch the pages")
+        parser.add_argument("--verbose-assets", action="store_true", help="list every asset")
+
+    def handle(self, *args, **options):
+        index = StaticFileIndex()
+        manifest_path = os.path.join(index.root, ManifestStaticFilesStorage.manifest_name)
+        try:
+            with open(manifest_path, encoding="utf-8") as handle:
+                manifest = json.load(handle)["paths"]
+        except (OSError, ValueError, KeyError):
+            raise CommandError(f"No manifest at {manifest_path}; run collectstatic with STATIC_PIPELINE=True first.")
+        self.manifest = manifest
+        self.originals = {hashed: original for original, hashed in manifest.items()}
+        self.index = index
+
+        client = Client(raise_request_exception=False)
+        if options["email"]:
+            user = get_user_model().objects.filter(email=options["email"]).first()
+            if user is None:
+                raise CommandError(f"No user {options['email']}")
+            client.force_login(user)
+            session = client.session
+            session["mfa_confirmed"] = True
+            session.save()
+
+        totals = [0, 0, 0, 0]
+        for path in options["paths"]:
+            response = client.get(path)
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f"{path}: HTTP {response.status_code}, skipped"))
+                continue
+            rows = [self._measure(name) for name in self._assets(response.content.decode("utf-8", "replace"))]
+            rows = [row for row in rows if row is not None]
+            before = sum(row[1] for row in rows)
+            after_br = sum(row[2] for row in rows)
+            after_gzip = sum(row[3] for row in rows)
+            revalidated = sum(1 for row in rows if not row[4])
+            self.stdout.write(
+                f"{path}: {len(rows)} assets, before {_fmt(before)} ({len(rows)} requests on every visit), "
+                f"after {_fmt(after_br)} br / {_fmt(after_gzip)} gzip "
+                f"({revalidated} requests on repeat visits)"
+            )
+            if options["verbose_assets"]:
+                for name, size, br, gz, immutable in sorted(rows, key=lambda row: -row[1]):
+                    flag = "" if immutable else "  (not hashed)"
+                    self.stdout.write(f"    {name:<70} {_fmt(size):>12} -> {_fmt(br):>12}{flag}")
+            for position, value in enumerate((before, after_br, after_gzip, len(rows))):
+                totals[position] += value
+
+        if len(options["paths"]) > 1 and totals[3]:
+            saved = 1 - totals[1] / totals[0] if totals[0] else 0
+            self.stdout.write(
+                f"all pages: before {_fmt(totals[0])}, after {_fmt(totals[1])} br / "
+                f"{_fmt(totals[2])} gzip ({saved:.0%} fewer bytes on a first visit)"
+            )
+
+    def _original(self, name: str) -> str:
+        return self.originals.get(name, name)
+
+    def _assets(self, html: str) -> list[str]:
+        """
+        Original names of the page's static assets and of the files its
+        stylesheets reference, in first-seen order.
+        """
+        seen = {}
+        for url in _ASSET_ATTR_RE.findall(html):
+            name = _static_name(url)
+            if name is not None:
+                seen.setdefault(self._original(name), None)
+        for name in [name for name in seen if name.endswith(".css")]:
+            source = finders.find(name)
+            if not source:
+                continue
+            with open(source, encoding="utf-8", errors="replace") as handle:
+                css = handle.read()
+            fonts = {}
+            for reference in _CSS_URL_RE.findall(css):
+                if reference.startswith(("data:", "http:", "https:", "//", "#")):
+                    continue
+                target = posixpath.normpath(urljoin(name, urlsplit(reference).path))
+                stem, extension = posixpath.splitext(target)
+                if extension in FONT_PREFERENCE and "/fonts/" in f"/{target}":
+                    fonts.setdefault(stem, []).append(target)
+                else:
+                    seen.setdefault(target, None)
+            for variants in fonts.values():
+                seen.setdefault(min(variants, key=lambda target: FONT_PREFERENCE.index(posixpath.splitext(target)[1])), None)
+        return list(seen)
+
+    def _measure(self, name: str):
+        """
+        (name, bytes before, bytes after with brotli, bytes after with gzip,
+        cached as immutable) or None when the file does not exist.
+        """
+        source = finders.find(name)
+        hashed = self.manifest.get(name, name)
+        entry = self.index.get(hashed)
+        if not source or entry is None:
+            return None
+        sizes = {encoding: size for encoding, _path, size in entry.variants}
+        after_gzip = sizes.get("gzip", entry.size)
+        after_br = min(sizes.get("br", after_gzip), after_gzip)
+        return name, os.path.getsize(source), after_br, after_gzip, entry.immutable
@@ -1,10 +1,28 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.utils.translation import gettext_lazy as _
 
+
+def normalize_email(email) -> str:
+    """
+    The stored form of an address: trimmed and lower-cased throughout, as
+    allauth stores ``EmailAddress.email``. Equality lookups on the result
+    hit the unique index instead of scanning with ``iexact``.
+    """
+    return (email or "").strip().lower()
+
+
 class CustomUserManager(BaseUserManager):
 
     # Custom user model manager where email is the unique identifier 
 
+    @classmethod
+    def normalize_email(cls, email):
+        return normalize_email(email)
+
+    def get_by_natural_key(self, username):
+        # login form input may differ in case from the stored address
+        return self.get(**{self.model.USERNAME_FIELD: normalize_email(username)})
+
     def create_user(self, email, password, **extra_fields):
         if not email:
             raise ValueError(_("Email must be set"))
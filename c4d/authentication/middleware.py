@@ -0,0 +1,76 @@
+"""
+Project middleware.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.functional import SimpleLazyObject
+
+from .access import resolve_access_state
+from .staticfiles import static_index, static_response
+
+
+class AccessStateMiddleware:
+    """
+    Attach ``request.access`` (see authentication.access). Must come after
+    the session and authentication middleware. Runs natively in both
+    modes, so async views do not pay a thread hop for it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.access = SimpleLazyObject(lambda: resolve_access_state(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        request.access = SimpleLazyObject(lambda: resolve_access_state(request))
+        return await self.get_response(request)
+
+
+class StaticFilesMiddleware:
+    """
+    Serve ``STATIC_ROOT`` when ``STATIC_SERVE`` is on (see
+    authentication.staticfiles). Place it right after SecurityMiddleware so
+    asset requests skip sessions, auth and CSRF. The file index is built
+    when the middleware is, at worker startup, not on a request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "STATIC_SERVE", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # walk STATIC_ROOT now rather than on the first (possibly async) request
+        static_index.files
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = static_response(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        if not static_index.loaded:
+            # cleared since startup; the walk must not block the event loop
+            await sync_to_async(lambda: static_index.files)()
+        # an in-memory index lookup, no need for a thread
+        response = static_response(request, asynchronous=True)
+        if response is None:
+            response = await self.get_response(request)
+        return response
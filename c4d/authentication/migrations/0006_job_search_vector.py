@@ -0,0 +1,46 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def populate_search_vector(apps, schema_editor):
+    """
+    Create the GIN index and fill the vector for existing jobs (PostgreSQL only;
+    other backends use the in-process index in authentication.search).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from django.contrib.postgres.search import SearchVector
+
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS authentication_job_search_vector_gin '
+        'ON authentication_job USING gin (search_vector)'
+    )
+    Job = apps.get_model('authentication', 'Job')
+    Job.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='english')
+        + SearchVector('short_description', weight='B', config='english')
+        + SearchVector('skills_sets', weight='B', config='english')
+        + SearchVector('description', weight='C', config='english')
+    ))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS authentication_job_search_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_job_rfqt_jobapplication_message_job_rfqts_no'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_search_vector, drop_search_index),
+    ]
@@ -0,0 +1,46 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    """
+    Store existing addresses in the normalized form. Accounts that differ
+    only in case must be merged by hand before the constraint can be added.
+    """
+    CustomUser = apps.get_model('authentication', 'CustomUser')
+    clashes = list(
+        CustomUser.objects
+        .annotate(normalized=Lower('email'))
+        .values_list('normalized', flat=True)
+        .order_by()
+        .annotate(total=models.Count('pk'))
+        .filter(total__gt=1)
+        .values_list('normalized', flat=True)
+    )
+    if clashes:
+        raise RuntimeError(
+            'Accounts differ only in email case, merge them before migrating: '
+            + ', '.join(sorted(clashes))
+        )
+    for user in CustomUser.objects.exclude(email=Lower('email')).only('pk', 'email').iterator():
+        CustomUser.objects.filter(pk=user.pk).update(email=user.email.strip().lower())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0009_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='customuser',
+            name='customuser_email_upper_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='customuser_email_ci_unique'),
+        ),
+    ]
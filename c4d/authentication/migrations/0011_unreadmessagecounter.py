@@ -0,0 +1,44 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    """
+    One counter per existing user, holding their current unread total.
+    """
+    CustomUser = apps.get_model('authentication', 'CustomUser')
+    Message = apps.get_model('authentication', 'Message')
+    UnreadMessageCounter = apps.get_model('authentication', 'UnreadMessageCounter')
+    totals = dict(
+        Message.objects
+        .filter(is_read=False)
+        .order_by()
+        .values_list('recipient')
+        .annotate(total=models.Count('pk'))
+    )
+    UnreadMessageCounter.objects.bulk_create(
+        (UnreadMessageCounter(user_id=pk, unread=totals.get(pk, 0))
+         for pk in CustomUser.objects.values_list('pk', flat=True).iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0010_normalize_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadMessageCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0012_shared_cache_table'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='storedfile',
+            name='thumbnail',
+        ),
+        migrations.AddField(
+            model_name='storedfile',
+            name='processing_started',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
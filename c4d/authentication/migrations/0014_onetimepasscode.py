@@ -0,0 +1,25 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0013_storedfile_processing_started'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OneTimePasscode',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('record', models.JSONField(blank=True, null=True)),
+                ('expires_at', models.FloatField(default=0)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('resend_after', models.FloatField(default=0)),
+            ],
+        ),
+    ]
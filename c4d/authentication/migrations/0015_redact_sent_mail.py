@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def redact_sent_mail(apps, schema_editor):
+    """
+    Delivered mail keeps only its envelope (see authentication.mail).
+    """
+    OutboundEmail = apps.get_model('authentication', 'OutboundEmail')
+    OutboundEmail.objects.filter(status='sent').update(body='', alternatives=[], attachments=[])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0014_onetimepasscode'),
+    ]
+
+    operations = [
+        migrations.RunPython(redact_sent_mail, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+OLD_NAME = 'authentication_job_search_vector_gin'
+NEW_NAME = 'job_search_vector_gin'
+
+
+def adopt_search_index(apps, schema_editor):
+    """
+    0006 created the GIN index with raw SQL; give it the name the model
+    declares (PostgreSQL only, like the index itself).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'ALTER INDEX IF EXISTS {OLD_NAME} RENAME TO {NEW_NAME}')
+    schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {NEW_NAME} ON authentication_job USING gin (search_vector)')
+
+
+def restore_search_index_name(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'ALTER INDEX IF EXISTS {NEW_NAME} RENAME TO {OLD_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0016_uploadsession_assembling'),
+    ]
+
+    operations = [
+        # GinIndex emits USING gin, which other backends reject
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='job',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='job_search_vector_gin'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(adopt_search_index, restore_search_index_name),
+            ],
+        ),
+    ]
@@ -5,10 +5,13 @@ Models for user profile and job functionality.
 import uuid
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models.functions import Greatest, Lower, Upper
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from .managers import CustomUserManager
+from .managers import CustomUserManager, normalize_email
 
 
 STATE_CHOICES: list[tuple[str, str]] = [
@@ -45,9 +48,20 @@ class CustomUser(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # emails are stored lower-cased (see managers.normalize_email);
+            # this also rejects rows written around the manager and forms
+            models.UniqueConstraint(Lower("email"), name="customuser_email_ci_unique"),
+        ]
+
     def __str__(self) -> str:
         return self.email
 
+    def save(self, *args, **kwargs):
+        self.email = normalize_email(self.email)
+        super().save(*args, **kwargs)
+
 
 class Profile(models.Model):
     """
@@ -107,6 +121,12 @@ class Profile(models.Model):
         help_text="Set to True by admin once a pending name-change request has been processed."
     )
 
+    class Meta:
+        indexes = [
+            # clearance_no__iexact uniqueness check on every profile save
+            models.Index(Upper("clearance_no"), name="profile_clearance_no_upper_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"Profile of {self.user.email}"
 
@@ -166,6 +186,9 @@ class Rfqt(models.Model):
     class Meta:
         verbose_name = "Request for Quotation and Tasking Statement"
         verbose_name_plural = "Request for Quotation and Tasking Statements"   
+        indexes = [
+            models.Index(fields=['rfqts_no'], name='rfqt_rfqts_no_idx'),
+        ]
 
     def __str__(self):
         return self.rfqts_no
@@ -207,9 +230,21 @@ class Job(models.Model):
     closing_date = models.DateField(null=True, blank=True)
     submission_date = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+    # maintained from post_save (see authentication.search); GIN indexed on PostgreSQL
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ['-submission_date']
+        indexes = [
+            # job list / dashboard / home: active jobs, newest first (keyset order)
+            models.Index(
+                fields=['-submission_date', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_recent_idx',
+            ),
+            # full-text search; created on PostgreSQL only (migration 0017)
+            GinIndex(fields=['search_vector'], name='job_search_vector_gin'),
+        ]
 
     def __str__(self):
         return self.title
@@ -246,6 +281,17 @@ class JobApplication(models.Model):
     submission_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=50, choices=APPLICATION_STATUS, default="Pending")
 
+    class Meta:
+        indexes = [
+            # "already applied?" check
+            models.Index(fields=['job', 'user'], name='jobapp_job_user_idx'),
+            # my applications / dashboard
+            models.Index(fields=['user', '-submission_date', '-id'], name='jobapp_user_recent_idx'),
+            # admin applications, unfiltered and by status
+            models.Index(fields=['-submission_date', '-id'], name='jobapp_recent_idx'),
+            models.Index(fields=['status', '-submission_date', '-id'], name='jobapp_status_recent_idx'),
+        ]
+
     def __str__(self):
         return f"Application for {self.job.title} by {self.full_name}"
 
@@ -264,6 +310,206 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # application thread, newest first (keyset order)
+            models.Index(fields=['application', '-timestamp', '-id'], name='message_thread_idx'),
+            models.Index(fields=['job', 'timestamp'], name='message_job_time_idx'),
+            # inbox / recent messages
+            models.Index(fields=['recipient', '-timestamp', '-id'], name='message_inbox_idx'),
+            models.Index(
+                fields=['recipient'],
+                condition=models.Q(is_read=False),
+                name='message_unread_idx',
+            ),
+        ]
+
+    # recipient whose unread count this row is in, as last loaded or saved
+    _unread_for = None
+
+    def __str__(self):
+        return f"Message from {self.sender} to {self.recipient} for job {self.job.title if self.job else 'General'}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        message = super().from_db(db, field_names, values)
+        message._unread_for = message._counted_recipient()
+        return message
+
+    def _counted_recipient(self):
+        # deferred fields are not loaded: leave the counter alone for those
+        if {"recipient_id", "is_read"} & self.get_deferred_fields():
+            return None
+        return None if self.is_read else self.recipient_id
+
+    def save(self, *args, **kwargs):
+        # keep UnreadMessageCounter in the same transaction as the row;
+        # bulk read-marking goes through authentication.inbox.mark_read
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            counted = self._counted_recipient()
+            if counted != self._unread_for:
+                if self._unread_for is not None:
+                    UnreadMessageCounter.adjust(self._unread_for, -1)
+                if counted is not None:
+                    UnreadMessageCounter.adjust(counted, 1)
+            self._unread_for = counted
+
+
+class UnreadMessageCounter(models.Model):
+    """
+    Denormalized number of unread messages per recipient, so the header
+    badge and inbox do not COUNT the message table. Maintained by
+    ``Message.save``, the message delete signal and ``inbox.mark_read``.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="unread_counter",
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user}: {self.unread} unread"
+
+    @classmethod
+    def adjust(cls, user_id, delta: int) -> None:
+        """
+        Add ``delta`` to the user's counter. A missing row is left missing;
+        ``inbox.unread_count`` rebuilds it from the messages on first read.
+        """
+        cls.objects.filter(user_id=user_id).update(unread=Greatest(models.F("unread") + delta, 0))
+
+# --------- UPLOADS ---------- #
+
+class StoredFile(models.Model):
+    """
+    Content-addressed upload: one row (and one file on disk) per distinct
+    SHA-256, shared by every application or RFQT that uploads the same bytes.
+    """
+    PROCESSING_STATUS = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    SCAN_STATUS = [
+        ('pending', 'Pending'),
+        ('clean', 'Clean'),
+        ('infected', 'Infected'),
+        ('skipped', 'Skipped'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='uploads/%Y/%m/')
+    original_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField()
+    scan_status = models.CharField(max_length=10, choices=SCAN_STATUS, default='pending')
+    processing_status = models.CharField(max_length=10, choices=PROCESSING_STATUS, default='pending')
+    processing_error = models.TextField(blank=True)
+    extracted_text = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    # when the current (or last) processing run claimed the row
+    processing_started = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.original_name} ({self.sha256[:12]})"
+
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked upload in progress. Chunks are appended to a temp
+    file; when the last byte arrives it is hashed and turned into a StoredFile.
+    """
+    KIND_CHOICES = [
+        ('resume', 'Resume'),
+        ('rfq_file', 'RFQ file'),
+    ]
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('assembling', 'Assembling'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='upload_sessions', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    total_size = models.PositiveBigIntegerField()
+    received_size = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='uploading')
+    stored_file = models.ForeignKey(StoredFile, related_name='upload_sessions', on_delete=models.SET_NULL, null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_size}/{self.total_size})"
+
+
+# --------- OUTBOUND MAIL ---------- #
+
+class OutboundEmail(models.Model):
+    """
+    A message waiting in (or delivered from) the outbound mail queue. Written
+    by the queued email backend, sent by ``authentication.mail.deliver_queued``.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    recipient = models.CharField(max_length=254, db_index=True)
+    from_email = models.CharField(max_length=254)
+    subject = models.CharField(max_length=998)
+    body = models.TextField(blank=True)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    alternatives = models.JSONField(default=list, blank=True)
+    attachments = models.JSONField(default=list, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
+
+
+# --------- ONE-TIME PASSCODES ---------- #
+
+class OneTimePasscode(models.Model):
+    """
+    A user's current MFA code (``authentication.otp.DatabaseOTPStore``), for
+    deployments without a shared cache. Times are epoch seconds, as in the
+    cache records.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        primary_key=True,
+        related_name='+',
+        on_delete=models.CASCADE,
+    )
+    record = models.JSONField(null=True, blank=True)
+    expires_at = models.FloatField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    resend_after = models.FloatField(default=0)
 
     def __str__(self):
-        return f"Message from {self.sender} to {self.recipient} for job {self.job.title if self.job else 'General'}"
\ No newline at end of file
+        return f"OTP for user {self.user_id}"
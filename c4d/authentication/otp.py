@@ -0,0 +1,212 @@
+"""
+One-time passcodes for the e-mail MFA step.
+
+Codes live in a cache shared by the workers (``OTP_CACHE_ALIAS``: Redis or
+memcached) or, without one, in the database (``DatabaseOTPStore``), never in
+the session. Only an HMAC of the code is stored, keyed per user, together with
+its expiry; wrong guesses are counted atomically and a code is burned after
+``OTP_MAX_ATTEMPTS``. Re-sends are throttled with an ``add``-only key so two
+concurrent requests cannot both send.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import secrets
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+OTP_LENGTH = 6
+OTP_TTL = getattr(settings, "OTP_TTL", 600)
+OTP_MAX_ATTEMPTS = getattr(settings, "OTP_MAX_ATTEMPTS", 5)
+OTP_RESEND_INTERVAL = getattr(settings, "OTP_RESEND_INTERVAL", 60)
+
+# verify() outcomes
+VALID = "valid"
+INVALID = "invalid"
+EXPIRED = "expired"
+LOCKED = "locked"
+
+
+class OTPThrottled(Exception):
+    def __init__(self, wait: int):
+        super().__init__(f"Try again in {wait} seconds.")
+        self.wait = wait
+
+
+@dataclass(frozen=True)
+class OTPStatus:
+    issued: bool
+    remaining: int = 0
+    resend_wait: int = 0
+
+    @property
+    def resend_available(self) -> bool:
+        return self.issued and self.resend_wait == 0
+
+
+def generate_code() -> str:
+    return f"{secrets.randbelow(10 ** OTP_LENGTH):0{OTP_LENGTH}d}"
+
+
+def hash_code(user_id, code: str) -> str:
+    message = f"{user_id}:{code}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+class CacheOTPStore:
+    """
+    OTP records in a Django cache. Any backend with atomic ``add``/``incr``
+    works (Redis, memcached; locmem only within one process). Django's
+    database cache increments with a read and a write, which lets concurrent
+    guesses share one attempt, so use ``DatabaseOTPStore`` instead of it.
+    """
+
+    def __init__(self, alias: str | None = None):
+        self.alias = alias or getattr(settings, "OTP_CACHE_ALIAS", "default")
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def _key(user_id, part: str) -> str:
+        return f"otp:{user_id}:{part}"
+
+    def get(self, user_id) -> dict | None:
+        return self.cache.get(self._key(user_id, "code"))
+
+    def put(self, user_id, record: dict, ttl: int) -> None:
+        self.cache.set_many({
+            self._key(user_id, "code"): record,
+            self._key(user_id, "attempts"): 0,
+        }, ttl)
+
+    def delete(self, user_id) -> None:
+        self.cache.delete_many([self._key(user_id, "code"), self._key(user_id, "attempts")])
+
+    def incr_attempts(self, user_id, ttl: int) -> int:
+        key = self._key(user_id, "attempts")
+        self.cache.add(key, 0, ttl)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # expired between add() and incr()
+            self.cache.set(key, 1, ttl)
+            return 1
+
+    def acquire_resend_slot(self, user_id, interval: int) -> bool:
+        return self.cache.add(self._key(user_id, "throttle"), 1, interval)
+
+
+class DatabaseOTPStore:
+    """
+    OTP records in ``OneTimePasscode`` rows, one per user. Attempts and the
+    resend slot are taken with conditional ``UPDATE``s, so they stay atomic
+    across workers.
+    """
+
+    @property
+    def model(self):
+        from .models import OneTimePasscode
+        return OneTimePasscode
+
+    def _row(self, user_id):
+        return self.model.objects.filter(pk=user_id)
+
+    def get(self, user_id) -> dict | None:
+        return (
+            self._row(user_id)
+            .filter(record__isnull=False, expires_at__gt=time.time())
+            .values_list("record", flat=True)
+            .first()
+        )
+
+    def put(self, user_id, record: dict, ttl: int) -> None:
+        self.model.objects.update_or_create(
+            pk=user_id,
+            defaults={"record": record, "expires_at": time.time() + ttl, "attempts": 0},
+        )
+
+    def delete(self, user_id) -> None:
+        # the resend throttle outlives the code, as with the cache keys
+        self._row(user_id).update(record=None, attempts=0)
+
+    def incr_attempts(self, user_id, ttl: int) -> int:
+        if not self._row(user_id).update(attempts=F("attempts") + 1):
+            return 1
+        return self._row(user_id).values_list("attempts", flat=True).first() or 1
+
+    def acquire_resend_slot(self, user_id, interval: int) -> bool:
+        now = time.time()
+        self.model.objects.bulk_create([self.model(pk=user_id)], ignore_conflicts=True)
+        return bool(self._row(user_id).filter(resend_after__lte=now).update(resend_after=now + interval))
+
+
+def default_store():
+    """
+    The store named by ``OTP_STORE`` (dotted path), else ``CacheOTPStore``.
+    """
+    path = getattr(settings, "OTP_STORE", "")
+    return import_string(path)() if path else CacheOTPStore()
+
+
+class OTPService:
+    def __init__(self, store=None):
+        self.store = store or default_store()
+
+    def issue(self, user_id, *, throttle: bool = True) -> str:
+        """
+        Create (replacing any previous) code for ``user_id`` and return it
+        for sending. Raises ``OTPThrottled`` within ``OTP_RESEND_INTERVAL``
+        of the previous one unless ``throttle`` is False.
+        """
+        if not self.store.acquire_resend_slot(user_id, OTP_RESEND_INTERVAL) and throttle:
+            raise OTPThrottled(self.status(user_id).resend_wait or OTP_RESEND_INTERVAL)
+        code = generate_code()
+        now = int(time.time())
+        self.store.put(user_id, {
+            "hash": hash_code(user_id, code),
+            "issued_at": now,
+            "expires_at": now + OTP_TTL,
+        }, OTP_TTL)
+        return code
+
+    def verify(self, user_id, token: str) -> str:
+        """
+        Check ``token``; a valid code is consumed. Returns one of
+        ``VALID``, ``INVALID``, ``EXPIRED`` or ``LOCKED``.
+        """
+        record = self.store.get(user_id)
+        if record is None or record["expires_at"] <= time.time():
+            return EXPIRED
+        if self.store.incr_attempts(user_id, OTP_TTL) > OTP_MAX_ATTEMPTS:
+            self.store.delete(user_id)
+            return LOCKED
+        if hmac.compare_digest(record["hash"], hash_code(user_id, token.strip())):
+            self.store.delete(user_id)
+            return VALID
+        return INVALID
+
+    def status(self, user_id) -> OTPStatus:
+        record = self.store.get(user_id)
+        if record is None:
+            return OTPStatus(issued=False)
+        now = int(time.time())
+        return OTPStatus(
+            issued=True,
+            remaining=max(record["expires_at"] - now, 0),
+            resend_wait=max(record["issued_at"] + OTP_RESEND_INTERVAL - now, 0),
+        )
+
+    def clear(self, user_id) -> None:
+        self.store.delete(user_id)
+
+
+otp_service = OTPService()
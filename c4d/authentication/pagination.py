@@ -0,0 +1,215 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are fetched with ``WHERE (a, b) < (last_a, last_b) ORDER BY a, b LIMIT n``
+instead of ``OFFSET``, so deep pages cost the same as the first one and no
+``COUNT(*)`` is needed. Cursors are signed, opaque strings carrying the sort
+key of the row on either edge of the page.
+"""
+
+from __future__ import annotations
+
+import datetime
+import decimal
+import json
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+
+CURSOR_SALT = "authentication.pagination"
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(values: list, direction: str) -> str:
+    return signing.dumps(
+        {"v": values, "d": direction},
+        salt=CURSOR_SALT,
+        serializer=_CursorSerializer,
+    )
+
+
+def decode_cursor(cursor: str) -> tuple[list, str]:
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT, serializer=_CursorSerializer)
+        values, direction = data["v"], data["d"]
+    except (signing.BadSignature, KeyError, TypeError, ValueError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+    if direction not in ("next", "prev") or not isinstance(values, list):
+        raise InvalidCursor("Malformed cursor")
+    return values, direction
+
+
+class _CursorEncoder(json.JSONEncoder):
+    # Full-precision ISO strings; DjangoJSONEncoder truncates to milliseconds,
+    # which would break equality on the sort key. Decimals as exact strings.
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+            return o.isoformat()
+        if isinstance(o, decimal.Decimal):
+            return str(o)
+        return super().default(o)
+
+
+class _CursorSerializer:
+    """
+    JSON serializer that understands dates/datetimes (as ISO strings).
+    """
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(",", ":"), cls=_CursorEncoder).encode("latin-1")
+
+    def loads(self, data):
+        return json.loads(data.decode("latin-1"))
+
+
+def approximate_count(queryset) -> int:
+    """
+    Planner row estimate on PostgreSQL, exact COUNT(*) elsewhere.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return queryset.count()
+
+
+@dataclass
+class CursorPage:
+    object_list: list
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+    total: int | None = None
+    approximate: bool = False
+    per_page: int = 0
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginate ``queryset`` by ``ordering``, a sequence of field names (prefix
+    ``-`` for descending) whose last entry must be unique, e.g.
+    ``("-submission_date", "-id")``. Fields must be non-null and compare
+    exactly after a JSON round trip (no float4 annotations; cast to numeric).
+
+    ``count`` is ``None`` (no total), ``"approximate"`` or ``"exact"``.
+    """
+
+    def __init__(self, queryset, per_page: int, ordering=("-submission_date", "-id"), count: str | None = None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.count = count
+        self._fields = [name.lstrip("-") for name in self.ordering]
+        self._descending = [name.startswith("-") for name in self.ordering]
+
+    def _keyset_filter(self, values: list, forward: bool) -> Q:
+        """
+        Rows strictly after ``values`` in the requested direction, expanded
+        into (a < x) OR (a = x AND b < y) OR ... for the ORM.
+        """
+        condition = Q()
+        for i, (name, desc) in enumerate(zip(self._fields, self._descending)):
+            lookup = "lt" if desc == forward else "gt"
+            clause = Q(**{f"{name}__{lookup}": values[i]})
+            for prev_name, prev_value in zip(self._fields[:i], values[:i]):
+                clause &= Q(**{prev_name: prev_value})
+            condition |= clause
+        return condition
+
+    def _key(self, obj) -> list:
+        return [getattr(obj, name) for name in self._fields]
+
+    def _reversed_ordering(self) -> list[str]:
+        return [name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering]
+
+    def _page_queryset(self, cursor: str | None):
+        values, direction = None, "next"
+        if cursor:
+            try:
+                values, direction = decode_cursor(cursor)
+            except InvalidCursor:
+                values = None
+            if values is not None and len(values) != len(self._fields):
+                values, direction = None, "next"
+
+        forward = direction == "next"
+        qs = self.queryset
+        if values is not None:
+            qs = qs.filter(self._keyset_filter(values, forward))
+        qs = qs.order_by(*(self.ordering if forward else self._reversed_ordering()))
+        return qs[:self.per_page + 1], values, forward
+
+    def _build_page(self, rows: list, values, forward: bool, total: int | None) -> CursorPage:
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or not forward:
+                next_cursor = encode_cursor(self._key(rows[-1]), "next")
+            if values is not None and (forward or has_more):
+                previous_cursor = encode_cursor(self._key(rows[0]), "prev")
+
+        return CursorPage(
+            object_list=rows,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+            total=total,
+            approximate=self.count == "approximate",
+            per_page=self.per_page,
+        )
+
+    def page(self, cursor: str | None = None) -> CursorPage:
+        """
+        Page after (or before) ``cursor``; an invalid or missing cursor
+        yields the first page.
+        """
+        qs, values, forward = self._page_queryset(cursor)
+        rows = list(qs)
+
+        total = None
+        if self.count == "exact":
+            total = self.queryset.count()
+        elif self.count == "approximate":
+            total = approximate_count(self.queryset)
+
+        return self._build_page(rows, values, forward, total)
+
+    async def apage(self, cursor: str | None = None) -> CursorPage:
+        """
+        ``page`` for async views.
+        """
+        qs, values, forward = self._page_queryset(cursor)
+        rows = [row async for row in qs]
+
+        total = None
+        if self.count == "exact":
+            total = await self.queryset.acount()
+        elif self.count == "approximate":
+            total = await sync_to_async(approximate_count)(self.queryset)
+
+        return self._build_page(rows, values, forward, total)
@@ -0,0 +1,123 @@
+"""
+Per-view query budgets.
+
+``@query_budget(n)`` counts the SQL statements a view issues (template
+rendering included) and flags views that go over ``n``, which is how N+1
+regressions on list pages show up: their query count grows with the rows.
+Over-budget views raise ``QueryBudgetExceeded`` when ``QUERY_BUDGET_STRICT``
+is on (default: ``DEBUG``) and log a warning otherwise.
+"""
+
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    """
+    ``execute_wrapper`` hook recording every statement run on a connection.
+    """
+
+    def __init__(self):
+        self.queries: list[str] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+
+@contextmanager
+def count_queries(using: str = "default"):
+    counter = QueryCounter()
+    with connections[using].execute_wrapper(counter):
+        yield counter
+
+
+def _report(label: str, counter: QueryCounter, budget: int, strict: bool) -> None:
+    if len(counter) <= budget:
+        return
+    message = (
+        f"{label} ran {len(counter)} queries (budget {budget}):\n"
+        + "\n".join(f"  {i}. {sql}" for i, sql in enumerate(counter.queries, 1))
+    )
+    if strict:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _strict() -> bool:
+    return getattr(settings, "QUERY_BUDGET_STRICT", bool(settings.DEBUG))
+
+
+def query_budget(max_queries: int, using: str = "default"):
+    """
+    View decorator enforcing an upper bound on queries per request.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped(request, *args, **kwargs):
+                # the async ORM runs queries on the request's sync thread,
+                # so the counter is installed on that thread's connection
+                counting = count_queries(using)
+                counter = await sync_to_async(counting.__enter__)()
+                try:
+                    response = await view_func(request, *args, **kwargs)
+                finally:
+                    await sync_to_async(counting.__exit__)(None, None, None)
+                _report(view_func.__qualname__, counter, max_queries, _strict())
+                return response
+        else:
+            @wraps(view_func)
+            def _wrapped(request, *args, **kwargs):
+                with count_queries(using) as counter:
+                    response = view_func(request, *args, **kwargs)
+                    # force lazy TemplateResponses so their queries are counted
+                    if hasattr(response, "render") and not getattr(response, "is_rendered", True):
+                        response.render()
+                _report(view_func.__qualname__, counter, max_queries, _strict())
+                return response
+        _wrapped.query_budget = max_queries
+        return _wrapped
+    return decorator
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, using: str = "default"):
+    """
+    Test helper: fail if the block runs more than ``max_queries`` queries.
+
+        with assert_max_queries(6):
+            client.get(reverse("admin_applications"))
+    """
+    with count_queries(using) as counter:
+        yield counter
+    _report("Block", counter, max_queries, strict=True)
+
+
+class QueryBudgetAdminMixin:
+    """
+    Apply a query budget to a ModelAdmin changelist.
+    """
+    changelist_query_budget: int | None = None
+
+    def changelist_view(self, request, extra_context=None):
+        if self.changelist_query_budget is None:
+            return super().changelist_view(request, extra_context)
+        view = query_budget(self.changelist_query_budget)(super().changelist_view)
+        return view(request, extra_context)
@@ -0,0 +1,114 @@
+"""
+The hot queries of the job board and the index each one is expected to use.
+
+The tests (``test_hot_query_uses_its_index``) run EXPLAIN on every entry and
+fail when the plan mentions none of the expected indexes, so a refactor that
+changes a filter or ordering (or a migration that drops an index) fails CI.
+On PostgreSQL sequential scans are disabled for the check, because on small
+development tables the planner would rightly prefer them.
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from typing import Callable
+
+from django.contrib.postgres.search import SearchQuery
+from django.db import connections, transaction
+
+from .models import CustomUser, Job, JobApplication, Message, Profile, Rfqt
+
+SAMPLE_USER = uuid.UUID(int=0)
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    build: Callable
+    # any of these in the plan passes; the first is the one built for it
+    indexes: tuple[str, ...]
+    # functional indexes on UPPER(...) only match PostgreSQL's iexact SQL;
+    # the GIN index only exists there
+    postgres_only: bool = False
+
+
+HOT_QUERIES = [
+    HotQuery(
+        "job list (active, newest first)",
+        lambda: Job.objects.filter(is_active=True).order_by("-submission_date", "-id")[:21],
+        ("job_active_recent_idx",),
+    ),
+    HotQuery(
+        "already applied check",
+        lambda: JobApplication.objects.filter(job_id=1, user_id=SAMPLE_USER),
+        ("jobapp_job_user_idx",),
+    ),
+    HotQuery(
+        "my applications",
+        lambda: JobApplication.objects.filter(user_id=SAMPLE_USER).order_by("-submission_date", "-id")[:21],
+        ("jobapp_user_recent_idx",),
+    ),
+    HotQuery(
+        "admin applications",
+        lambda: JobApplication.objects.order_by("-submission_date", "-id")[:26],
+        ("jobapp_recent_idx",),
+    ),
+    HotQuery(
+        "admin applications by status",
+        lambda: JobApplication.objects.filter(status="Pending").order_by("-submission_date", "-id")[:26],
+        ("jobapp_status_recent_idx",),
+    ),
+    HotQuery(
+        "application thread",
+        lambda: Message.objects.filter(application_id=1).order_by("-timestamp", "-id")[:51],
+        ("message_thread_idx",),
+    ),
+    HotQuery(
+        "job messages",
+        lambda: Message.objects.filter(job_id=1).order_by("timestamp"),
+        ("message_job_time_idx",),
+    ),
+    HotQuery(
+        "recent messages for a user",
+        lambda: Message.objects.filter(recipient_id=SAMPLE_USER).order_by("-timestamp", "-id")[:5],
+        ("message_inbox_idx",),
+    ),
+    HotQuery(
+        "unread messages for a user",
+        lambda: Message.objects.filter(recipient_id=SAMPLE_USER, is_read=False),
+        ("message_unread_idx", "message_inbox_idx"),
+    ),
+    HotQuery(
+        "CSID uniqueness check",
+        lambda: Profile.objects.filter(clearance_no__iexact="CS123456"),
+        ("profile_clearance_no_upper_idx",),
+        postgres_only=True,
+    ),
+    HotQuery(
+        "email duplicate check",
+        lambda: CustomUser.objects.filter(email="someone@example.com"),
+        ("customuser_email_key", "sqlite_autoindex_authentication_customuser"),
+    ),
+    HotQuery(
+        "job search",
+        lambda: Job.objects.filter(search_vector=SearchQuery("python", config="english")),
+        ("job_search_vector_gin",),
+        postgres_only=True,
+    ),
+    HotQuery(
+        "RFQT import rfqts_no lookup",
+        lambda: Rfqt.objects.filter(rfqts_no__in=["RFQ-0001", "RFQ-0002"]),
+        ("rfqt_rfqts_no_idx",),
+    ),
+]
+
+
+def explain(queryset) -> str:
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.explain()
+    with transaction.atomic(using=queryset.db):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
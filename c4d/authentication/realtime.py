@@ -0,0 +1,390 @@
+"""
+Live push of new messages and application status changes.
+
+Every signed-in browser holds one connection to the ASGI app: Server-Sent
+Events at ``events/`` (``event_stream_view``) or a WebSocket at
+``REALTIME_WEBSOCKET_PATH`` (routed in ``a_core/asgi.py``). Each connection
+subscribes to its user's group on the channel layer; ``publish_message``
+and ``publish_status`` fan events out to those groups once the writing
+transaction commits, so pages no longer need reloading to see replies.
+
+Layers (``REALTIME_CHANNEL_LAYER``, dotted path):
+
+* ``InMemoryChannelLayer`` delivers within the process. Enough for a
+  single ASGI worker, development and tests.
+* ``PostgresChannelLayer`` publishes with ``pg_notify`` inside the writing
+  transaction (PostgreSQL only sends it on commit) and runs one LISTEN
+  thread per worker process, so every worker sees every event. LISTEN does
+  not work through PgBouncer in transaction mode; point
+  ``REALTIME_LISTEN_DSN`` at PostgreSQL itself in that setup.
+
+Streams only work under ASGI (``SERVER_INTERFACE=asgi``); a WSGI worker
+answers ``events/`` with 501 rather than tying up a thread per client.
+``REALTIME_ENABLED`` (default: on under ASGI) gates publishing, so a WSGI
+deployment, where nothing listens, sends no notifications at all.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from importlib import import_module
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.http.cookie import parse_cookie
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_SECONDS = getattr(settings, "REALTIME_KEEPALIVE", 20)
+QUEUE_SIZE = getattr(settings, "REALTIME_QUEUE_SIZE", 100)
+WEBSOCKET_PATH = getattr(settings, "REALTIME_WEBSOCKET_PATH", "/auth/ws/events/")
+NOTIFY_CHANNEL = "c4d_realtime"
+# NOTIFY payloads must stay under 8000 bytes
+SNIPPET_LENGTH = 200
+# sent instead of further events when a client falls too far behind; the
+# client reloads what it is showing and reconnects
+RESYNC = {"type": "resync"}
+
+
+def user_group(user_id) -> str:
+    return f"user:{user_id}"
+
+
+# ---------- CHANNEL LAYERS ---------- #
+
+class Subscription:
+    """
+    One connection's queue. Filled from any thread through its event loop.
+    """
+
+    def __init__(self, groups, loop, maxsize: int = QUEUE_SIZE):
+        self.groups = tuple(groups)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def offer(self, event) -> None:
+        # runs on self.loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout: float | None = None) -> dict | None:
+        """
+        Next event, or None when ``timeout`` passes first.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InMemoryChannelLayer:
+    """
+    Group fan-out within one process.
+    """
+
+    def __init__(self):
+        self._groups = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self, groups, maxsize: int = QUEUE_SIZE):
+        """
+        Register a subscription on the running event loop for the duration
+        of the ``with`` block.
+        """
+        subscription = Subscription(groups, asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            for group in subscription.groups:
+                self._groups[group].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                for group in subscription.groups:
+                    members = self._groups.get(group)
+                    if members is not None:
+                        members.discard(subscription)
+                        if not members:
+                            del self._groups[group]
+
+    def group_size(self, group) -> int:
+        with self._lock:
+            return len(self._groups.get(group, ()))
+
+    def deliver(self, group, event) -> int:
+        """
+        Hand ``event`` to every local subscriber of ``group`` now. Safe to
+        call from any thread. Returns the number of subscribers reached.
+        """
+        with self._lock:
+            members = list(self._groups.get(group, ()))
+        for subscription in members:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # the connection's loop has shut down
+                pass
+        return len(members)
+
+    def publish(self, group, event, using: str = "default") -> None:
+        """
+        Deliver ``event`` to ``group`` once the current transaction commits.
+        """
+        transaction.on_commit(lambda: self.deliver(group, event), using=using)
+
+
+class PostgresChannelLayer(InMemoryChannelLayer):
+    """
+    Cross-process fan-out over PostgreSQL LISTEN/NOTIFY. Falls back to
+    in-process delivery on other databases.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def publish(self, group, event, using: str = "default") -> None:
+        connection = connections[using]
+        if connection.vendor != "postgresql":
+            super().publish(group, event, using)
+            return
+        payload = json.dumps({"group": group, "event": event}, cls=DjangoJSONEncoder)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, payload])
+
+    @contextmanager
+    def subscribe(self, groups, maxsize: int = QUEUE_SIZE):
+        self._ensure_listener()
+        with super().subscribe(groups, maxsize) as subscription:
+            yield subscription
+
+    def _ensure_listener(self) -> None:
+        if connections["default"].vendor != "postgresql":
+            return
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name="realtime-listener", daemon=True)
+                self._listener.start()
+
+    def _connect(self):
+        import psycopg2
+
+        dsn = getattr(settings, "REALTIME_LISTEN_DSN", "")
+        if dsn:
+            connection = psycopg2.connect(dsn)
+        else:
+            params = connections["default"].get_connection_params()
+            params.pop("cursor_factory", None)
+            connection = psycopg2.connect(**params)
+        connection.autocommit = True
+        return connection
+
+    def _listen(self) -> None:
+        backoff = 1
+        while True:
+            connection = None
+            try:
+                connection = self._connect()
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                backoff = 1
+                while True:
+                    if select.select([connection], [], [], KEEPALIVE_SECONDS) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        message = json.loads(notify.payload)
+                        self.deliver(message["group"], message["event"])
+            except Exception:
+                logger.exception("Realtime listener lost its connection; retrying in %ss", backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+_layer = None
+_layer_lock = threading.Lock()
+
+
+def get_channel_layer():
+    """
+    The process-wide layer named by ``REALTIME_CHANNEL_LAYER``.
+    """
+    global _layer
+    with _layer_lock:
+        if _layer is None:
+            path = getattr(settings, "REALTIME_CHANNEL_LAYER", "authentication.realtime.InMemoryChannelLayer")
+            _layer = import_string(path)()
+        return _layer
+
+
+# ---------- EVENTS ---------- #
+
+def publish(user_ids, event) -> None:
+    if not getattr(settings, "REALTIME_ENABLED", True):
+        return
+    layer = get_channel_layer()
+    for user_id in {user_id for user_id in user_ids if user_id is not None}:
+        layer.publish(user_group(user_id), event)
+
+
+def message_event(message, direction: str) -> dict:
+    return {
+        "type": "message",
+        "direction": direction,
+        "id": message.pk,
+        "application_id": message.application_id,
+        "job_id": message.job_id,
+        # the id, not the email: a save must not load the sender
+        "sender_id": message.sender_id,
+        "content": message.content[:SNIPPET_LENGTH],
+        "timestamp": message.timestamp,
+    }
+
+
+def publish_message(message) -> None:
+    """
+    Push a new message to its recipient and to the sender's other tabs.
+    """
+    publish([message.recipient_id], message_event(message, "in"))
+    if message.sender_id != message.recipient_id:
+        publish([message.sender_id], message_event(message, "out"))
+
+
+def publish_status(application) -> None:
+    """
+    Push an application's new status to the applicant.
+    """
+    publish([application.user_id], {
+        "type": "application.status",
+        "application_id": application.pk,
+        "job_id": application.job_id,
+        "status": application.status,
+        "status_label": application.get_status_display(),
+    })
+
+
+# ---------- STREAMS ---------- #
+
+def encode_event(event) -> str:
+    return json.dumps(event, cls=DjangoJSONEncoder)
+
+
+async def sse_stream(user_id, keepalive: float = KEEPALIVE_SECONDS):
+    """
+    Server-Sent Events for one user until the client disconnects (Django
+    cancels the iterator) or falls behind.
+    """
+    with get_channel_layer().subscribe([user_group(user_id)]) as subscription:
+        yield "retry: 5000\n\n"
+        while True:
+            event = await subscription.get(keepalive)
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {encode_event(event)}\n\n"
+            if event is RESYNC:
+                return
+
+
+def _header(scope, name: bytes) -> str:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
+
+def _origin_allowed(scope) -> bool:
+    # browsers send Origin on every WebSocket handshake; refuse other sites
+    origin = _header(scope, b"origin")
+    if not origin:
+        return True
+    if origin in getattr(settings, "CSRF_TRUSTED_ORIGINS", ()):
+        return True
+    return urlsplit(origin).netloc == _header(scope, b"host")
+
+
+@sync_to_async
+def _session_user_id(scope):
+    """
+    The MFA-confirmed user behind the handshake's session cookie, or None.
+    """
+    from django.contrib.auth import get_user
+
+    try:
+        session_key = parse_cookie(_header(scope, b"cookie")).get(settings.SESSION_COOKIE_NAME)
+        if not session_key:
+            return None
+        session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+        # get_user only reads request.session
+        user = get_user(SimpleNamespace(session=session))
+        if not user.is_authenticated or not session.get("mfa_confirmed", False):
+            return None
+        return user.pk
+    finally:
+        # the socket may stay open for hours; do not hold a database connection
+        connections.close_all()
+
+
+async def _wait_for_disconnect(receive) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+async def websocket_application(scope, receive, send):
+    """
+    Raw ASGI WebSocket endpoint carrying the same events as ``sse_stream``,
+    one JSON text frame each. Client frames are ignored.
+    """
+    if (await receive())["type"] != "websocket.connect":
+        return
+    user_id = None
+    if scope["path"] == WEBSOCKET_PATH and _origin_allowed(scope):
+        user_id = await _session_user_id(scope)
+    if user_id is None:
+        await send({"type": "websocket.close", "code": 4403})
+        return
+    await send({"type": "websocket.accept"})
+
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        with get_channel_layer().subscribe([user_group(user_id)]) as subscription:
+            while True:
+                next_event = asyncio.ensure_future(subscription.get())
+                await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    next_event.cancel()
+                    return
+                event = next_event.result()
+                await send({"type": "websocket.send", "text": encode_event(event)})
+                if event is RESYNC:
+                    await send({"type": "websocket.close", "code": 4000})
+                    return
+    finally:
+        disconnected.cancel()
@@ -0,0 +1,285 @@
+"""
+Responsive derivatives of the images and videos under ``static/assets``.
+
+For every JPEG, PNG and GIF under ``RESPONSIVE_IMAGE_SOURCES`` the build
+writes each format in ``RESPONSIVE_IMAGE_FORMATS`` (AVIF, WebP) at every
+width in ``RESPONSIVE_IMAGE_WIDTHS`` below the original, plus the original
+width. Every video under ``RESPONSIVE_VIDEO_SOURCES`` gets a poster frame
+(ffmpeg), which then gets the same image derivatives. Everything lands under
+``derived/``, mirroring the source paths, with ``responsive.json``
+recording, per original, its size and its derivatives. Derivatives newer
+than their source are reused.
+
+``{% responsive_image %}`` (templatetags ``assets``) turns a manifest entry
+into a ``<picture>`` with ``srcset``/``sizes`` per format around a lazily
+loaded ``<img>``; ``{% video_poster %}`` gives a video's poster. Images the
+build has not seen render as a plain lazy ``<img>``.
+
+Needs Pillow (AVIF needs Pillow 11.3+ or the pillow-avif plugin); posters
+need ffmpeg (``FFMPEG_BINARY``).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    from PIL import Image, ImageOps, features
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DERIVED_DIR = getattr(settings, "RESPONSIVE_DERIVED_DIR", "derived")
+MANIFEST_NAME = "responsive.json"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif"}
+VIDEO_EXTENSIONS = {".mp4", ".webm", ".mov", ".m4v"}
+
+# format -> (Pillow format, MIME type, save options)
+FORMATS = {
+    "avif": ("AVIF", "image/avif", {"quality": 55, "speed": 6}),
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 6}),
+}
+# seconds into the video for the poster frame, when it is that long
+POSTER_OFFSET = 1.0
+
+
+class ResponsiveError(Exception):
+    pass
+
+
+def _static_dir() -> Path:
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+def _is_fresh(target: Path, source: Path) -> bool:
+    return target.exists() and target.stat().st_mtime >= source.stat().st_mtime
+
+
+def available_formats() -> list[str]:
+    """
+    The configured formats this Pillow can write, best first.
+    """
+    configured = getattr(settings, "RESPONSIVE_IMAGE_FORMATS", list(FORMATS))
+    usable = []
+    for name in configured:
+        if name not in FORMATS:
+            raise ResponsiveError(f"Unknown image format {name}; choose from {', '.join(FORMATS)}")
+        if features.check(name):
+            usable.append(name)
+        else:
+            logger.warning("Pillow cannot write %s here; skipping those derivatives", name)
+    return usable
+
+
+def derived_widths(width: int) -> list[int]:
+    """
+    The configured widths below ``width``, then ``width`` itself (never
+    upscaled).
+    """
+    widths = sorted({w for w in getattr(settings, "RESPONSIVE_IMAGE_WIDTHS", ()) if w < width})
+    return [*widths, width]
+
+
+# ---------- IMAGES ---------- #
+
+@dataclass
+class ImageResult:
+    name: str
+    width: int
+    height: int
+    size: int
+    # format -> [(static name, width, bytes)], narrowest first
+    sources: dict[str, list[tuple[str, int, int]]] = field(default_factory=dict)
+    written: int = 0
+
+    def manifest_entry(self) -> dict:
+        return {
+            "width": self.width,
+            "height": self.height,
+            "bytes": self.size,
+            "sources": {
+                name: [[static_name, width] for static_name, width, _size in variants]
+                for name, variants in self.sources.items()
+            },
+        }
+
+
+def _open_image(path: Path):
+    image = Image.open(path)
+    # photos carry their rotation in EXIF
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("P", "LA", "PA") or (image.mode == "RGB" and "transparency" in image.info):
+        image = image.convert("RGBA")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    return image
+
+
+def derive_image(name: str, source: Path, formats: list[str]) -> ImageResult:
+    """
+    Write the derivatives of the static file ``name`` (at ``source``).
+    A format is kept only when its full-width file is smaller than the
+    original; otherwise the original is the better choice for every width.
+    """
+    with Image.open(source) as probe:
+        width, height = probe.size
+        # EXIF orientations 5-8 turn the image a quarter, swapping the sides
+        if probe.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            width, height = height, width
+    result = ImageResult(name=name, width=width, height=height, size=source.stat().st_size)
+    stem = str(Path(name).with_suffix(""))
+    # posters already live under DERIVED_DIR
+    prefix = "" if name.startswith(f"{DERIVED_DIR}/") else f"{DERIVED_DIR}/"
+    image = None
+    for format_name in formats:
+        pillow_format, _mime, save_options = FORMATS[format_name]
+        variants = []
+        for target_width in derived_widths(width):
+            static_name = f"{prefix}{stem}-{target_width}w.{format_name}"
+            target = _static_dir() / static_name
+            if not _is_fresh(target, source):
+                if image is None:
+                    image = _open_image(source)
+                target_height = max(1, round(height * target_width / width))
+                resized = image if target_width == width else image.resize((target_width, target_height), Image.LANCZOS)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                resized.save(target, pillow_format, **save_options)
+                result.written += 1
+            variants.append((static_name, target_width, target.stat().st_size))
+        if variants[-1][2] < result.size:
+            result.sources[format_name] = variants
+    return result
+
+
+# ---------- VIDEOS ---------- #
+
+def ffmpeg_command() -> str | None:
+    configured = getattr(settings, "FFMPEG_BINARY", "") or "ffmpeg"
+    return shutil.which(configured) or (configured if os.path.isfile(configured) else None)
+
+
+def extract_poster(ffmpeg: str, source: Path, target: Path) -> None:
+    """
+    A JPEG of the frame ``POSTER_OFFSET`` seconds in, or of the first frame
+    of a shorter video.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    for offset in (POSTER_OFFSET, 0):
+        completed = subprocess.run(
+            [ffmpeg, "-v", "error", "-y", "-ss", str(offset), "-i", str(source), "-frames:v", "1", "-q:v", "3", str(target)],
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode == 0 and target.exists() and target.stat().st_size:
+            return
+    raise ResponsiveError(f"ffmpeg could not extract a poster from {source}:\n{completed.stderr}")
+
+
+# ---------- BUILD ---------- #
+
+def _source_files(directories, extensions) -> list[tuple[str, Path]]:
+    """
+    (static name, path) of the files under the static ``directories``.
+    """
+    root = _static_dir()
+    files = []
+    for directory in directories:
+        base = root / directory
+        for path in sorted(base.rglob("*")) if base.is_dir() else ():
+            if path.is_file() and path.suffix.lower() in extensions:
+                files.append((path.relative_to(root).as_posix(), path))
+    return files
+
+
+@dataclass
+class BuildResult:
+    images: list[ImageResult]
+    # video static name -> poster static name
+    posters: dict[str, str]
+    skipped_posters: list[str]
+
+    @property
+    def written(self) -> int:
+        return sum(image.written for image in self.images)
+
+
+def build_derivatives(jobs: int | None = None) -> BuildResult:
+    """
+    Write every missing or stale derivative and ``responsive.json``.
+    """
+    if not PILLOW_AVAILABLE:
+        raise ResponsiveError("Responsive images need Pillow: pip install Pillow")
+    formats = available_formats()
+    images = _source_files(getattr(settings, "RESPONSIVE_IMAGE_SOURCES", ()), IMAGE_EXTENSIONS)
+
+    posters, skipped = {}, []
+    videos = _source_files(getattr(settings, "RESPONSIVE_VIDEO_SOURCES", ()), VIDEO_EXTENSIONS)
+    ffmpeg = ffmpeg_command() if videos else None
+    for name, source in videos:
+        poster_name = f"{DERIVED_DIR}/{Path(name).with_suffix('')}.poster.jpg"
+        poster = _static_dir() / poster_name
+        if not _is_fresh(poster, source):
+            if ffmpeg is None:
+                skipped.append(name)
+                continue
+            extract_poster(ffmpeg, source, poster)
+        posters[name] = poster_name
+        images.append((poster_name, poster))
+    if skipped:
+        logger.warning("ffmpeg not found (FFMPEG_BINARY); no posters for %s", ", ".join(skipped))
+
+    # Pillow releases the GIL while encoding
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        results = list(pool.map(lambda item: derive_image(item[0], item[1], formats), images))
+
+    manifest = {
+        "images": {result.name: result.manifest_entry() for result in results},
+        "videos": {name: {"poster": poster} for name, poster in posters.items()},
+    }
+    output_dir = _static_dir() / DERIVED_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return BuildResult(images=results, posters=posters, skipped_posters=skipped)
+
+
+# ---------- LOOKUP ---------- #
+
+_manifest_cache: tuple[float, dict] | None = None
+
+
+def responsive_manifest() -> dict:
+    """
+    The built ``responsive.json`` (empty before the first build), re-read
+    when it changes.
+    """
+    global _manifest_cache
+    from django.contrib.staticfiles import finders
+
+    path = finders.find(f"{DERIVED_DIR}/{MANIFEST_NAME}")
+    if not path:
+        return {}
+    mtime = os.path.getmtime(path)
+    if _manifest_cache is None or _manifest_cache[0] != mtime:
+        with open(path, encoding="utf-8") as handle:
+            _manifest_cache = (mtime, json.load(handle))
+    return _manifest_cache[1]
+
+
+def image_entry(name: str) -> dict | None:
+    return responsive_manifest().get("images", {}).get(name)
+
+
+def poster_for(video: str) -> str | None:
+    entry = responsive_manifest().get("videos", {}).get(video)
+    return entry["poster"] if entry else None
@@ -0,0 +1,312 @@
+"""
+Full-text search for job listings.
+
+PostgreSQL uses the maintained ``Job.search_vector`` column (GIN indexed) with
+weighted ranking, prefix matching and ``ts_headline`` snippets. Other backends
+(SQLite test runs) fall back to an in-process inverted index with the same
+interface, kept up to date from the ``Job`` save/delete signals.
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connections
+from django.db.models import Case, DecimalField, F, FloatField, IntegerField, Value, When
+from django.db.models.functions import Cast
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+SEARCH_CONFIG = getattr(settings, "JOB_SEARCH_CONFIG", "english")
+# search_rank on PostgreSQL, exact enough to keyset-paginate on
+RANK_FIELD = DecimalField(max_digits=12, decimal_places=6)
+
+# Private-use code points mark highlighted terms until the snippet is escaped.
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_STOP = "\ue001"
+
+# field name -> PostgreSQL weight, also used as the fallback index score
+SEARCH_FIELDS: dict[str, str] = {
+    "title": "A",
+    "short_description": "B",
+    "skills_sets": "B",
+    "description": "C",
+}
+_WEIGHT_SCORES = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str | None) -> list[str]:
+    """
+    Lower-cased word tokens of ``text``.
+    """
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def job_search_vector() -> SearchVector:
+    """
+    Weighted tsvector expression matching ``SEARCH_FIELDS``.
+    """
+    vector = None
+    for field, weight in SEARCH_FIELDS.items():
+        part = SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def uses_postgres(using: str = "default") -> bool:
+    return connections[using].vendor == "postgresql"
+
+
+def render_highlight(raw: str | None) -> str:
+    """
+    Escape a snippet and turn the highlight markers into <mark> tags.
+    """
+    if not raw:
+        return ""
+    out = []
+    for part in re.split(f"({HIGHLIGHT_START}|{HIGHLIGHT_STOP})", raw):
+        if part == HIGHLIGHT_START:
+            out.append("<mark>")
+        elif part == HIGHLIGHT_STOP:
+            out.append("</mark>")
+        else:
+            out.append(escape(part))
+    return mark_safe("".join(out))
+
+
+# --------------------------------------------------------------------------- #
+#  In-process inverted index (non-PostgreSQL backends)                        #
+# --------------------------------------------------------------------------- #
+
+class InvertedIndex:
+    """
+    Token -> {job id: score} postings with a sorted vocabulary for prefix
+    lookups. Loaded lazily from the database on first search.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._doc_tokens: dict[int, set[str]] = {}
+        self._vocabulary: list[str] = []
+        self._loaded = False
+
+    def _ensure_loaded(self, model) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for row in model.objects.values("pk", *SEARCH_FIELDS):
+                self._add(row["pk"], row)
+            self._vocabulary = sorted(self._postings)
+            self._loaded = True
+
+    def _add(self, pk: int, fields: dict) -> None:
+        tokens = set()
+        for field, weight in SEARCH_FIELDS.items():
+            for token in tokenize(fields.get(field)):
+                postings = self._postings[token]
+                postings[pk] = postings.get(pk, 0.0) + _WEIGHT_SCORES[weight]
+                tokens.add(token)
+        self._doc_tokens[pk] = tokens
+
+    def _remove(self, pk: int) -> None:
+        for token in self._doc_tokens.pop(pk, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(pk, None)
+            if not postings:
+                del self._postings[token]
+
+    def update(self, instance) -> None:
+        if not self._loaded:
+            return  # picked up by the initial load
+        with self._lock:
+            self._remove(instance.pk)
+            self._add(instance.pk, {f: getattr(instance, f) for f in SEARCH_FIELDS})
+            self._vocabulary = sorted(self._postings)
+
+    def discard(self, pk: int) -> None:
+        if not self._loaded:
+            return
+        with self._lock:
+            self._remove(pk)
+            self._vocabulary = sorted(self._postings)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._doc_tokens.clear()
+            self._vocabulary = []
+            self._loaded = False
+
+    def _expand(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches = []
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def search(self, model, terms: list[str]) -> dict[int, float]:
+        """
+        Ids matching every term (as a prefix) mapped to their score.
+        """
+        self._ensure_loaded(model)
+        with self._lock:
+            scores: dict[int, float] | None = None
+            for term in terms:
+                term_scores: dict[int, float] = defaultdict(float)
+                for token in self._expand(term):
+                    for pk, score in self._postings[token].items():
+                        term_scores[pk] += score
+                if scores is None:
+                    scores = dict(term_scores)
+                else:
+                    scores = {
+                        pk: score + term_scores[pk]
+                        for pk, score in scores.items() if pk in term_scores
+                    }
+                if not scores:
+                    return {}
+            return scores or {}
+
+
+job_index = InvertedIndex()
+
+
+def fallback_snippet(text: str | None, terms: list[str], width: int = 160) -> str:
+    """
+    Plain-Python equivalent of ts_headline for the fallback index.
+    """
+    if not text:
+        return ""
+    lowered = text.lower()
+    first = min(
+        (pos for pos in (lowered.find(t) for t in terms) if pos >= 0),
+        default=0,
+    )
+    start = max(0, first - width // 4)
+    snippet = text[start:start + width]
+    pattern = re.compile(
+        r"\b(" + "|".join(re.escape(t) for t in terms) + r")\w*",
+        re.IGNORECASE,
+    )
+    snippet = pattern.sub(lambda m: f"{HIGHLIGHT_START}{m.group(0)}{HIGHLIGHT_STOP}", snippet)
+    if start > 0:
+        snippet = "…" + snippet
+    if start + width < len(text):
+        snippet += "…"
+    return snippet
+
+
+# --------------------------------------------------------------------------- #
+#  Public API                                                                 #
+# --------------------------------------------------------------------------- #
+
+def prefix_query(terms: list[str]) -> SearchQuery:
+    """
+    ``to_tsquery`` that requires every term, each matched as a prefix.
+    """
+    raw = " & ".join(f"{term}:*" for term in terms)
+    return SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
+
+
+def search_jobs(queryset, keyword: str):
+    """
+    Filter ``queryset`` to jobs matching ``keyword`` and order them by
+    relevance. Results carry ``search_rank``; on PostgreSQL they also carry
+    ``search_snippet`` (raw highlight markers, see ``render_highlight``),
+    elsewhere ``attach_snippets`` fills it in.
+    """
+    terms = tokenize(keyword)
+    if not terms:
+        return queryset
+
+    if uses_postgres(queryset.db):
+        query = prefix_query(terms)
+        return (
+            queryset
+            .filter(search_vector=query)
+            .annotate(
+                # ts_rank is a float4, which never equals the float8 read back
+                # from a pagination cursor; a fixed-precision numeric does
+                search_rank=Cast(SearchRank(F("search_vector"), query), RANK_FIELD),
+                search_snippet=SearchHeadline(
+                    "description",
+                    query,
+                    config=SEARCH_CONFIG,
+                    start_sel=HIGHLIGHT_START,
+                    stop_sel=HIGHLIGHT_STOP,
+                    max_words=35,
+                    min_words=15,
+                    max_fragments=2,
+                    fragment_delimiter=" … ",
+                ),
+            )
+            .order_by("-search_rank", "-submission_date")
+        )
+
+    scores = job_index.search(queryset.model, terms)
+    if not scores:
+        # keep the annotation so callers can still order by it
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return (
+        queryset
+        .filter(pk__in=ranked)
+        .annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(scores[pk])) for pk in ranked],
+                output_field=FloatField(),
+            ),
+            search_position=Case(
+                *[When(pk=pk, then=Value(pos)) for pos, pk in enumerate(ranked)],
+                output_field=IntegerField(),
+            ),
+        )
+        .order_by("search_position")
+    )
+
+
+def attach_snippets(jobs, keyword: str):
+    """
+    Give fetched fallback results the ``search_snippet`` that PostgreSQL
+    annotates in the query. Pass only the rows being rendered.
+    """
+    terms = tokenize(keyword)
+    for job in jobs:
+        if terms and not hasattr(job, "search_snippet"):
+            job.search_snippet = fallback_snippet(job.description, terms)
+    return jobs
+
+
+def reindex_jobs(queryset) -> int:
+    """
+    Recompute stored search vectors for ``queryset`` (bulk loads, admin
+    actions and other writes that bypass ``Job.save``).
+    """
+    if uses_postgres(queryset.db):
+        return queryset.update(search_vector=job_search_vector())
+    count = 0
+    for job in queryset.only("pk", *SEARCH_FIELDS):
+        job_index.update(job)
+        count += 1
+    return count
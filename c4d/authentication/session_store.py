@@ -0,0 +1,89 @@
+"""
+Cached-DB session engine that only writes when something changed.
+
+Django marks a session modified on any assignment, so views that set a flag
+to the value it already has (``mfa_confirmed`` on every dashboard hit, the
+key cycle in a password change followed by the middleware save) each cost
+an UPDATE plus a cache set. This store remembers a digest of the data as
+loaded or last saved and turns a save of identical data into a no-op, which
+also collapses several saves in one request into the first real one. An
+unchanged session is still re-saved every ``SESSION_WRITE_REFRESH`` seconds
+so the database expiry keeps moving with the cookie.
+
+    SESSION_ENGINE = "authentication.session_store"
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone
+
+WRITTEN_AT_KEY = "_session_written_at"
+
+
+class SessionStore(CachedDBStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._saved_digest = None
+        self.writes = 0
+
+    def _digest(self, data) -> str:
+        content = {key: value for key, value in data.items() if key != WRITTEN_AT_KEY}
+        return hashlib.sha1(self.serializer().dumps(content)).hexdigest()
+
+    def load(self):
+        data = super().load()
+        if data:
+            self._saved_digest = self._digest(data)
+        return data
+
+    def _needs_refresh(self, data) -> bool:
+        interval = getattr(settings, "SESSION_WRITE_REFRESH", 300)
+        return time.time() - data.get(WRITTEN_AT_KEY, 0) >= interval
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            # create() comes back here with must_create=True
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        if (
+            not must_create
+            and self._saved_digest == self._digest(data)
+            and not self._needs_refresh(data)
+        ):
+            return
+        data[WRITTEN_AT_KEY] = int(time.time())
+        super().save(must_create)
+        self._saved_digest = self._digest(data)
+        self.writes += 1
+
+    def cycle_key(self):
+        # the new key must be written even though the data is the same
+        self._saved_digest = None
+        super().cycle_key()
+
+    def clear(self):
+        super().clear()
+        self._saved_digest = None
+
+    @classmethod
+    def clear_expired(cls, batch_size: int = 5000) -> int:
+        """
+        Delete expired rows in batches so a large backlog does not hold one
+        long lock. Returns the number of rows removed.
+        """
+        model = cls.get_model_class()
+        removed = 0
+        while True:
+            keys = list(
+                model.objects
+                .filter(expire_date__lt=timezone.now())
+                .values_list("session_key", flat=True)[:batch_size]
+            )
+            if not keys:
+                return removed
+            removed += model.objects.filter(session_key__in=keys).delete()[0]
@@ -1,11 +1,66 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.conf import settings
-from .models import Profile
+from .models import Profile, Job, JobApplication, Message, UnreadMessageCounter
+from . import search
+from .caching import bump_job_board_version
+from .access import invalidate_profile_summary
+from .dashboard import invalidate_dashboard
+from .realtime import publish_message
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_or_update_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)  
+        UnreadMessageCounter.objects.create(user=instance)
     else:
         instance.profile.save()  # Save/update profile for existing user
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def drop_cached_profile_summary(sender, instance, **kwargs):
+    # Drop the cached header/onboarding state (see authentication.access)
+    invalidate_profile_summary(instance.user_id)
+
+
+@receiver(post_save, sender=Job)
+def update_job_search_vector(sender, instance, raw=False, **kwargs):
+    # Keep the full-text index in step with the listing text
+    if raw:
+        return
+    search.reindex_jobs(Job.objects.filter(pk=instance.pk))
+    bump_job_board_version()
+
+
+@receiver(post_delete, sender=Job)
+def discard_job_search_entry(sender, instance, **kwargs):
+    search.job_index.discard(instance.pk)
+    bump_job_board_version()
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def drop_applicant_dashboard(sender, instance, **kwargs):
+    # New applications and status changes alter the applicant's counts
+    invalidate_dashboard(instance.user_id)
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def drop_recipient_dashboard(sender, instance, **kwargs):
+    invalidate_dashboard(instance.recipient_id)
+
+
+@receiver(post_save, sender=Message)
+def push_new_message(sender, instance, created, raw=False, **kwargs):
+    # delivered to open pages once the message commits
+    if created and not raw:
+        publish_message(instance)
+
+
+@receiver(post_delete, sender=Message)
+def release_unread_count(sender, instance, **kwargs):
+    # runs inside the delete's transaction, like Message.save
+    if instance._unread_for is not None:
+        UnreadMessageCounter.adjust(instance._unread_for, -1)
@@ -0,0 +1,566 @@
+"""
+Static asset pipeline (``STATIC_PIPELINE=True``).
+
+``collectstatic`` copies every file under a content-hashed name
+(``styles.3f1c2a9b04de.css``, via Django's manifest storage) and writes gzip
+and brotli variants next to each compressible one (``….css.gz``,
+``….css.br``). ``StaticFilesMiddleware`` then serves ``STATIC_ROOT`` from an
+in-memory index built once per process: the smallest variant the client
+accepts, an ETag, and one-year ``immutable`` caching for hashed names, so
+repeat visits make no requests for assets at all. Unhashed names (for URLs
+built outside templates) are cached briefly and revalidated. Byte-range
+requests get partial responses, so video streams and seeks.
+
+Brotli is optional; without the ``brotli`` package only gzip variants are
+written.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.contrib.staticfiles.utils import matches_patterns
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseNotAllowed,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.http import http_date
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# not in Python's own table before 3.13, nor in every /etc/mime.types
+mimetypes.add_type("image/avif", ".avif")
+mimetypes.add_type("image/webp", ".webp")
+
+# (Content-Encoding, file suffix), best first
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+COMPRESSIBLE_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".json", ".map", ".svg", ".txt", ".xml", ".html",
+    ".ttf", ".otf", ".eot", ".ico", ".csv",
+}
+# smaller files gain less than the headers cost
+MIN_COMPRESS_SIZE = 256
+# keep a variant only when it is at least this much smaller
+MIN_SAVING = 0.05
+BROTLI_QUALITY = getattr(settings, "STATIC_BROTLI_QUALITY", 11)
+# threads for copying, hashing and compressing (zlib, brotli and hashlib
+# release the GIL)
+STATIC_WORKERS = getattr(settings, "STATIC_WORKERS", 0) or os.cpu_count() or 1
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = f"public, max-age={getattr(settings, 'STATIC_MAX_AGE', 60)}, must-revalidate"
+
+# the 12 hex digits ManifestStaticFilesStorage puts in hashed names
+_HASHED_NAME_RE = re.compile(r"\.([0-9a-f]{12})(?:\.[^./]+)?$")
+
+
+def is_compressible(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def _write_if_smaller(path: str, data: bytes, original_size: int) -> int | None:
+    if len(data) > original_size * (1 - MIN_SAVING):
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    with open(path, "wb") as handle:
+        handle.write(data)
+    return len(data)
+
+
+def compress_file(path: str, content_addressed: bool = False) -> dict[str, int]:
+    """
+    Write the gzip and brotli variants of ``path`` that are worth keeping.
+    Variants newer than the file are reused, and any existing variant of a
+    ``content_addressed`` (hashed) name, whose content cannot have changed.
+    Returns {encoding: size}.
+    """
+    sizes = {}
+    source_mtime = os.path.getmtime(path)
+    pending = []
+    for encoding, suffix in ENCODINGS:
+        if encoding == "br" and not BROTLI_AVAILABLE:
+            continue
+        variant = path + suffix
+        if os.path.exists(variant) and (content_addressed or os.path.getmtime(variant) >= source_mtime):
+            sizes[encoding] = os.path.getsize(variant)
+        else:
+            pending.append((encoding, variant))
+    if not pending:
+        return sizes
+
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return sizes
+    for encoding, variant in pending:
+        if encoding == "br":
+            compressed = brotli.compress(data, quality=BROTLI_QUALITY)
+        else:
+            # mtime=0 keeps the output identical between builds
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        size = _write_if_smaller(variant, compressed, len(data))
+        if size is not None:
+            sizes[encoding] = size
+    return sizes
+
+
+# ---------- STORAGE ---------- #
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also precompresses the hashed files it writes.
+
+    An incremental collectstatic sets ``unchanged`` (original name -> hashed
+    name from the last run) for files whose content and hashed copy are
+    known to be current; those are neither re-read nor re-hashed. Files
+    that reference others (CSS) are always processed again.
+    """
+
+    # templates fall back to hashing on the fly instead of failing the page
+    manifest_strict = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.unchanged: dict[str, str] = {}
+        self.workers = STATIC_WORKERS
+        self.timings: dict[str, float] = {}
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # referenced but never collected: link the plain name, which
+            # 404s as it did before rather than failing the whole page
+            logger.warning("Static file %s is missing from STATIC_ROOT", name)
+            return name
+
+    def url_converter(self, name, hashed_files, template=None):
+        convert = super().url_converter(name, hashed_files, template)
+
+        def converter(matchobj):
+            try:
+                return convert(matchobj)
+            except ValueError as exc:
+                # vendored libs reference files they do not ship (source
+                # maps, demo images); leave those references as they are
+                logger.debug("Not rewriting reference in %s: %s", name, exc)
+                return matchobj["matched"]
+
+        return converter
+
+    def post_process(self, paths, dry_run=False, **options):
+        started = time.perf_counter()
+        reused = {
+            name: hashed for name, hashed in self.unchanged.items()
+            if name in paths and not matches_patterns(name, self._patterns)
+        }
+        paths = {name: value for name, value in paths.items() if name not in reused}
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        if reused:
+            for name, hashed in reused.items():
+                self.hashed_files.setdefault(self.hash_key(self.clean_name(name)), hashed)
+            self.save_manifest()
+        self.timings["post-process"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        names = [name for name in sorted(set(self.hashed_files.values())) if is_compressible(name)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            sizes = pool.map(lambda name: compress_file(self.path(name), content_addressed=True), names)
+            self.compressed = dict(zip(names, sizes))
+        self.timings["compress"] = time.perf_counter() - started
+
+
+# ---------- INCREMENTAL COLLECTION ---------- #
+
+INDEX_NAME = ".collectstatic-index.json"
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.md5(usedforsecurity=False)
+    with open(path, "rb") as handle:
+        while chunk := handle.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SourceIndex:
+    """
+    Content hash, size and mtime of every source collected last time, by
+    destination path, kept in ``STATIC_ROOT``. A source whose size and
+    mtime match is taken as unchanged without reading it; otherwise it is
+    hashed, so a fresh checkout (new mtimes, same bytes) still counts as
+    unchanged.
+    """
+
+    version = 1
+
+    def __init__(self, path: str, storage: str):
+        self.path = path
+        self.storage = storage
+        self.sources: dict[str, list] = {}
+        self.timings: dict[str, float] = {}
+
+    @classmethod
+    def load(cls, path: str, storage: str) -> "SourceIndex":
+        index = cls(path, storage)
+        try:
+            with open(path, encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return index
+        # outputs of another storage backend are not reusable
+        if data.get("version") == cls.version and data.get("storage") == storage:
+            index.sources = data.get("sources", {})
+        return index
+
+    def fingerprint(self, name: str, source_path: str) -> list:
+        """
+        [content hash, size, mtime in ns] of ``source_path``.
+        """
+        stat = os.stat(source_path)
+        known = self.sources.get(name)
+        if known and known[1] == stat.st_size and known[2] == stat.st_mtime_ns:
+            return known
+        return [file_digest(source_path), stat.st_size, stat.st_mtime_ns]
+
+    def digest(self, name: str) -> str | None:
+        known = self.sources.get(name)
+        return known[0] if known else None
+
+    def save(self, sources: dict[str, list], timings: dict[str, float]) -> None:
+        data = {
+            "version": self.version,
+            "storage": self.storage,
+            "sources": sources,
+            "timings": {phase: round(seconds, 3) for phase, seconds in timings.items()},
+        }
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, sort_keys=True)
+        os.replace(temporary, self.path)
+
+
+def prune(root: str, expected: set[str], dry_run: bool = False) -> list[str]:
+    """
+    Delete the files under ``root`` that are not in ``expected`` (relative
+    names) and the directories left empty. Returns the deleted names.
+    """
+    pruned = []
+    for directory, _dirs, filenames in os.walk(root, topdown=False):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, "/")
+            if name not in expected:
+                pruned.append(name)
+                if not dry_run:
+                    os.remove(path)
+        if not dry_run and directory != root and not os.listdir(directory):
+            os.rmdir(directory)
+    return sorted(pruned)
+
+
+# ---------- SERVING ---------- #
+
+@dataclass(frozen=True)
+class StaticFile:
+    path: str
+    size: int
+    content_type: str
+    charset: str | None
+    etag: str
+    last_modified: float
+    immutable: bool
+    # (encoding, path, size), best first
+    variants: tuple = field(default=())
+
+    def choose(self, accepted: set[str]) -> tuple[str | None, str, int]:
+        for encoding, path, size in self.variants:
+            if encoding in accepted:
+                return encoding, path, size
+        return None, self.path, self.size
+
+
+def _entry(root: str, name: str, hashed: bool) -> StaticFile:
+    path = os.path.join(root, name)
+    stat = os.stat(path)
+    match = _HASHED_NAME_RE.search(name) if hashed else None
+    if match:
+        etag = f'"{match.group(1)}"'
+    else:
+        etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+    content_type, _encoding = mimetypes.guess_type(name)
+    content_type = content_type or "application/octet-stream"
+    variants = []
+    for encoding, suffix in ENCODINGS:
+        if os.path.exists(path + suffix):
+            variants.append((encoding, path + suffix, os.path.getsize(path + suffix)))
+    return StaticFile(
+        path=path,
+        size=stat.st_size,
+        content_type=content_type,
+        charset="utf-8" if content_type.startswith("text/") or content_type.endswith(("javascript", "json")) else None,
+        etag=etag,
+        last_modified=stat.st_mtime,
+        immutable=hashed,
+        variants=tuple(variants),
+    )
+
+
+class StaticFileIndex:
+    """
+    URL path (relative to ``STATIC_URL``) -> StaticFile for everything under
+    ``STATIC_ROOT``. Built on first use (a walk and a stat of every file, so
+    StaticFilesMiddleware builds it at startup); ``STATIC_ROOT`` only changes
+    with a deploy, which restarts the workers.
+    """
+
+    def __init__(self, root: str | None = None):
+        self._root = root
+        self._lock = threading.Lock()
+        self._files: dict[str, StaticFile] | None = None
+
+    @property
+    def root(self) -> str:
+        return self._root or settings.STATIC_ROOT
+
+    def _hashed_names(self) -> set[str]:
+        manifest = os.path.join(self.root, ManifestStaticFilesStorage.manifest_name)
+        try:
+            with open(manifest, encoding="utf-8") as handle:
+                return set(json.load(handle).get("paths", {}).values())
+        except (OSError, ValueError):
+            return set()
+
+    def _load(self) -> dict[str, StaticFile]:
+        files = {}
+        root = self.root
+        hashed = self._hashed_names()
+        suffixes = tuple(suffix for _encoding, suffix in ENCODINGS)
+        for directory, _dirs, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.startswith("."):
+                    continue  # the collectstatic index, editor files
+                if filename.endswith(suffixes) and os.path.exists(os.path.join(directory, filename[: filename.rfind(".")])):
+                    continue  # a variant, attached to its file
+                name = os.path.relpath(os.path.join(directory, filename), root).replace(os.sep, "/")
+                files[name] = _entry(root, name, name in hashed)
+        return files
+
+    @property
+    def loaded(self) -> bool:
+        return self._files is not None
+
+    @property
+    def files(self) -> dict[str, StaticFile]:
+        if self._files is None:
+            with self._lock:
+                if self._files is None:
+                    self._files = self._load()
+        return self._files
+
+    def get(self, name: str) -> StaticFile | None:
+        return self.files.get(name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files = None
+
+
+static_index = StaticFileIndex()
+
+_ACCEPT_ENCODING_RE = re.compile(r"\s*([a-z0-9*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?", re.IGNORECASE)
+
+
+def accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        match = _ACCEPT_ENCODING_RE.match(part)
+        if not match:
+            continue
+        coding, quality = match.group(1).lower(), match.group(2)
+        if quality is not None and float(quality or 0) == 0:
+            continue
+        accepted.add(coding)
+    if "*" in accepted:
+        accepted.update(encoding for encoding, _suffix in ENCODINGS)
+    return accepted
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # weak comparison, as for If-None-Match
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in tags
+
+
+_RANGE_RE = re.compile(r"^\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*$", re.IGNORECASE)
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def requested_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    (first, last) byte of a single-range ``Range`` header, clamped to the
+    file. None for no header, a malformed one or several ranges, which are
+    all answered with the whole file.
+    """
+    match = _RANGE_RE.match(header) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if first and last and int(last) < int(first):
+        return None  # an invalid range is ignored, not refused
+    if not first:
+        # a suffix: the final ``last`` bytes
+        if int(last) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - int(last), 0), size - 1
+    if int(first) >= size:
+        raise RangeNotSatisfiable
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+def _read(path: str, offset: int = 0, length: int | None = None, block_size: int = FileResponse.block_size):
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        remaining = length
+        while remaining is None or remaining > 0:
+            chunk = handle.read(block_size if remaining is None else min(block_size, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+async def _aread(path: str, offset: int = 0, length: int | None = None, block_size: int = FileResponse.block_size):
+    # Django would otherwise pull a sync file iterator through a thread
+    # one chunk at a time, with a warning for every response
+    handle = await sync_to_async(open, thread_sensitive=False)(path, "rb")
+    try:
+        handle.seek(offset)
+        remaining = length
+        while remaining is None or remaining > 0:
+            size = block_size if remaining is None else min(block_size, remaining)
+            chunk = await sync_to_async(handle.read, thread_sensitive=False)(size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def _range(request, entry: StaticFile, etag: str) -> tuple[int, int] | None:
+    if request.method != "GET":
+        return None
+    # If-Range: the range only applies to the representation the client
+    # already has part of; otherwise send it all again
+    if_range = request.headers.get("If-Range", "").strip()
+    if if_range and if_range not in (etag, http_date(entry.last_modified)):
+        return None
+    return requested_range(request.headers.get("Range", ""), entry.size)
+
+
+def static_response(request, index: StaticFileIndex = static_index, asynchronous: bool = False):
+    """
+    The response for a request under ``STATIC_URL`` that names a file in
+    ``STATIC_ROOT``, or None to let the request through. Single byte ranges
+    of uncompressed responses are honoured (206/416). ``asynchronous``
+    streams the body with an async iterator (ASGI).
+    """
+    prefix = settings.STATIC_URL
+    if not request.path_info.startswith(prefix):
+        return None
+    entry = index.get(request.path_info[len(prefix):])
+    if entry is None:
+        return None
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+
+    encoding, path, size = entry.choose(accepted_encodings(request.headers.get("Accept-Encoding", "")))
+    # each encoding is a different representation with its own validator
+    etag = entry.etag if encoding is None else f'{entry.etag[:-1]}-{encoding}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if entry.immutable else REVALIDATE_CACHE_CONTROL,
+        "Last-Modified": http_date(entry.last_modified),
+    }
+    if entry.variants:
+        headers["Vary"] = "Accept-Encoding"
+
+    if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+        response = HttpResponseNotModified()
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    byte_range = None
+    if encoding is None:
+        # ranges of the uncompressed file, so video seeks and streams
+        # instead of downloading in full
+        headers["Accept-Ranges"] = "bytes"
+        try:
+            byte_range = _range(request, entry, etag)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            for header, value in headers.items():
+                response[header] = value
+            return response
+
+    content_type = entry.content_type
+    if entry.charset:
+        content_type += f"; charset={entry.charset}"
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type)
+    elif byte_range:
+        first, last = byte_range
+        length = last - first + 1
+        body = _aread(path, first, length) if asynchronous else _read(path, first, length)
+        response = StreamingHttpResponse(body, status=206, content_type=content_type)
+        response["Content-Range"] = f"bytes {first}-{last}/{size}"
+        size = length
+    elif asynchronous:
+        response = StreamingHttpResponse(_aread(path), content_type=content_type)
+    else:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+        # served inline under its URL, not as a named download
+        response.headers.pop("Content-Disposition", None)
+    response["Content-Length"] = str(size)
+    if encoding:
+        response["Content-Encoding"] = encoding
+    for header, value in headers.items():
+        response[header] = value
+    return response
@@ -0,0 +1,291 @@
+"""
+Production Tailwind builds, one stylesheet per layout.
+
+Each bundle in ``TAILWIND_BUNDLES`` names a template directory
+(``layouts``, ``01_layouts``, ``account``). Its pages are the templates in
+that directory plus every template that extends one of them; its sources are
+those pages with everything they extend and include, followed transitively.
+The Tailwind CLI is pointed at exactly those files (``source(none)`` plus one
+``@source`` per file), so each bundle carries only the utilities its pages
+use, minified. Pages outside every bundle keep ``TAILWIND_FALLBACK_CSS``.
+
+``bundles.json`` next to the bundles maps every page to its bundle and
+records each bundle's content hash; ``{% tailwind_css %}`` (templatetags
+``assets``) reads it to link the right file. Under ``STATIC_PIPELINE`` the
+bundles get hashed names from collectstatic like every other file.
+
+Only literal ``{% extends %}``/``{% include %}`` names are followed; classes
+built in Python go through ``TAILWIND_EXTRA_SOURCES``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+
+BUNDLE_DIR = getattr(settings, "TAILWIND_BUNDLE_DIR", "assets/css/bundles")
+MANIFEST_NAME = "bundles.json"
+FALLBACK_CSS = getattr(settings, "TAILWIND_FALLBACK_CSS", "assets/css/output.css")
+
+_REFERENCE_RE = re.compile(r"""\{%\s*(extends|include)\s+["']([^"']+)["']""")
+_IMPORT_RE = re.compile(r"""@import\s+["']tailwindcss["']\s*;""")
+_LFS_POINTER = b"version https://git-lfs"
+
+
+class TailwindError(Exception):
+    pass
+
+
+# ---------- TEMPLATE GRAPH ---------- #
+
+def template_dirs() -> list[Path]:
+    """
+    Project template directories, then the templates of apps that live in
+    this project (third-party app templates carry no project classes).
+    """
+    dirs = [Path(directory) for engine in settings.TEMPLATES for directory in engine.get("DIRS", ())]
+    base = Path(settings.BASE_DIR).resolve()
+    for app_config in apps.get_app_configs():
+        app_templates = Path(app_config.path) / "templates"
+        if base in app_templates.resolve().parents:
+            dirs.append(app_templates)
+    return [directory for directory in dirs if directory.is_dir()]
+
+
+@dataclass
+class TemplateGraph:
+    # template name -> file, first directory wins as with the loaders
+    paths: dict[str, Path] = field(default_factory=dict)
+    parents: dict[str, str] = field(default_factory=dict)
+    includes: dict[str, list[str]] = field(default_factory=dict)
+
+    @classmethod
+    def scan(cls, dirs=None) -> "TemplateGraph":
+        graph = cls()
+        for directory in dirs if dirs is not None else template_dirs():
+            for path in sorted(directory.rglob("*.html")):
+                name = path.relative_to(directory).as_posix()
+                if name in graph.paths:
+                    continue
+                graph.paths[name] = path
+                text = path.read_text(encoding="utf-8", errors="replace")
+                for kind, target in _REFERENCE_RE.findall(text):
+                    if kind == "extends":
+                        graph.parents.setdefault(name, target)
+                    else:
+                        graph.includes.setdefault(name, []).append(target)
+        return graph
+
+    def ancestors(self, name: str) -> list[str]:
+        chain = []
+        while (name := self.parents.get(name)) and name not in chain:
+            chain.append(name)
+        return chain
+
+    def closure(self, names) -> set[str]:
+        """
+        ``names`` with everything they extend and include, transitively.
+        """
+        seen = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            pending.extend(self.ancestors(name))
+            pending.extend(self.includes.get(name, ()))
+        return seen
+
+    def pages(self, directory: str) -> tuple[set[str], set[str]]:
+        """
+        (templates in ``directory``, templates extending one of them).
+        """
+        prefix = directory.rstrip("/") + "/"
+        members = {name for name in self.paths if name.startswith(prefix)}
+        descendants = {
+            name for name in self.paths
+            if name not in members and any(parent in members for parent in self.ancestors(name))
+        }
+        return members, descendants
+
+
+# ---------- BUILD ---------- #
+
+def tailwind_command() -> list[str]:
+    """
+    The Tailwind CLI as an argv prefix: ``TAILWIND_CLI`` (a path, a name on
+    PATH or a command such as ``npx @tailwindcss/cli``), else the binary
+    committed at the repository root.
+    """
+    configured = getattr(settings, "TAILWIND_CLI", "") or ""
+    candidates = [configured] if configured else ["tailwindcss", str(Path(settings.BASE_DIR).parent / "tailwindcss")]
+    for candidate in candidates:
+        argv = shlex.split(candidate)
+        executable = shutil.which(argv[0]) or (argv[0] if os.path.isfile(argv[0]) else None)
+        if executable is None:
+            continue
+        with open(executable, "rb") as handle:
+            if handle.read(len(_LFS_POINTER)) == _LFS_POINTER:
+                raise TailwindError(f"{executable} is a Git LFS pointer; run `git lfs pull` or set TAILWIND_CLI.")
+        return [executable, *argv[1:]]
+    raise TailwindError("Tailwind CLI not found; install it or set TAILWIND_CLI.")
+
+
+def bundle_input(source_css: str, sources) -> str:
+    """
+    ``source_css`` restricted to scanning ``sources`` (Tailwind v4 syntax).
+    """
+    if not _IMPORT_RE.search(source_css):
+        raise TailwindError('The input stylesheet must use Tailwind v4\'s `@import "tailwindcss";`.')
+    restricted = _IMPORT_RE.sub('@import "tailwindcss" source(none);', source_css, count=1)
+    lines = [f'@source "{Path(source).resolve().as_posix()}";' for source in sorted(map(str, sources))]
+    return restricted + "\n" + "\n".join(lines) + "\n"
+
+
+@dataclass
+class BundleResult:
+    name: str
+    static_name: str
+    pages: list[str]
+    sources: int
+    size: int
+    gzip_size: int
+    digest: str
+
+
+def _static_dir() -> Path:
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+def build_bundle(command, name: str, sources, input_path: Path) -> bytes:
+    """
+    Run the CLI for one bundle and return the minified CSS.
+    """
+    source_css = input_path.read_text(encoding="utf-8")
+    # written next to the input so its relative @imports still resolve
+    with tempfile.NamedTemporaryFile("w", suffix=".css", prefix=f".{name}.", dir=input_path.parent, delete=False, encoding="utf-8") as handle:
+        handle.write(bundle_input(source_css, sources))
+        temporary_input = Path(handle.name)
+    temporary_output = temporary_input.with_suffix(".out.css")
+    try:
+        completed = subprocess.run(
+            [*command, "--input", str(temporary_input), "--output", str(temporary_output), "--minify"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode:
+            raise TailwindError(f"tailwindcss failed for bundle {name}:\n{completed.stderr or completed.stdout}")
+        return temporary_output.read_bytes()
+    finally:
+        temporary_input.unlink(missing_ok=True)
+        temporary_output.unlink(missing_ok=True)
+
+
+def build_bundles(bundles=None, graph: TemplateGraph | None = None) -> list[BundleResult]:
+    """
+    Build every bundle, write them and ``bundles.json`` under the first
+    ``STATICFILES_DIRS`` entry, and return what was written.
+    """
+    configured = list(getattr(settings, "TAILWIND_BUNDLES", ()))
+    if bundles and set(bundles) - set(configured):
+        raise TailwindError(f"Unknown bundle(s): {', '.join(sorted(set(bundles) - set(configured)))}")
+    partial = bool(bundles) and set(bundles) != set(configured)
+    bundles = list(bundles) if bundles else configured
+    graph = graph or TemplateGraph.scan()
+    command = tailwind_command()
+    input_path = Path(getattr(settings, "TAILWIND_INPUT", _static_dir() / "assets/css/input.css"))
+    extra_sources = [Path(source) for source in getattr(settings, "TAILWIND_EXTRA_SOURCES", ())]
+    output_dir = _static_dir() / BUNDLE_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # pages in a bundle's own directory belong to it, then the first bundle
+    # whose layout they extend
+    # (decided over all configured bundles, so a partial build agrees)
+    owner = {}
+    memberships = {name: graph.pages(name) for name in configured}
+    for name in configured:
+        for page in memberships[name][0]:
+            owner.setdefault(page, name)
+    for name in configured:
+        for page in memberships[name][1]:
+            owner.setdefault(page, name)
+
+    results = []
+    for name in bundles:
+        pages = sorted(page for page, bundle in owner.items() if bundle == name)
+        sources = [graph.paths[template] for template in sorted(graph.closure(pages)) if template in graph.paths]
+        sources += [source for source in extra_sources if source.exists()]
+        css = build_bundle(command, name, sources, input_path)
+        static_name = f"{BUNDLE_DIR}/{name}.css"
+        (output_dir / f"{name}.css").write_bytes(css)
+        results.append(BundleResult(
+            name=name,
+            static_name=static_name,
+            pages=pages,
+            sources=len(sources),
+            size=len(css),
+            gzip_size=len(gzip.compress(css, compresslevel=9, mtime=0)),
+            digest=hashlib.md5(css, usedforsecurity=False).hexdigest()[:12],
+        ))
+
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest = {"bundles": {}, "pages": {}}
+    if partial and manifest_path.exists():
+        # keep the entries of the bundles not rebuilt this time
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        manifest["pages"] = {page: bundle for page, bundle in manifest["pages"].items() if bundle not in bundles}
+    for result in results:
+        manifest["bundles"][result.name] = {"file": result.static_name, "hash": result.digest, "bytes": result.size}
+        for page in result.pages:
+            manifest["pages"][page] = result.name
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return results
+
+
+# ---------- LOOKUP ---------- #
+
+_manifest_cache: tuple[float, dict] | None = None
+
+
+def bundle_manifest() -> dict:
+    """
+    The built ``bundles.json`` (empty before the first build), re-read when
+    it changes.
+    """
+    global _manifest_cache
+    from django.contrib.staticfiles import finders
+
+    path = finders.find(f"{BUNDLE_DIR}/{MANIFEST_NAME}")
+    if not path:
+        return {}
+    mtime = os.path.getmtime(path)
+    if _manifest_cache is None or _manifest_cache[0] != mtime:
+        with open(path, encoding="utf-8") as handle:
+            _manifest_cache = (mtime, json.load(handle))
+    return _manifest_cache[1]
+
+
+def stylesheet_for(template_name: str | None) -> tuple[str, str | None]:
+    """
+    (static name, content hash or None) of the stylesheet a page links.
+    """
+    manifest = bundle_manifest()
+    bundle = manifest.get("pages", {}).get(template_name or "")
+    if bundle is None:
+        return FALLBACK_CSS, None
+    entry = manifest["bundles"][bundle]
+    return entry["file"], entry.get("hash")
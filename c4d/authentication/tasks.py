@@ -0,0 +1,56 @@
+"""
+In-process background worker pool.
+
+Work that should not hold a request thread (file post-processing and the
+like) is handed to a small thread pool once the surrounding transaction
+commits. State that must survive a restart belongs in the database, with a
+management command to pick up anything left unfinished.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "BACKGROUND_WORKERS", 2),
+                thread_name_prefix="c4d-background",
+            )
+        return _executor
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(func, "__qualname__", func))
+    finally:
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs) -> None:
+    """
+    Run ``func(*args, **kwargs)`` on the worker pool after the current
+    transaction commits (immediately when not in one). With
+    ``BACKGROUND_TASKS_EAGER`` set it runs inline instead, which keeps tests
+    deterministic.
+    """
+    if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        transaction.on_commit(lambda: func(*args, **kwargs))
+        return
+    transaction.on_commit(lambda: get_executor().submit(_run, func, args, kwargs))
@@ -0,0 +1,113 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from authentication.iconfonts import icon_stylesheets_for, trimmed_stylesheet
+from authentication.responsive import FORMATS, image_entry, poster_for
+from authentication.tailwind import stylesheet_for
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def tailwind_css(context):
+    """
+    Link the page's Tailwind bundle (see authentication.tailwind), or the
+    full stylesheet when the page is in no bundle or nothing was built.
+
+        {% tailwind_css %}
+    """
+    page = getattr(context.template, "name", None)
+    name, digest = stylesheet_for(page)
+    return format_html('<link href="{}" rel="stylesheet">', _versioned(name, digest))
+
+
+@register.simple_tag(takes_context=True)
+def icon_fonts(context):
+    """
+    Link the icon-font subsets the page uses (see authentication.iconfonts)
+    and preload their fonts; nothing before the first build.
+
+        {% icon_fonts %}
+    """
+    entries = icon_stylesheets_for(getattr(context.template, "name", None))
+    preloads = format_html_join(
+        "\n",
+        '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin>',
+        ((static(font),) for entry in entries for font in entry.get("fonts", ())),
+    )
+    links = format_html_join(
+        "\n",
+        '<link href="{}" rel="stylesheet">',
+        ((_versioned(entry["file"], entry.get("hash")),) for entry in entries),
+    )
+    return format_html("{}\n{}", preloads, links) if entries else ""
+
+
+@register.simple_tag
+def without_icon_fonts(name):
+    """
+    URL of the stylesheet ``name`` minus the icon fonts it inlines, which
+    ``{% icon_fonts %}`` links as subsets instead; ``name`` itself before the
+    first build.
+
+        <link href="{% without_icon_fonts 'assets/css/styles.css' %}" rel="stylesheet">
+    """
+    return _versioned(*trimmed_stylesheet(name))
+
+
+@register.simple_tag
+def responsive_image(name, alt="", sizes="", loading="lazy", **attrs):
+    """
+    ``<picture>`` with a ``srcset`` per derivative format (see
+    authentication.responsive) around a lazily decoded ``<img>`` of the
+    original. ``sizes`` defaults to "full width, up to the intrinsic
+    width"; other keyword arguments become ``<img>`` attributes
+    (``data_id`` -> ``data-id``). Pass ``loading="eager"`` for images above
+    the fold.
+
+        {% responsive_image 'assets/images/faces/1.jpg' alt="" sizes="2.5rem" class="rounded" %}
+    """
+    entry = image_entry(name)
+    img_attrs = {"src": static(name), "alt": alt, "loading": loading, "decoding": "async"}
+    if entry:
+        # reserves the box before the image arrives
+        img_attrs.update(width=entry["width"], height=entry["height"])
+    img_attrs.update((key.replace("_", "-"), value) for key, value in attrs.items())
+    img = format_html("<img {}>", format_html_join(" ", '{}="{}"', img_attrs.items()))
+    if not entry or not entry["sources"]:
+        return img
+
+    sizes = sizes or f"(max-width: {entry['width']}px) 100vw, {entry['width']}px"
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (FORMATS[format_name][1], ", ".join(f"{static(file)} {width}w" for file, width in variants), sizes)
+            for format_name, variants in entry["sources"].items()
+            if format_name in FORMATS
+        ),
+    )
+    # display: contents keeps the wrapper out of the layout, so an <img>
+    # styled as a flex or grid child still is one
+    return format_html('<picture style="display: contents">{}{}</picture>', sources, img)
+
+
+@register.simple_tag
+def video_poster(name):
+    """
+    URL of the poster frame generated for the video ``name``, or "".
+
+        <video src="{% static 'assets/video/1.mp4' %}" poster="{% video_poster 'assets/video/1.mp4' %}" preload="none" controls></video>
+    """
+    poster = poster_for(name)
+    return static(poster) if poster else ""
+
+
+def _versioned(name, digest):
+    url = static(name)
+    if digest and not settings.STATIC_PIPELINE:
+        # hashed file names come from the pipeline; bust caches without it
+        url = f"{url}?v={digest}"
+    return url
@@ -1,5 +1,7 @@
 from django import template
 
+from authentication.search import render_highlight
+
 register = template.Library()
 
 @register.filter
@@ -11,3 +13,24 @@ def split(value, delimiter):
         return value.split(delimiter)
     except AttributeError:
         return []
+
+
+@register.filter
+def highlight(value):
+    """
+    Render a search snippet with matched terms wrapped in <mark> tags.
+    """
+    return render_highlight(value)
+
+
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor, param="cursor"):
+    """
+    Current query string with the pagination cursor swapped for ``cursor``,
+    so filters survive next/previous links.
+    """
+    params = context["request"].GET.copy()
+    params.pop(param, None)
+    if cursor:
+        params[param] = cursor
+    return f"?{params.urlencode()}"
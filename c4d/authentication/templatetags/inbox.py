@@ -0,0 +1,19 @@
+from django import template
+
+from authentication.inbox import unread_count
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def unread_message_count(context):
+    """
+    The current user's unread messages, read from their counter row.
+
+        {% unread_message_count as unread %}
+    """
+    request = context.get("request")
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return 0
+    return unread_count(user.pk)
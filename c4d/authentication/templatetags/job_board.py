@@ -0,0 +1,44 @@
+from django import template
+
+from authentication.caching import get_or_build, job_board_version, make_key
+
+register = template.Library()
+
+
+class JobBoardCacheNode(template.Node):
+    def __init__(self, nodelist, name, timeout, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.timeout = timeout
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = self.timeout.resolve(context)
+        vary = [var.resolve(context) for var in self.vary_on]
+        key = make_key(f"fragment:{self.name}", *vary, version=job_board_version())
+        return get_or_build(key, lambda: self.nodelist.render(context), int(timeout))
+
+
+@register.tag("jobboard_cache")
+def do_jobboard_cache(parser, token):
+    """
+    Cache a template fragment until the job board changes.
+
+        {% jobboard_cache "home-showcase" 600 [vary_on ...] %} ... {% endjobboard_cache %}
+
+    The key includes the job-board version, so any Job write retires the
+    fragment; rebuilds are stampede-protected (see caching.get_or_build).
+    Querysets used only inside the block are never evaluated on a hit.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes at least two arguments: name and timeout.")
+    nodelist = parser.parse(("endjobboard_cache",))
+    parser.delete_first_token()
+    name = bits[1].strip("\"'")
+    return JobBoardCacheNode(
+        nodelist,
+        name,
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
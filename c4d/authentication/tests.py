@@ -1,3 +1,1153 @@
-from django.test import TestCase
+"""
+Tests for the authentication app (pytest-django, settings from pytest.ini).
 
-# Create your tests here.
+    pytest authentication/tests.py
+
+The job-board listing templates are not part of this repository, so views
+that render them get a minimal stand-in (``LISTING_TEMPLATES``) touching the
+same related objects a real listing shows; their queries are counted like
+any template's.
+"""
+
+import asyncio
+import copy
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.messages import constants
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import caches
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.functions import Cast
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import AsyncClient, Client, RequestFactory, override_settings
+from django.urls import include, path, reverse
+from django.utils import timezone
+
+from . import iconfonts, mail, otp, realtime, responsive, tailwind, views
+from .caching import forget_job_board_version, job_board_version
+from .exports import EXPORT_COLUMNS, export_response, iter_export_rows
+from .importer import import_rfqts
+from .inbox import mark_read, mark_thread_read, rebuild_all_unread_counters, unread_count
+from .models import CustomUser, Job, JobApplication, OutboundEmail, Rfqt, UnreadMessageCounter
+from .models import Message as JobMessage
+from .otp import DatabaseOTPStore, OTPService, OTPThrottled
+from .pagination import CursorPaginator
+from .querybudget import assert_max_queries
+from .queryplans import HOT_QUERIES, explain
+from .session_store import SessionStore
+from .staticfiles import (
+    BROTLI_AVAILABLE,
+    INDEX_NAME,
+    SourceIndex,
+    StaticFileIndex,
+    compress_file,
+    prune,
+    static_response,
+)
+from .search import RANK_FIELD, attach_snippets, job_index, render_highlight, search_jobs
+
+LISTING_TEMPLATES = {
+    "admin/applications_list.html": (
+        "{% for application in applications %}"
+        "{{ application.job.title }} {{ application.user.email }} {{ application.full_name }} "
+        "{{ application.get_status_display }} {{ application.submission_date }}"
+        "{% endfor %}"
+        "{% for job in jobs %}{{ job.title }}{% endfor %}"
+    ),
+    "job_list.html": (
+        "{% load custom_filters %}"
+        "{% for job in page_obj %}{{ job.title }}|{{ job.search_snippet|highlight }}{% endfor %}"
+    ),
+    "job_detail.html": "{{ job.title }} applied={{ has_applied }}",
+    "my_applications.html": "{% for application in applications %}{{ application.job.title }}{% endfor %}",
+}
+
+
+# the async twins, mounted ahead of the project's URLs whatever ASYNC_VIEWS
+# was at import time
+urlpatterns = [
+    path("async/", views.home_view_async),
+    path("async/jobs/", views.job_list_view_async),
+    path("async/jobs/<int:job_id>/", views.job_detail_view_async),
+    path("async/my-applications/", views.my_applications_view_async),
+    path("async/events/", views.event_stream_view),
+    path("", include("a_core.urls")),
+]
+
+
+def _templates_with_listings():
+    templates = copy.deepcopy(settings.TEMPLATES)
+    engine = templates[0]
+    engine["APP_DIRS"] = False
+    engine["OPTIONS"]["loaders"] = [
+        ("django.template.loaders.locmem.Loader", LISTING_TEMPLATES),
+        "django.template.loaders.filesystem.Loader",
+        "django.template.loaders.app_directories.Loader",
+    ]
+    return templates
+
+
+def _clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    forget_job_board_version()
+    # the fallback search index outlives the rolled-back rows of earlier tests
+    job_index.clear()
+    # a running site has its job-board version counter already
+    job_board_version()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(db):
+    _clear_caches()
+
+
+@pytest.fixture
+def staff(db):
+    user = CustomUser.objects.create_user(email="staff@example.com", password="budget-Test-123", is_staff=True, is_superuser=True)
+    user.profile.onboarding_completed = True
+    user.profile.save()
+    return user
+
+
+@pytest.fixture
+def staff_client(client, staff):
+    client.force_login(staff)
+    session = client.session
+    session["mfa_confirmed"] = True
+    session.save()
+    return client
+
+
+def make_rows(user, count):
+    """
+    ``count`` more jobs, each with an application by its own applicant and
+    a message on that application.
+    """
+    start = Job.objects.count()
+    numbers = range(start, start + count)
+    jobs = Job.objects.bulk_create(
+        Job(title=f"Job {i}", short_description="Short", description="Long") for i in numbers
+    )
+    applicants = [
+        CustomUser.objects.create_user(email=f"applicant{i}@example.com", password=None)
+        for i in numbers
+    ]
+    applications = JobApplication.objects.bulk_create(
+        JobApplication(
+            job=job, user=applicant, full_name=f"Applicant {i}",
+            current_clearance="None", location_of_residence="ACT",
+        )
+        for i, (job, applicant) in enumerate(zip(jobs, applicants))
+    )
+    # the requesting user's own applications, for the dashboard table
+    JobApplication.objects.bulk_create(
+        JobApplication(job=job, user=user, full_name="Staff", current_clearance="None", location_of_residence="ACT")
+        for job in jobs
+    )
+    JobMessage.objects.bulk_create(
+        JobMessage(sender=application.user, recipient=user, job=application.job, application=application, content="Hi")
+        for application in applications
+    )
+
+
+# ---------- QUERY BUDGETS ---------- #
+
+# (url name or path, queries for the whole request: session, user, view and
+# template; shared-cache entries warm, per-worker ones such as the dashboard
+# summary built uncached)
+BUDGETED_PAGES = [
+    ("admin_applications", 7),
+    ("user_dashboard", 9),
+    ("dashboard_data", 8),
+    ("/admin/authentication/job/", 6),
+    ("/admin/authentication/jobapplication/", 8),
+    ("/admin/authentication/message/", 6),
+]
+ROWS = 3
+
+
+@pytest.mark.parametrize("page, budget", BUDGETED_PAGES)
+@override_settings(TEMPLATES=_templates_with_listings(), QUERY_BUDGET_STRICT=True)
+def test_query_count_does_not_grow_with_rows(staff_client, staff, page, budget):
+    url = page if page.startswith("/") else reverse(page)
+    counts = []
+    for rows in (ROWS, ROWS * 9):
+        # ROWS, then 10 x ROWS in total
+        make_rows(staff, rows)
+        _clear_caches()
+        with override_settings(QUERY_BUDGET_STRICT=False):
+            # first use fills the shared cache, which costs extra writes
+            staff_client.get(url)
+        caches["default"].clear()
+        with assert_max_queries(budget) as counter:
+            response = staff_client.get(url)
+        assert response.status_code == 200
+        counts.append(len(counter))
+    assert counts[0] == counts[1], f"{url}: {counts[0]} queries for {ROWS} rows, {counts[1]} for {ROWS * 10}"
+
+
+# ---------- HOME PAGE CACHE ---------- #
+
+def test_cached_home_page_never_holds_flash_messages(client):
+    request = RequestFactory().get("/")
+    response = HttpResponse()
+    CookieStorage(request)._store([Message(constants.SUCCESS, "Profile deleted SECRET-MARK")], response)
+
+    # a visitor with pending messages, e.g. right after deleting their profile
+    client.cookies[CookieStorage.cookie_name] = response.cookies[CookieStorage.cookie_name].value
+    assert b"SECRET-MARK" in client.get("/").content
+
+    assert b"SECRET-MARK" not in Client().get("/").content
+
+
+# ---------- ONE-TIME PASSCODES ---------- #
+
+def test_database_otp_store_verifies_locks_and_throttles(staff):
+    service = OTPService(DatabaseOTPStore())
+    code = service.issue(staff.pk)
+    with pytest.raises(OTPThrottled):
+        service.issue(staff.pk)
+    assert service.status(staff.pk).issued
+    assert service.verify(staff.pk, "not-it") == otp.INVALID
+    assert service.verify(staff.pk, code) == otp.VALID
+    # consumed
+    assert service.verify(staff.pk, code) == otp.EXPIRED
+
+    code = service.issue(staff.pk, throttle=False)
+    for _attempt in range(otp.OTP_MAX_ATTEMPTS):
+        assert service.verify(staff.pk, "not-it") == otp.INVALID
+    assert service.verify(staff.pk, code) == otp.LOCKED
+    assert not service.status(staff.pk).issued
+
+
+# ---------- QUERY PLANS ---------- #
+
+@pytest.mark.parametrize("query", HOT_QUERIES, ids=lambda query: query.name)
+def test_hot_query_uses_its_index(db, query):
+    if query.postgres_only and connection.vendor != "postgresql":
+        pytest.skip("PostgreSQL only")
+    plan = explain(query.build())
+    assert any(name in plan for name in query.indexes), f"{query.name} uses none of {query.indexes}:\n{plan}"
+
+
+# ---------- SEARCH ---------- #
+
+def test_search_ranks_title_matches_first_and_follows_edits(db):
+    in_description = Job.objects.create(title="Analyst", short_description="Short", description="Python scripting")
+    in_title = Job.objects.create(title="Python developer", short_description="Short", description="Backend work")
+    Job.objects.create(title="Tester", short_description="Short", description="Manual testing")
+
+    results = list(search_jobs(Job.objects.all(), "pyth"))
+    assert results == [in_title, in_description]
+    assert results[0].search_rank > results[1].search_rank
+    # every term has to match
+    assert list(search_jobs(Job.objects.all(), "python backend")) == [in_title]
+
+    attach_snippets(results, "python")
+    assert "<mark>Python</mark>" in render_highlight(results[1].search_snippet)
+
+    in_title.title = "Go developer"
+    in_title.save()
+    assert list(search_jobs(Job.objects.all(), "python")) == [in_description]
+    in_description.delete()
+    assert not search_jobs(Job.objects.all(), "python").exists()
+
+
+# ---------- CURSOR PAGINATION ---------- #
+
+def test_cursor_pages_round_trip_over_tied_ranks(db):
+    jobs = Job.objects.bulk_create(
+        Job(title=f"Job {i}", short_description="Short", description="Long") for i in range(25)
+    )
+    # three distinct ranks, so most rows tie with their neighbours; cast
+    # like the PostgreSQL search annotation
+    ranked = Job.objects.annotate(
+        search_rank=Cast(
+            Case(*[When(pk=job.pk, then=Value(job.pk % 3 / 4)) for job in jobs], output_field=FloatField()),
+            RANK_FIELD,
+        ),
+    )
+    paginator = CursorPaginator(ranked, 10, ordering=("-search_rank", "-submission_date", "-id"))
+    expected = list(ranked.order_by("-search_rank", "-submission_date", "-id"))
+    assert isinstance(expected[0].search_rank, Decimal)
+
+    pages = [paginator.page()]
+    while pages[-1].has_next():
+        pages.append(paginator.page(pages[-1].next_cursor))
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [job for page in pages for job in page] == expected
+    assert not pages[0].has_previous()
+
+    # and back again from the last page
+    back = pages[-1]
+    for page in reversed(pages[:-1]):
+        back = paginator.page(back.previous_cursor)
+        assert back.object_list == page.object_list
+    assert not back.has_previous()
+
+    assert paginator.page("tampered").object_list == pages[0].object_list
+
+
+# ---------- MAIL QUEUE ---------- #
+
+LOCMEM_MAIL = "django.core.mail.backends.locmem.EmailBackend"
+
+
+class RefusingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError("mail server down")
+
+
+def _queue_mail(to="user@example.com"):
+    message = EmailMultiAlternatives("Your code", "Code 123456", to=[to])
+    message.attach_alternative("<p>Code 123456</p>", "text/html")
+    message.attach("code.txt", "123456", "text/plain")
+    with override_settings(EMAIL_QUEUE_DELIVER_ON_COMMIT=False):
+        assert get_connection("authentication.mail.QueuedEmailBackend").send_messages([message]) == 1
+    return OutboundEmail.objects.get(recipient=to)
+
+
+def test_queued_mail_is_sent_once_and_redacted(db, mailoutbox):
+    email = _queue_mail()
+    assert not mailoutbox
+    assert email.status == "queued"
+
+    assert mail.deliver_queued(backend=LOCMEM_MAIL) == {"sent": 1, "deferred": 0, "failed": 0}
+    sent, = mailoutbox
+    assert sent.to == ["user@example.com"]
+    assert sent.alternatives[0][0] == "<p>Code 123456</p>"
+    assert sent.attachments[0][1] == "123456"
+
+    email.refresh_from_db()
+    assert (email.status, email.attempts) == ("sent", 1)
+    assert (email.body, email.alternatives, email.attachments) == ("", [], [])
+    # nothing left to send
+    assert mail.deliver_queued(backend=LOCMEM_MAIL) == {"sent": 0, "deferred": 0, "failed": 0}
+    assert len(mailoutbox) == 1
+
+
+def test_queued_mail_backs_off_then_gives_up(db):
+    email = _queue_mail()
+    refusing = f"{__name__}.RefusingEmailBackend"
+    for attempt in range(1, mail.MAX_ATTEMPTS + 1):
+        assert mail.deliver_batch(backend=refusing)["failed"] == 1
+        email.refresh_from_db()
+        assert email.attempts == attempt
+        assert "mail server down" in email.last_error
+        if attempt < mail.MAX_ATTEMPTS:
+            assert email.status == "queued"
+            assert email.next_attempt_at > timezone.now()
+            # not due yet
+            assert mail.deliver_batch(backend=refusing)["failed"] == 0
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+    assert email.status == "failed"
+
+
+def test_mail_claims_skip_busy_rows_and_reclaim_stale_ones(db, mailoutbox):
+    email = _queue_mail()
+    OutboundEmail.objects.update(status="sending", claimed_at=timezone.now())
+    assert mail.deliver_batch(backend=LOCMEM_MAIL)["sent"] == 0
+
+    # the worker that claimed it died
+    OutboundEmail.objects.update(claimed_at=timezone.now() - mail.CLAIM_TIMEOUT - timedelta(seconds=1))
+    assert mail.deliver_batch(backend=LOCMEM_MAIL)["sent"] == 1
+    email.refresh_from_db()
+    assert email.status == "sent"
+
+
+def test_send_queued_mail_purges_old_sent_mail(db):
+    old, recent, waiting = (_queue_mail(f"user{i}@example.com") for i in range(3))
+    OutboundEmail.objects.filter(pk=old.pk).update(status="sent", sent_at=timezone.now() - timedelta(days=31))
+    OutboundEmail.objects.filter(pk=recent.pk).update(status="sent", sent_at=timezone.now())
+    OutboundEmail.objects.filter(pk=waiting.pk).update(next_attempt_at=timezone.now() + timedelta(hours=1))
+
+    out = io.StringIO()
+    call_command("send_queued_mail", purge_days=30, backend=LOCMEM_MAIL, stdout=out)
+    assert "Purged 1 sent message(s)." in out.getvalue()
+    assert set(OutboundEmail.objects.values_list("pk", flat=True)) == {recent.pk, waiting.pk}
+
+
+# ---------- SESSIONS ---------- #
+
+def test_session_store_skips_writes_of_unchanged_data(db):
+    session = SessionStore()
+    session["mfa_confirmed"] = True
+    session.save()
+    session.save()
+    assert session.writes == 1
+
+    session = SessionStore(session.session_key)
+    # same value again, as views do on every hit
+    session["mfa_confirmed"] = True
+    session.save()
+    assert session.writes == 0
+
+    session["mfa_confirmed"] = False
+    session.save()
+    assert session.writes == 1
+    assert SessionStore(session.session_key)["mfa_confirmed"] is False
+
+    old_key = session.session_key
+    session.cycle_key()
+    assert session.writes == 2
+    assert SessionStore(session.session_key)["mfa_confirmed"] is False
+    assert not session.exists(old_key)
+
+
+@override_settings(SESSION_WRITE_REFRESH=0)
+def test_session_store_refreshes_unchanged_data_for_expiry(db):
+    session = SessionStore()
+    session["mfa_confirmed"] = True
+    session.save()
+    session.save()
+    assert session.writes == 2
+
+
+def test_session_store_clears_expired_in_batches(db):
+    model = SessionStore.get_model_class()
+    for _ in range(3):
+        session = SessionStore()
+        session["mfa_confirmed"] = True
+        session.save()
+    model.objects.update(expire_date=timezone.now() - timedelta(seconds=1))
+    live = SessionStore()
+    live["mfa_confirmed"] = True
+    live.save()
+
+    assert SessionStore.clear_expired(batch_size=2) == 3
+    assert list(model.objects.values_list("session_key", flat=True)) == [live.session_key]
+
+
+# ---------- RFQT IMPORT ---------- #
+
+def _csv(text):
+    return io.BytesIO(text.strip().encode("utf-8"))
+
+
+def test_import_creates_then_updates_and_rejects_bad_rows(db):
+    result = import_rfqts(_csv("""
+rfqts_no,department,job_title,job_short_description,job_description
+RFQ-1,Defence,Analyst,Data work,Python and SQL
+RFQ-2,Health,,,
+,Orphan,Clerk,Filing,Paper
+RFQ-3,Finance,Auditor,,Numbers
+"""), batch_size=2)
+    assert (result.rows, result.rfqts_created, result.jobs_created) == (4, 2, 1)
+    assert [(error.line, set(error.errors)) for error in result.errors] == [
+        (4, {"rfqts_no"}),
+        (5, {"job_short_description"}),
+    ]
+    job = Job.objects.get()
+    assert (job.rfqts_no.rfqts_no, job.title) == ("RFQ-1", "Analyst")
+    assert job.is_active
+    # bulk writes skip Job.save; the import reindexes at the end
+    assert list(search_jobs(Job.objects.all(), "sql")) == [job]
+
+    # columns left out keep their stored values
+    result = import_rfqts(_csv("""
+rfqts_no,job_title,job_short_description,job_description,job_is_active
+RFQ-1,Analyst,Data work,Python and Go,no
+RFQ-2,Tester,Testing,Manual testing,
+"""))
+    assert (result.rfqts_created, result.rfqts_updated, result.jobs_created, result.jobs_updated) == (0, 2, 1, 1)
+    assert not result.errors
+    assert Rfqt.objects.count() == 2
+    assert Rfqt.objects.get(rfqts_no="RFQ-1").department == "Defence"
+    job.refresh_from_db()
+    assert job.description == "Python and Go"
+    assert not job.is_active
+
+
+def test_import_dry_run_counts_without_writing(db):
+    result = import_rfqts(_csv("""
+rfqts_no,job_title,job_short_description,job_description
+RFQ-1,Analyst,Data work,Python
+"""), dry_run=True)
+    assert (result.rfqts_created, result.jobs_created) == (1, 1)
+    assert not Rfqt.objects.exists()
+
+
+# ---------- EXPORTS ---------- #
+
+def test_export_streams_every_row_in_chunks(staff):
+    make_rows(staff, 5)
+    applications = JobApplication.objects.filter(user=staff)
+    applications.filter(pk=applications.first().pk).update(full_name="=HYPERLINK(1)")
+
+    rows = list(iter_export_rows(applications, chunk_size=2))
+    assert [row[0] for row in rows] == list(applications.order_by("pk").values_list("pk", flat=True))
+
+    response = export_response(applications, "csv")
+    assert response.streaming
+    assert response["Content-Type"] == "text/csv; charset=utf-8"
+    text = b"".join(response.streaming_content).decode("utf-8")
+    header, *lines = csv.reader(io.StringIO(text.lstrip("\ufeff")))
+    assert header == [column for column, _lookup in EXPORT_COLUMNS]
+    assert len(lines) == 5
+    # not evaluated when opened in a spreadsheet
+    assert lines[0][header.index("full_name")] == "'=HYPERLINK(1)"
+
+    data = json.loads(b"".join(export_response(applications.none(), "json").streaming_content))
+    assert data == []
+    data = json.loads(b"".join(export_response(applications, "json").streaming_content))
+    assert [row["email"] for row in data] == ["staff@example.com"] * 5
+
+
+def test_async_export_streams_the_same_bytes(staff):
+    make_rows(staff, 3)
+    applications = JobApplication.objects.all()
+
+    async def consume(response):
+        return b"".join([block async for block in response.streaming_content])
+
+    response = export_response(applications, "csv", asynchronous=True)
+    assert response.is_async
+    assert async_to_sync(consume)(response) == b"".join(export_response(applications, "csv").streaming_content)
+
+
+def test_export_view_is_staff_only(staff_client):
+    applicant = CustomUser.objects.create_user(email="applicant@example.com", password=None)
+    other = Client()
+    other.force_login(applicant)
+    session = other.session
+    session["mfa_confirmed"] = True
+    session.save()
+    assert other.get(reverse("admin_applications_export")).status_code == 403
+
+    assert staff_client.get(reverse("admin_applications_export"), {"format": "xml"}).status_code == 400
+    response = staff_client.get(reverse("admin_applications_export"), {"format": "json"})
+    assert response.status_code == 200
+    assert response["Content-Disposition"].endswith('.json"')
+
+
+# ---------- UNREAD COUNTERS ---------- #
+
+def test_unread_counter_follows_saves_deletes_and_mark_read(staff):
+    make_rows(staff, 2)
+    # bulk_create bypasses Message.save: repair, as after a raw load
+    rebuild_all_unread_counters()
+    assert unread_count(staff.pk) == 2
+
+    sender = CustomUser.objects.get(email="applicant0@example.com")
+    application = JobApplication.objects.filter(user=sender).get()
+    message = JobMessage.objects.create(sender=sender, recipient=staff, application=application, content="Again")
+    assert unread_count(staff.pk) == 3
+    assert unread_count(sender.pk) == 0
+
+    message.is_read = True
+    message.save()
+    assert unread_count(staff.pk) == 2
+    # saving again, or loading and saving, does not count it twice
+    message.save()
+    JobMessage.objects.get(pk=message.pk).save()
+    assert unread_count(staff.pk) == 2
+
+    # moved to another recipient while still unread
+    message.is_read = False
+    message.recipient = sender
+    message.save()
+    assert (unread_count(staff.pk), unread_count(sender.pk)) == (2, 1)
+    message.delete()
+    assert unread_count(sender.pk) == 0
+
+    assert mark_thread_read(staff.pk, application.pk) == 1
+    assert mark_thread_read(staff.pk, application.pk) == 0
+    assert unread_count(staff.pk) == 1
+    assert mark_read(staff.pk) == 1
+    assert unread_count(staff.pk) == 0
+
+    # a missing counter row is rebuilt on first read
+    JobMessage.objects.create(sender=sender, recipient=staff, content="New")
+    UnreadMessageCounter.objects.filter(user=staff).delete()
+    assert unread_count(staff.pk) == 1
+
+
+# ---------- REALTIME ---------- #
+
+@pytest.fixture
+def layer(monkeypatch):
+    # in-process delivery whatever the database, and no subscribers left over
+    layer = realtime.InMemoryChannelLayer()
+    monkeypatch.setattr(realtime, "_layer", layer)
+    return layer
+
+
+def test_events_fan_out_to_every_connection_of_the_user(layer):
+    async def run():
+        group = realtime.user_group(1)
+        with layer.subscribe([group]) as tab, layer.subscribe([group]) as other_tab, \
+                layer.subscribe([realtime.user_group(2)]) as someone_else:
+            assert layer.deliver(group, {"type": "ping"}) == 2
+            assert await tab.get(1) == {"type": "ping"}
+            assert await other_tab.get(1) == {"type": "ping"}
+            assert await someone_else.get(0.01) is None
+        assert layer.group_size(group) == 0
+
+        # a client that falls behind gets one resync instead of the backlog
+        with layer.subscribe([group], maxsize=2) as slow:
+            for number in range(5):
+                layer.deliver(group, {"type": "ping", "n": number})
+            await asyncio.sleep(0)
+            assert await slow.get(1) is realtime.RESYNC
+            assert await slow.get(0.01) is None
+
+    async_to_sync(run)()
+
+
+@override_settings(REALTIME_ENABLED=True)
+def test_new_message_is_pushed_to_both_ends_after_commit(staff, layer, django_capture_on_commit_callbacks):
+    make_rows(staff, 1)
+    application = JobApplication.objects.exclude(user=staff).get()
+
+    def send():
+        # published on commit, not from inside the transaction
+        with django_capture_on_commit_callbacks(execute=True):
+            return JobMessage.objects.create(
+                sender=application.user, recipient=staff, application=application, content="Hello",
+            )
+
+    async def run():
+        with layer.subscribe([realtime.user_group(staff.pk)]) as inbox, \
+                layer.subscribe([realtime.user_group(application.user_id)]) as outbox:
+            message = await sync_to_async(send)()
+            received, sent = await inbox.get(1), await outbox.get(1)
+        assert (received["direction"], sent["direction"]) == ("in", "out")
+        assert received["id"] == sent["id"] == message.pk
+        assert received["sender_id"] == application.user_id
+
+    async_to_sync(run)()
+
+
+@override_settings(REALTIME_ENABLED=False)
+def test_nothing_is_published_when_realtime_is_off(staff, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks() as callbacks:
+        realtime.publish([staff.pk], {"type": "ping"})
+    assert callbacks == []
+
+
+def test_sse_stream_frames_events_and_keeps_alive(layer):
+    async def run():
+        stream = realtime.sse_stream(7, keepalive=0.01)
+        assert await anext(stream) == "retry: 5000\n\n"
+        assert await anext(stream) == ": keepalive\n\n"
+        layer.deliver(realtime.user_group(7), {"type": "message", "id": 1})
+        assert await anext(stream) == 'event: message\ndata: {"type": "message", "id": 1}\n\n'
+        await stream.aclose()
+        assert layer.group_size(realtime.user_group(7)) == 0
+
+    async_to_sync(run)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_websocket_needs_a_confirmed_session_and_relays_events(layer):
+    user = CustomUser.objects.create_user(email="socket@example.com", password=None)
+    client = Client()
+    client.force_login(user)
+    session = client.session
+    session["mfa_confirmed"] = True
+    session.save()
+    cookie = f"{settings.SESSION_COOKIE_NAME}={session.session_key}".encode()
+
+    async def connect(headers):
+        incoming, sent = asyncio.Queue(), []
+
+        async def send(message):
+            sent.append(message)
+
+        await incoming.put({"type": "websocket.connect"})
+        scope = {"type": "websocket", "path": realtime.WEBSOCKET_PATH, "headers": headers}
+        task = asyncio.ensure_future(realtime.websocket_application(scope, incoming.get, send))
+        for _ in range(100):
+            if task.done() or layer.group_size(realtime.user_group(user.pk)):
+                break
+            await asyncio.sleep(0.01)
+        return task, incoming, sent
+
+    async def run():
+        task, _incoming, sent = await connect([(b"host", b"testserver")])
+        await task
+        assert sent == [{"type": "websocket.close", "code": 4403}]
+
+        task, _incoming, sent = await connect([
+            (b"host", b"testserver"), (b"origin", b"https://elsewhere.example"), (b"cookie", cookie),
+        ])
+        await task
+        assert sent == [{"type": "websocket.close", "code": 4403}]
+
+        task, incoming, sent = await connect([(b"host", b"testserver"), (b"cookie", cookie)])
+        assert sent == [{"type": "websocket.accept"}]
+        layer.deliver(realtime.user_group(user.pk), {"type": "message", "id": 1})
+        await asyncio.sleep(0.05)
+        await incoming.put({"type": "websocket.disconnect"})
+        await asyncio.wait_for(task, 1)
+        assert sent[1] == {"type": "websocket.send", "text": '{"type": "message", "id": 1}'}
+        assert layer.group_size(realtime.user_group(user.pk)) == 0
+
+    async_to_sync(run)()
+
+
+# ---------- ASYNC VIEWS ---------- #
+
+def _async_client(client):
+    # an AsyncClient sharing ``client``'s session cookie
+    async_client = AsyncClient()
+    async_client.cookies = client.cookies
+    return async_client
+
+
+@override_settings(ROOT_URLCONF=__name__)
+def test_async_home_page_is_cached_for_anonymous_visitors(db):
+    job = Job.objects.create(title="Cached title", short_description="Short", description="Long")
+    get = async_to_sync(AsyncClient().get)
+    assert b"Cached title" in get("/async/").content
+
+    # no signal, so no version bump: the cached page is served
+    Job.objects.filter(pk=job.pk).update(title="Changed title")
+    assert b"Cached title" in get("/async/").content
+
+    job.title = "Saved title"
+    job.save()
+    assert b"Saved title" in get("/async/").content
+
+
+@override_settings(ROOT_URLCONF=__name__, TEMPLATES=_templates_with_listings(), QUERY_BUDGET_STRICT=True)
+def test_async_job_pages_match_the_sync_ones(staff_client, staff):
+    make_rows(staff, 2)
+    job = Job.objects.create(title="Python developer", short_description="Short", description="Django work")
+    async_client = _async_client(staff_client)
+    get = async_to_sync(async_client.get)
+
+    for path_ in ("/jobs/", "/jobs/?keyword=django", f"/jobs/{job.pk}/", "/my-applications/"):
+        sync_response = staff_client.get(f"/auth{path_}")
+        async_response = get(f"/async{path_}")
+        assert async_response.status_code == sync_response.status_code == 200
+        assert async_response.content == sync_response.content
+    assert b"<mark>Django</mark>" in get("/async/jobs/?keyword=django").content
+
+    Job.objects.filter(pk=job.pk).update(is_active=False)
+    assert get(f"/async/jobs/{job.pk}/").status_code == 404
+
+
+@override_settings(ROOT_URLCONF=__name__)
+def test_async_views_keep_the_login_and_mfa_gates(client, staff):
+    response = async_to_sync(AsyncClient().get)("/async/jobs/")
+    assert response.status_code == 302
+    assert response.url.startswith(settings.LOGIN_URL)
+
+    client.force_login(staff)
+    response = async_to_sync(_async_client(client).get)("/async/my-applications/")
+    assert response.status_code == 302
+    assert response.url == reverse("mfa_setup")
+
+    # the event stream needs the ASGI server
+    assert client.get("/async/events/").status_code == 501
+    assert async_to_sync(AsyncClient().get)("/async/events/").status_code == 401
+
+
+# ---------- STATIC FILES ---------- #
+
+HASHED_CSS = "css/app.3f1c2a9b04de.css"
+
+
+@pytest.fixture
+def static_root(tmp_path):
+    (tmp_path / "css").mkdir()
+    css = tmp_path / HASHED_CSS
+    css.write_text("body { color: black; }\n" * 100)
+    compress_file(str(css), content_addressed=True)
+    (tmp_path / "staticfiles.json").write_text(json.dumps({"paths": {"css/app.css": HASHED_CSS}}))
+    (tmp_path / "clip.mp4").write_bytes(bytes(range(256)) * 4)
+    return tmp_path
+
+
+def _static(root, name, method="get", **headers):
+    request = getattr(RequestFactory(), method)(settings.STATIC_URL + name, headers=headers)
+    return static_response(request, StaticFileIndex(root=str(root)))
+
+
+def _body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_static_response_picks_the_best_accepted_encoding(static_root):
+    best = "br" if BROTLI_AVAILABLE else "gzip"
+    response = _static(static_root, HASHED_CSS, accept_encoding="gzip, deflate, br")
+    assert response["Content-Encoding"] == best
+    assert response["ETag"] == f'"3f1c2a9b04de-{best}"'
+    assert response["Vary"] == "Accept-Encoding"
+    assert response["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert int(response["Content-Length"]) < (static_root / HASHED_CSS).stat().st_size
+
+    response = _static(static_root, HASHED_CSS, accept_encoding="gzip")
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(_body(response)) == (static_root / HASHED_CSS).read_bytes()
+
+    # refused codings
+    response = _static(static_root, HASHED_CSS, accept_encoding="gzip;q=0, br;q=0")
+    assert not response.has_header("Content-Encoding")
+    assert response["ETag"] == '"3f1c2a9b04de"'
+    assert response["Content-Type"] == "text/css; charset=utf-8"
+
+    assert _static(static_root, "missing.css") is None
+    assert _static(static_root, HASHED_CSS, method="post").status_code == 405
+
+
+def test_static_response_revalidates_per_representation(static_root):
+    etag = _static(static_root, HASHED_CSS, accept_encoding="gzip")["ETag"]
+    response = _static(static_root, HASHED_CSS, accept_encoding="gzip", if_none_match=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    # the same tag does not validate the uncompressed representation
+    assert _static(static_root, HASHED_CSS, if_none_match=etag).status_code == 200
+
+    # unhashed files: a size/mtime validator and a short max-age
+    response = _static(static_root, "clip.mp4")
+    assert "immutable" not in response["Cache-Control"]
+    assert _static(static_root, "clip.mp4", if_none_match=f'W/{response["ETag"]}').status_code == 304
+
+
+def test_static_response_serves_byte_ranges(static_root):
+    data = (static_root / "clip.mp4").read_bytes()
+    response = _static(static_root, "clip.mp4", range="bytes=10-19")
+    assert response.status_code == 206
+    assert response["Content-Range"] == "bytes 10-19/1024"
+    assert response["Content-Length"] == "10"
+    assert _body(response) == data[10:20]
+
+    response = _static(static_root, "clip.mp4", range="bytes=-5")
+    assert _body(response) == data[-5:]
+    response = _static(static_root, "clip.mp4", range="bytes=1000-")
+    assert response["Content-Range"] == "bytes 1000-1023/1024"
+
+    response = _static(static_root, "clip.mp4", range="bytes=2000-")
+    assert response.status_code == 416
+    assert response["Content-Range"] == "bytes */1024"
+
+    # a stale If-Range gets the whole file
+    response = _static(static_root, "clip.mp4", range="bytes=10-19", if_range='"other"')
+    assert response.status_code == 200
+    assert _body(response) == data
+
+    async def read(response):
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    request = RequestFactory().get(settings.STATIC_URL + "clip.mp4", headers={"range": "bytes=100-199"})
+    response = static_response(request, StaticFileIndex(root=str(static_root)), asynchronous=True)
+    assert response.is_async
+    assert async_to_sync(read)(response) == data[100:200]
+
+
+# ---------- TAILWIND BUNDLES ---------- #
+
+PROJECT_TEMPLATES = {
+    "base.html": '<body class="p-4">{% block content %}{% endblock %}{% include "includes/nav.html" %}</body>',
+    "includes/nav.html": '<nav class="flex"></nav>',
+    "layouts/box.html": "{% extends 'base.html' %}",
+    "01_layouts/a_box.html": "{% extends 'base.html' %}",
+    "account/login.html": "{% extends 'layouts/box.html' %}",
+    "profile.html": '{% extends "layouts/box.html" %}{% block content %}<p class="grid">{% endblock %}',
+    "admin/list.html": '{% extends "01_layouts/a_box.html" %}',
+    "plain.html": '{% extends "base.html" %}',
+}
+
+
+@pytest.fixture
+def project_templates(tmp_path):
+    for name, text in PROJECT_TEMPLATES.items():
+        path = tmp_path / "templates" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return tmp_path / "templates"
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    from django.contrib.staticfiles import finders
+
+    static = tmp_path / "static"
+    static.mkdir()
+    finders.get_finder.cache_clear()
+    with override_settings(STATICFILES_DIRS=[str(static)]):
+        yield static
+    finders.get_finder.cache_clear()
+
+
+def test_template_graph_follows_extends_and_includes(project_templates):
+    graph = tailwind.TemplateGraph.scan([project_templates])
+    assert graph.ancestors("account/login.html") == ["layouts/box.html", "base.html"]
+    assert graph.closure(["profile.html"]) == {"profile.html", "layouts/box.html", "base.html", "includes/nav.html"}
+    assert graph.pages("layouts") == ({"layouts/box.html"}, {"account/login.html", "profile.html"})
+
+
+@override_settings(TAILWIND_EXTRA_SOURCES=[])
+def test_tailwind_bundles_own_their_pages(project_templates, static_dir, monkeypatch):
+    built = {}
+
+    def fake_build(command, name, sources, input_path):
+        # no CLI: the "CSS" names the files it would have scanned
+        built[name] = sorted(path.relative_to(project_templates).as_posix() for path in sources)
+        return f"/* {name} */".encode()
+
+    monkeypatch.setattr(tailwind, "tailwind_command", lambda: ["tailwindcss"])
+    monkeypatch.setattr(tailwind, "build_bundle", fake_build)
+    monkeypatch.setattr(tailwind, "_manifest_cache", None)
+    graph = tailwind.TemplateGraph.scan([project_templates])
+
+    results = tailwind.build_bundles(graph=graph)
+    pages = {result.name: result.pages for result in results}
+    # a page in a bundle's directory stays there even when it extends another layout
+    assert pages == {
+        "layouts": ["layouts/box.html", "profile.html"],
+        "01_layouts": ["01_layouts/a_box.html", "admin/list.html"],
+        "account": ["account/login.html"],
+    }
+    assert built["layouts"] == ["base.html", "includes/nav.html", "layouts/box.html", "profile.html"]
+
+    assert tailwind.stylesheet_for("profile.html") == ("assets/css/bundles/layouts.css", results[0].digest)
+    assert tailwind.stylesheet_for("plain.html") == (tailwind.FALLBACK_CSS, None)
+
+    # rebuilding one bundle keeps the others' pages
+    tailwind.build_bundles(["account"], graph=graph)
+    manifest = json.loads((static_dir / tailwind.BUNDLE_DIR / tailwind.MANIFEST_NAME).read_text())
+    assert manifest["pages"]["admin/list.html"] == "01_layouts"
+    assert manifest["pages"]["account/login.html"] == "account"
+    with pytest.raises(tailwind.TailwindError):
+        tailwind.build_bundles(["nope"], graph=graph)
+
+
+def test_bundle_input_scans_only_the_given_sources(tmp_path):
+    css = tailwind.bundle_input('@import "tailwindcss";\n@theme { --color-brand: red; }', [tmp_path / "a.html"])
+    assert css.startswith('@import "tailwindcss" source(none);')
+    assert f'@source "{(tmp_path / "a.html").resolve().as_posix()}";' in css
+    with pytest.raises(tailwind.TailwindError):
+        tailwind.bundle_input("@tailwind base;", [])
+
+
+# ---------- ICON FONTS ---------- #
+
+ICON_CSS = """
+@font-face { font-family: "remixicon"; src: url("ri.ttf") format("truetype"); font-display: swap; }
+.ri { font-family: "remixicon" !important; }
+.ri-home:before { content: "\\ea01"; }
+.ri-user:before { content: "\\ea02"; }
+.ri-lock:before, .ri-key:before { content: "\\ea03"; }
+"""
+
+
+def _icon_font(path, codepoints):
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    names = [".notdef", *(f"icon{point:x}" for point in codepoints)]
+    glyphs = {}
+    for name in names:
+        pen = TTGlyphPen(None)
+        pen.moveTo((0, 0))
+        pen.lineTo((0, 500))
+        pen.lineTo((500, 0))
+        pen.closePath()
+        glyphs[name] = pen.glyph()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({point: f"icon{point:x}" for point in codepoints})
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics({name: (500, 0) for name in names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Icons", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(str(path))
+
+
+@pytest.mark.skipif(not iconfonts.FONTTOOLS_AVAILABLE, reason="needs fontTools")
+@override_settings(
+    ICON_FONTS={"remixicon": "icons/ri.css"},
+    ICON_FONT_STYLESHEETS=["assets/css/styles.css"],
+    ICON_FONT_EXTRA_SOURCES=[],
+)
+def test_icon_fonts_keep_the_icons_each_page_uses(project_templates, static_dir, monkeypatch):
+    (static_dir / "icons").mkdir()
+    (static_dir / "icons/ri.css").write_text(ICON_CSS)
+    _icon_font(static_dir / "icons/ri.ttf", [0xEA01, 0xEA02, 0xEA03])
+    # the site stylesheet inlines the family, fonts relative to itself
+    (static_dir / "assets/css").mkdir(parents=True)
+    (static_dir / "assets/css/styles.css").write_text(
+        ICON_CSS.replace("ri.ttf", "../../icons/ri.ttf") + ".btn { color: red; }\n"
+    )
+    (static_dir / "js").mkdir()
+    (static_dir / "js/menu.js").write_text('button.classList.add("ri-user");')
+    (project_templates / "includes/nav.html").write_text(
+        '{% load static %}<i class="ri ri-home"></i><script src="{% static \'js/menu.js\' %}"></script>'
+    )
+    (project_templates / "bare.html").write_text("<p>No icons</p>")
+    monkeypatch.setattr(iconfonts, "_manifest_cache", None)
+
+    families, trims = iconfonts.build_icon_fonts(tailwind.TemplateGraph.scan([project_templates]))
+    family, = families
+    # the nav (included by the base layout) and the script it loads
+    assert family.icons == ["ri-home", "ri-user"]
+    assert family.total_icons == 4
+    css = (static_dir / family.static_name).read_text()
+    assert ".ri-home:before" in css and ".ri-lock" not in css
+    (font, _size, _source_size), = family.fonts
+    assert f'url("{font.rsplit("/", 1)[1]}")' in css
+    subset = iconfonts.TTFont(io.BytesIO((static_dir / font).read_bytes()))
+    assert set(subset.getBestCmap()) == {0xEA01, 0xEA02}
+
+    entry = {"file": family.static_name, "hash": family.digest, "bytes": family.css_size, "fonts": [font]}
+    assert iconfonts.icon_stylesheets_for("profile.html") == [entry]
+    assert iconfonts.icon_stylesheets_for("bare.html") == []
+    # a page the build never saw gets every family
+    assert iconfonts.icon_stylesheets_for("new.html") == [entry]
+
+    trim, = trims
+    assert iconfonts.trimmed_stylesheet("assets/css/styles.css") == ("assets/css/styles.noicons.css", trim.digest)
+    trimmed = (static_dir / trim.static_name).read_text()
+    assert ".btn" in trimmed
+    assert "ri-home" not in trimmed and "@font-face" not in trimmed
+
+
+# ---------- RESPONSIVE IMAGES ---------- #
+
+@pytest.mark.skipif(not responsive.PILLOW_AVAILABLE, reason="needs Pillow")
+@override_settings(
+    RESPONSIVE_IMAGE_SOURCES=["img"],
+    RESPONSIVE_VIDEO_SOURCES=[],
+    RESPONSIVE_IMAGE_FORMATS=["webp"],
+    RESPONSIVE_IMAGE_WIDTHS=[320, 640, 1600],
+)
+def test_responsive_image_renders_a_picture_of_the_derivatives(static_dir, monkeypatch):
+    from PIL import Image
+
+    (static_dir / "img").mkdir()
+    gradient = Image.linear_gradient("L").resize((1000, 500)).convert("RGB")
+    gradient.save(static_dir / "img/hero.png")
+    monkeypatch.setattr(responsive, "_manifest_cache", None)
+
+    result = responsive.build_derivatives(jobs=1)
+    image, = result.images
+    assert (image.width, image.height, image.written) == (1000, 500, 3)
+    assert [width for _name, width, _size in image.sources["webp"]] == [320, 640, 1000]
+    with Image.open(static_dir / "derived/img/hero-320w.webp") as derived:
+        assert derived.size == (320, 160)
+    # fresh derivatives are kept
+    assert responsive.build_derivatives(jobs=1).written == 0
+
+    html = Template(
+        "{% load assets %}"
+        "{% responsive_image 'img/hero.png' alt='Hero' sizes='50vw' class='rounded' %}|"
+        "{% responsive_image 'img/unseen.png' %}|{% video_poster 'video/intro.mp4' %}"
+    ).render(Context())
+    picture, unseen, poster = html.split("|")
+    static_url = settings.STATIC_URL
+    assert picture == (
+        '<picture style="display: contents">'
+        f'<source type="image/webp" srcset="{static_url}derived/img/hero-320w.webp 320w, '
+        f'{static_url}derived/img/hero-640w.webp 640w, {static_url}derived/img/hero-1000w.webp 1000w" sizes="50vw">'
+        f'<img src="{static_url}img/hero.png" alt="Hero" loading="lazy" decoding="async" '
+        'width="1000" height="500" class="rounded"></picture>'
+    )
+    assert unseen == f'<img src="{static_url}img/unseen.png" alt="" loading="lazy" decoding="async">'
+    assert poster == ""
+
+
+# ---------- INCREMENTAL COLLECTSTATIC ---------- #
+
+def test_source_index_hashes_only_files_that_look_changed(tmp_path, monkeypatch):
+    source = tmp_path / "app.js"
+    source.write_text("console.log(1);")
+    index = SourceIndex(str(tmp_path / INDEX_NAME), "storage")
+    fingerprint = index.fingerprint("app.js", str(source))
+    index.save({"app.js": fingerprint}, {"total": 0.01})
+
+    index = SourceIndex.load(str(tmp_path / INDEX_NAME), "storage")
+    assert index.digest("app.js") == fingerprint[0]
+    hashed = []
+    monkeypatch.setattr("authentication.staticfiles.file_digest", lambda path: hashed.append(path) or "new")
+    # same size and mtime: trusted without reading
+    assert index.fingerprint("app.js", str(source)) == fingerprint
+    assert hashed == []
+    # touched, as by a fresh checkout: read again
+    os.utime(source, ns=(fingerprint[2] + 10**9, fingerprint[2] + 10**9))
+    assert index.fingerprint("app.js", str(source))[0] == "new"
+    assert hashed == [str(source)]
+
+    # another storage backend's outputs are not reused
+    assert SourceIndex.load(str(tmp_path / INDEX_NAME), "other").sources == {}
+    assert SourceIndex.load(str(tmp_path / "missing.json"), "storage").sources == {}
+
+
+def test_prune_removes_unexpected_outputs_and_empty_directories(tmp_path):
+    for name in ("keep.css", "old/gone.css", "js/app.js", "js/app.0123456789ab.js"):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(name)
+    assert prune(str(tmp_path), {"keep.css", "js/app.js"}, dry_run=True) == ["js/app.0123456789ab.js", "old/gone.css"]
+    assert (tmp_path / "old/gone.css").exists()
+
+    assert prune(str(tmp_path), {"keep.css", "js/app.js"}) == ["js/app.0123456789ab.js", "old/gone.css"]
+    assert sorted(path.relative_to(tmp_path).as_posix() for path in tmp_path.rglob("*")) == ["js", "js/app.js", "keep.css"]
+
+
+def test_incremental_collectstatic_copies_changes_and_prunes_old_generations(static_dir, tmp_path):
+    (static_dir / "css").mkdir()
+    (static_dir / "css/site.css").write_text("body { margin: 0; }\n" * 40)
+    (static_dir / "js").mkdir()
+    app = static_dir / "js/app.js"
+    app.write_text("console.log(1);\n" * 40)
+    root = tmp_path / "root"
+    storages = {**settings.STORAGES, "staticfiles": {"BACKEND": "authentication.staticfiles.CompressedManifestStaticFilesStorage"}}
+
+    def collect():
+        out = io.StringIO()
+        call_command(
+            "collectstatic", interactive=False, incremental=True, prune=True,
+            tailwind=False, icon_fonts=False, responsive=False, stdout=out,
+        )
+        return json.loads((root / "staticfiles.json").read_text())["paths"], out.getvalue()
+
+    with override_settings(
+        STATIC_ROOT=str(root),
+        STORAGES=storages,
+        STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+    ):
+        paths, _out = collect()
+        first = paths["js/app.js"]
+        assert (root / first).exists()
+        assert (root / f"{first}.gz").exists()
+        copied_at = (root / "js/app.js").stat().st_mtime_ns
+
+        # a fresh checkout: new mtime, same bytes
+        os.utime(app, ns=(copied_at + 10**9, copied_at + 10**9))
+        paths, out = collect()
+        assert "Nothing changed" in out
+        assert (root / "js/app.js").stat().st_mtime_ns == copied_at
+
+        app.write_text("console.log(2);\n" * 40)
+        paths, _out = collect()
+        second = paths["js/app.js"]
+        assert second != first
+        assert (root / "js/app.js").read_text() == app.read_text()
+        # pages rendered before this run may still link the old copy
+        assert (root / first).exists()
+
+        collect()
+        assert not (root / first).exists()
+        assert not (root / f"{first}.gz").exists()
+        assert (root / second).exists()
+        assert (root / paths["css/site.css"]).exists()
@@ -0,0 +1,317 @@
+"""
+Resumable, chunked uploads for resumes and RFQ documents.
+
+The client opens an ``UploadSession`` and then sends the file in pieces, each
+one tagged with its byte offset. Chunks are streamed from the request body to
+a temp file in small blocks, so memory use stays flat whatever the file size,
+and an interrupted upload resumes from ``received_size``. When the last byte
+arrives the session turns ``assembling`` and, once the row lock is released,
+the file is hashed and stored once per distinct SHA-256 (``StoredFile``).
+Scanning and text extraction run afterwards on the background worker pool
+(see ``authentication.tasks``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import zipfile
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import StoredFile, UploadSession
+from .tasks import run_in_background
+
+# Optional extractors (pypdf is in requirements.txt): uploads still work
+# without them, the step is skipped with a warning
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64 * 1024
+CHUNK_SIZE = getattr(settings, "UPLOAD_CHUNK_SIZE", 2 * 1024 * 1024)
+MAX_UPLOAD_SIZE = getattr(settings, "UPLOAD_MAX_SIZE", 25 * 1024 * 1024)
+ALLOWED_EXTENSIONS = getattr(settings, "UPLOAD_ALLOWED_EXTENSIONS", {})
+EXTRACTED_TEXT_LIMIT = 200_000
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class UploadError(Exception):
+    """
+    Rejected upload request. ``status`` is the HTTP status to answer with;
+    ``offset`` (for out-of-order chunks) tells the client where to resume.
+    """
+
+    def __init__(self, message: str, status: int = 400, offset: int | None = None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def temp_dir() -> str:
+    return getattr(settings, "UPLOAD_TEMP_DIR", os.path.join(settings.MEDIA_ROOT, "tmp"))
+
+
+def temp_path(session: UploadSession) -> str:
+    return os.path.join(temp_dir(), f"{session.pk}.part")
+
+
+def parse_content_range(header: str) -> tuple[int, int, int]:
+    """
+    ``"bytes 0-1048575/5242880"`` -> ``(0, 1048575, 5242880)``.
+    """
+    match = _CONTENT_RANGE.match((header or "").strip())
+    if not match:
+        raise UploadError("Missing or malformed Content-Range header.")
+    start, end, total = (int(part) for part in match.groups())
+    if end < start:
+        raise UploadError("Invalid Content-Range.")
+    return start, end, total
+
+
+# ---------- SESSIONS ---------- #
+
+def start_upload(user, kind: str, filename: str, total_size: int, content_type: str = "") -> UploadSession:
+    """
+    Validate the announced file and open a session for it.
+    """
+    if kind not in dict(UploadSession.KIND_CHOICES):
+        raise UploadError("Unknown upload kind.")
+    if kind == "rfq_file" and not user.is_staff:
+        raise UploadError("Not allowed.", status=403)
+
+    filename = os.path.basename(filename or "").strip()
+    if not filename:
+        raise UploadError("A filename is required.")
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    allowed = ALLOWED_EXTENSIONS.get(kind)
+    if allowed and extension not in allowed:
+        raise UploadError(f"Files of type '.{extension}' are not accepted.", status=415)
+    if total_size <= 0:
+        raise UploadError("Empty files cannot be uploaded.")
+    if total_size > MAX_UPLOAD_SIZE:
+        raise UploadError("File is too large.", status=413)
+
+    session = UploadSession.objects.create(
+        user=user,
+        kind=kind,
+        filename=filename[:255],
+        content_type=(content_type or "")[:100],
+        total_size=total_size,
+    )
+    os.makedirs(temp_dir(), exist_ok=True)
+    open(temp_path(session), "wb").close()
+    return session
+
+
+def append_chunk(session_id, user, start: int, end: int, total: int, stream) -> UploadSession:
+    """
+    Write bytes ``start..end`` (inclusive) read from ``stream`` into the
+    session's temp file. The session row is locked for the duration so two
+    requests for the same upload cannot interleave. Returns the updated
+    session, completed if this was the last chunk; hashing and storing the
+    file happen after the lock is released.
+    """
+    length = end - start + 1
+    if length > CHUNK_SIZE:
+        raise UploadError("Chunk is too large.", status=413)
+
+    with transaction.atomic():
+        session = (
+            UploadSession.objects
+            .select_for_update()
+            .filter(pk=session_id, user=user)
+            .first()
+        )
+        if session is None:
+            raise UploadError("Upload not found.", status=404)
+        if session.status != "uploading":
+            raise UploadError("Upload is no longer accepting data.", status=409, offset=session.received_size)
+        if total != session.total_size or end >= session.total_size:
+            raise UploadError("Content-Range does not match the upload.", status=416)
+        if start != session.received_size:
+            raise UploadError("Unexpected offset.", status=409, offset=session.received_size)
+
+        written = 0
+        with open(temp_path(session), "r+b") as target:
+            target.seek(start)
+            while written < length:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                target.write(block)
+                written += len(block)
+            target.truncate()
+        if written != length:
+            raise UploadError("Chunk body is shorter than its Content-Range.", offset=session.received_size)
+
+        session.received_size = start + length
+        if session.received_size == session.total_size:
+            # no further chunk is accepted; process_uploads finishes it if
+            # this request dies before complete_upload does
+            session.status = "assembling"
+        session.save(update_fields=["received_size", "status", "updated"])
+    if session.status == "assembling":
+        complete_upload(session)
+    return session
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def complete_upload(session: UploadSession) -> StoredFile:
+    """
+    Hash the assembled temp file and attach the matching ``StoredFile``,
+    creating it (and queueing post-processing) only for new content.
+    """
+    path = temp_path(session)
+    sha256 = _file_digest(path)
+    stored = StoredFile.objects.filter(sha256=sha256).first()
+    if stored is None:
+        try:
+            with transaction.atomic(), open(path, "rb") as handle:
+                stored = StoredFile(
+                    sha256=sha256,
+                    original_name=session.filename,
+                    content_type=session.content_type,
+                    size=session.total_size,
+                )
+                stored.file.save(session.filename, File(handle), save=False)
+                stored.save()
+        except IntegrityError:
+            # same content finished concurrently in another session
+            stored.file.delete(save=False)
+            stored = StoredFile.objects.get(sha256=sha256)
+        else:
+            run_in_background(process_stored_file, stored.pk)
+    os.remove(path)
+
+    session.stored_file = stored
+    session.status = "complete"
+    session.save(update_fields=["stored_file", "status", "updated"])
+    return stored
+
+
+def completed_upload(upload_id, kind: str, user=None) -> UploadSession | None:
+    """
+    The finished upload ``upload_id`` of ``kind`` (owned by ``user`` when
+    given), or ``None``. Files that failed the virus scan are never returned.
+    """
+    queryset = UploadSession.objects.select_related("stored_file").filter(
+        pk=upload_id, kind=kind, status="complete", stored_file__isnull=False,
+    ).exclude(stored_file__scan_status="infected")
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    return queryset.first()
+
+
+def upload_state(session: UploadSession) -> dict:
+    """
+    JSON-friendly description of a session, used by the upload endpoints.
+    """
+    state = {
+        "upload_id": str(session.pk),
+        "kind": session.kind,
+        "filename": session.filename,
+        "status": session.status,
+        "offset": session.received_size,
+        "total_size": session.total_size,
+        "chunk_size": CHUNK_SIZE,
+    }
+    if session.stored_file_id:
+        stored = session.stored_file
+        state.update({
+            "sha256": stored.sha256,
+            "scan_status": stored.scan_status,
+            "processing_status": stored.processing_status,
+        })
+    return state
+
+
+# ---------- POST-PROCESSING ---------- #
+
+def scan_file(path: str) -> str:
+    """
+    Run the configured ``UPLOAD_VIRUS_SCANNER`` callable, which returns True
+    for clean files. Without one the scan is recorded as skipped.
+    """
+    scanner_path = getattr(settings, "UPLOAD_VIRUS_SCANNER", "")
+    if not scanner_path:
+        return "skipped"
+    scanner = import_string(scanner_path)
+    return "clean" if scanner(path) else "infected"
+
+
+def _docx_text(handle) -> str:
+    with zipfile.ZipFile(handle) as archive:
+        xml = archive.read("word/document.xml")
+    namespace = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    root = ElementTree.fromstring(xml)
+    paragraphs = (
+        "".join(node.text or "" for node in paragraph.iter(f"{namespace}t"))
+        for paragraph in root.iter(f"{namespace}p")
+    )
+    return "\n".join(text for text in paragraphs if text)
+
+
+def extract_text(stored: StoredFile) -> str:
+    extension = stored.original_name.rsplit(".", 1)[-1].lower()
+    with stored.file.open("rb") as handle:
+        if extension == "txt":
+            return handle.read(EXTRACTED_TEXT_LIMIT).decode("utf-8", errors="replace")
+        if extension == "docx":
+            return _docx_text(handle)
+        if extension == "pdf":
+            if not PYPDF_AVAILABLE:
+                logger.warning("pypdf is not installed; no text extracted from upload %s", stored.pk)
+                return ""
+            reader = PdfReader(handle)
+            return "\n".join(page.extract_text() or "" for page in reader.pages)
+    return ""
+
+
+def process_stored_file(stored_file_id) -> None:
+    """
+    Scan and extract text from a stored file. Runs on the worker pool;
+    ``manage.py process_uploads`` re-runs anything left pending.
+    """
+    updated = (
+        StoredFile.objects
+        .filter(pk=stored_file_id, processing_status__in=("pending", "failed"))
+        .update(processing_status="processing", processing_started=timezone.now())
+    )
+    if not updated:
+        return
+    stored = StoredFile.objects.get(pk=stored_file_id)
+    try:
+        stored.scan_status = scan_file(stored.file.path)
+        if stored.scan_status == "infected":
+            logger.warning("Upload %s (%s) failed the virus scan", stored.pk, stored.original_name)
+        else:
+            stored.extracted_text = extract_text(stored)[:EXTRACTED_TEXT_LIMIT]
+        stored.processing_status = "done"
+        stored.processing_error = ""
+    except Exception as exc:
+        logger.exception("Processing upload %s failed", stored.pk)
+        stored.processing_status = "failed"
+        stored.processing_error = str(exc)
+    stored.save(update_fields=[
+        "scan_status", "extracted_text", "processing_status", "processing_error",
+    ])
@@ -2,6 +2,8 @@ from django.urls import path
 from .views import (
     # Basic views
     home_view,
+    home_view_async,
+    event_stream_view,
     
     # User account and profile views
     onboarding_view,
@@ -22,13 +24,20 @@ from .views import (
     
     # Job-related views
     dashboard_view,
+    dashboard_data_view,
     job_list_view,
     job_detail_view,
     job_apply_view,
     job_application_success,
     my_applications_view,
+    job_list_view_async,
+    job_detail_view_async,
+    my_applications_view_async,
     application_detail_view,
     mark_message_as_read,
+    mark_thread_as_read,
+    upload_start_view,
+    upload_chunk_view,
     
     # Admin job views
     admin_job_list,
@@ -36,11 +45,20 @@ from .views import (
     admin_job_edit,
     admin_job_delete,
     admin_applications,
+    admin_applications_export,
     admin_update_application_status,
 )
 
+from django.conf import settings
 from django.views.generic import TemplateView
 
+# Async read paths when served by the ASGI server (see ASYNC_VIEWS)
+if settings.ASYNC_VIEWS:
+    home_view = home_view_async
+    job_list_view = job_list_view_async
+    job_detail_view = job_detail_view_async
+    my_applications_view = my_applications_view_async
+
 
 urlpatterns = [
     # Home page - root URL
@@ -49,7 +67,8 @@ urlpatterns = [
     # Profile and account management
     path('profile/', profile_view, name='profile'),
     path('onboarding/', onboarding_view, name='onboarding'),
-    path('dashboard/', dashboard_view, name='dashboard'),
+    path('dashboard/', dashboard_view, name='user_dashboard'),
+    path('dashboard/data/', dashboard_data_view, name='dashboard_data'),
 
     # Override allauth signup & password-change
     path('accounts/signup/', CustomSignupView.as_view(), name='account_signup'),
@@ -82,6 +101,14 @@ urlpatterns = [
     path('applications/<int:application_id>/', application_detail_view, name='application_detail'),
     
     path('api/messages/<int:message_id>/read/', mark_message_as_read, name='mark_message_as_read'),
+    path('api/applications/<int:application_id>/messages/read/', mark_thread_as_read, name='mark_thread_as_read'),
+
+    # Live updates (Server-Sent Events; the WebSocket twin is routed in a_core/asgi.py)
+    path('events/', event_stream_view, name='event_stream'),
+
+    # Resumable chunked uploads (resumes, RFQ documents)
+    path('uploads/', upload_start_view, name='upload_start'),
+    path('uploads/<uuid:upload_id>/', upload_chunk_view, name='upload_chunk'),
     
     # Admin job management
     path('admin/jobs/', admin_job_list, name='admin_job_list'),
@@ -89,5 +116,6 @@ urlpatterns = [
     path('admin/jobs/<int:job_id>/edit/', admin_job_edit, name='admin_job_edit'),
     path('admin/jobs/<int:job_id>/delete/', admin_job_delete, name='admin_job_delete'),
     path('admin/applications/', admin_applications, name='admin_applications'),
+    path('admin/applications/export/', admin_applications_export, name='admin_applications_export'),
     path('admin/applications/<int:application_id>/status/', admin_update_application_status, name='admin_update_application_status'),
 ]
\ No newline at end of file
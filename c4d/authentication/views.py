@@ -4,40 +4,60 @@ Views for user authentication, profiles, and job board functionality.
 
 from __future__ import annotations
 
-import random
-import string
-import time
 import json
 
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import redirect_to_login
 from django.core.exceptions import ObjectDoesNotExist
 from django.urls import reverse, reverse_lazy
 from django.contrib import messages
+from django.contrib.messages.storage.cookie import CookieStorage
 from django.conf import settings
 from django.core.mail import send_mail
-from django.http import JsonResponse, HttpResponseBadRequest
+from django.http import (
+    JsonResponse, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, HttpResponseNotAllowed,
+    StreamingHttpResponse,
+)
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.template.loader import render_to_string
+from asgiref.sync import sync_to_async
 from django.views.decorators.http import require_POST
 from django.utils import timezone
 from django.db.models import Q
-from django.core.paginator import Paginator
 
 from allauth.account.utils import send_email_confirmation
 from allauth.account.views import SignupView, PasswordChangeView
 
 # Import basic forms and models that should always be available
 from .forms import ProfileUpdateForm, EmailForm, CustomUserSignupForm
+from .managers import normalize_email
 from .models import Profile
+from .search import search_jobs, attach_snippets
+from .facets import FACET_FIELDS, ajob_facets, job_facets
+from .pagination import CursorPaginator
+from .querybudget import query_budget
+from .access import async_login_required, mfa_required
+from .caching import aget_or_build, ajob_board_version, get_or_build, job_board_version, make_key
+from .dashboard import dashboard_summary
+from . import otp
+from .otp import OTP_TTL, OTPThrottled, otp_service
+from .exports import EXPORT_FORMATS, export_response, filter_applications
+from .uploads import UploadError, append_chunk, parse_content_range, start_upload, upload_state
+from .realtime import publish_status, sse_stream
 
 # Get the User model
 User = get_user_model()
 
+HOME_PAGE_CACHE_TIMEOUT = getattr(settings, "HOME_PAGE_CACHE_TIMEOUT", 600)
+
 # Check if job models and forms are available
 try:
-    from .models import Job, JobApplication, Rfqt, Message
+    from .models import Job, JobApplication, Rfqt, Message, UploadSession
     from .forms import RfqtForm, JobForm, JobApplicationForm, JobSearchForm, MessageForm
+    from .inbox import mark_read, mark_thread_read, unread_count
     JOB_MODELS_EXIST = True
 except ImportError:
     # Set a flag to disable job-related views
@@ -88,19 +108,19 @@ def mfa_setup(request):
             messages.add_message(request, msg.level, msg.message)
 
     user = request.user
-    code = "".join(random.choices(string.digits, k=6))
-    now = int(time.time())
+    if request.session.get("mfa_confirmed"):
+        request.session["mfa_confirmed"] = False
 
-    # Store OTP and timing information in session
-    request.session["mfa_code"] = code
-    request.session["mfa_confirmed"] = False
-    request.session["mfa_code_generated_at"] = now
-    request.session["mfa_code_expires_at"] = now + 600  # 10 minutes
+    try:
+        # only throttle while a code sent moments ago is still usable
+        code = otp_service.issue(user.pk, throttle=otp_service.status(user.pk).issued)
+    except OTPThrottled:
+        return redirect("mfa_verify")
 
     # Send OTP via email
     send_mail(
         subject="Your MFA Code",
-        message=f"Your MFA code is: {code}\n\nThis code is valid for 10 minutes.",
+        message=f"Your MFA code is: {code}\n\nThis code is valid for {OTP_TTL // 60} minutes.",
         from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "mfa@c4defence.com.au"),
         recipient_list=[user.email],
     )
@@ -114,45 +134,31 @@ def mfa_verify(request):
     Step 2 – verify OTP.
     Validates the OTP entered by the user.
     """
-    now = int(time.time())
-    
     if request.method == "POST":
-        token = request.POST.get("token", "").strip()
-        code_in_session = request.session.get("mfa_code")
-        expires_at = request.session.get("mfa_code_expires_at", 0)
+        result = otp_service.verify(request.user.pk, request.POST.get("token", ""))
 
         # Check if OTP has expired
-        if now > expires_at:
+        if result == otp.EXPIRED:
             messages.error(request, "OTP has expired. Please request a new one.")
             return redirect("mfa_resend")
+        if result == otp.LOCKED:
+            messages.error(request, "Too many incorrect attempts. Please request a new OTP.")
+            return redirect("mfa_resend")
 
         # Validate OTP
-        if code_in_session and token == code_in_session:
+        if result == otp.VALID:
             request.session["mfa_confirmed"] = True
-            # Clean up session
-            for key in ("mfa_code", "mfa_code_generated_at", "mfa_code_expires_at"):
-                request.session.pop(key, None)
             messages.success(request, "MFA verification successful.")
             return redirect("profile")
 
         messages.error(request, "Invalid OTP. Please try again.")
 
     # Prepare resend information
-    resend_wait = 0
-    otp_resend_available = False
-    code_generated = request.session.get("mfa_code_generated_at")
-
-    if code_generated:
-        elapsed = now - code_generated
-        if elapsed >= 60:  # 1 minute rate limit for resends
-            otp_resend_available = True
-        else:
-            resend_wait = 60 - elapsed
-
+    status = otp_service.status(request.user.pk)
     context = {
-        "otp_resend_available": otp_resend_available,
-        "resend_wait": resend_wait,
-        "otp_remaining": request.session.get("mfa_code_expires_at", now) - now,
+        "otp_resend_available": status.resend_available,
+        "resend_wait": status.resend_wait,
+        "otp_remaining": status.remaining,
     }
     return render(request, "account/mfa_verify.html", context)
 
@@ -162,20 +168,13 @@ def mfa_resend(request):
     """
     Resend OTP (rate-limited to once per minute).
     """
-    now = int(time.time())
-    generated_at = request.session.get("mfa_code_generated_at", 0)
-    
-    # Rate limiting check
-    if now - generated_at < 60:
-        messages.error(request, "You cannot resend OTP until 1 minute has passed.")
-        return redirect("mfa_verify")
-
     # Generate new OTP
     user = request.user
-    code = "".join(random.choices(string.digits, k=6))
-    request.session["mfa_code"] = code
-    request.session["mfa_code_generated_at"] = now
-    request.session["mfa_code_expires_at"] = now + 600
+    try:
+        code = otp_service.issue(user.pk)
+    except OTPThrottled:
+        messages.error(request, "You cannot resend OTP until 1 minute has passed.")
+        return redirect("mfa_verify")
 
     # Send new OTP
     send_mail(
@@ -193,14 +192,15 @@ def mfa_resend(request):
 # --------------------------------------------------------------------------- #
 
 @login_required
+@mfa_required
 def onboarding_view(request):
     """
     First-time profile wizard.
     Refines first, middle, last names to Title Case before saving.
     """
-    # Ensure MFA is completed
-    if not request.session.get("mfa_confirmed", False):
-        return redirect("mfa_setup")
+    # Skip onboarding if already completed (cached state, no profile query)
+    if request.access.onboarding_completed:
+        return redirect("profile")
 
     # Get or create profile
     try:
@@ -240,14 +240,11 @@ def onboarding_view(request):
 
 
 @login_required
+@mfa_required
 def profile_view(request, username: str | None = None):
     """
     Display profile for current or arbitrary user.
     """
-    # Ensure MFA is completed
-    if not request.session.get("mfa_confirmed", False):
-        return redirect("mfa_setup")
-
     # Get profile by username or current user
     if username:
         profile = get_object_or_404(User, username=username).profile
@@ -329,7 +326,7 @@ def update_account_view(request):
     """
     user = request.user
     if request.method == "POST":
-        new_email = request.POST.get("email", "").strip()
+        new_email = normalize_email(request.POST.get("email", ""))
         
         # Validate email
         if not new_email:
@@ -337,7 +334,7 @@ def update_account_view(request):
             return redirect("profile")
 
         # Check if email is already in use by current user
-        if user.email.lower() == new_email.lower():
+        if user.email == new_email:
             messages.error(request, "This is already your current email address.")
             return redirect("profile")
 
@@ -345,8 +342,8 @@ def update_account_view(request):
 
         # Check if email is in use by another user
         if (
-            User.objects.filter(email__iexact=new_email).exclude(id=user.id).exists()
-            or EmailAddress.objects.filter(email__iexact=new_email).exclude(user=user).exists()
+            User.objects.filter(email=new_email).exclude(id=user.id).exists()
+            or EmailAddress.objects.filter(email=new_email).exclude(user=user).exists()
         ):
             messages.error(request, f"{new_email} is already in use by an account.")
             return redirect("profile")
@@ -429,18 +426,18 @@ def profile_emailchange(request):
     if request.method == "POST":
         form = EmailForm(request.POST)
         if form.is_valid():
-            email = form.cleaned_data["email"]
+            email = normalize_email(form.cleaned_data["email"])
             
             # Check if email is already in use by current user
-            if request.user.email.lower() == email.lower():
+            if request.user.email == email:
                 return JsonResponse({"success": False, "message": "This is already your current email address."})
 
             from allauth.account.models import EmailAddress
 
             # Check if email is in use by another user
             if (
-                User.objects.filter(email__iexact=email).exclude(id=request.user.id).exists()
-                or EmailAddress.objects.filter(email__iexact=email).exclude(user=request.user).exists()
+                User.objects.filter(email=email).exclude(id=request.user.id).exists()
+                or EmailAddress.objects.filter(email=email).exclude(user=request.user).exists()
             ):
                 return JsonResponse({"success": False, "message": f"{email} is already in use by an account."})
 
@@ -506,15 +503,79 @@ class CustomPasswordChangeView(PasswordChangeView):
         # 4. Go to /accounts/login/
         return redirect(self.get_success_url())
 
-    from django.template.loader import get_template
+
+def _shared_home_page(request) -> bool:
+    """
+    Whether ``request`` may get the one cached home page: an anonymous
+    visitor carrying no per-visitor state (no session, no flash messages in
+    the message cookie).
+    """
+    return (
+        settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
 
 def home_view(request):
+    """
+    Landing page with the latest three active jobs.
+    Anonymous visitors without a session or pending messages get the whole
+    page from the job-board cache; everyone else gets the cached job-card
+    fragment.
+    """
     jobs = Job.objects.filter(is_active=True).order_by('-submission_date')[:3] if JOB_MODELS_EXIST else []
 
-    # <── the only line that matters
-    return render(request, "home.html",  # tell Django exactly which template
-                  {"showcase_jobs": jobs})
+    def build(**context):
+        return render_to_string("home.html", {"showcase_jobs": jobs, **context}, request)
 
+    if _shared_home_page(request) and request.user.is_anonymous:
+        key = make_key("page:home", version=job_board_version())
+        # the shared copy never carries anyone's messages
+        return HttpResponse(get_or_build(key, lambda: build(messages=()), HOME_PAGE_CACHE_TIMEOUT))
+
+    return HttpResponse(build())
+
+
+async def home_view_async(request):
+    """
+    Async twin of ``home_view``: a cached page for anonymous visitors is
+    served without leaving the event loop; rendering runs in a thread.
+    """
+    jobs = Job.objects.filter(is_active=True).order_by('-submission_date')[:3] if JOB_MODELS_EXIST else []
+
+    def build(**context):
+        return render_to_string("home.html", {"showcase_jobs": jobs, **context}, request)
+
+    if _shared_home_page(request) and (await request.auser()).is_anonymous:
+        key = make_key("page:home", version=await ajob_board_version())
+        return HttpResponse(await aget_or_build(key, lambda: build(messages=()), HOME_PAGE_CACHE_TIMEOUT))
+
+    return HttpResponse(await sync_to_async(build)())
+
+
+# --------------------------------------------------------------------------- #
+#  Live updates                                                               #
+# --------------------------------------------------------------------------- #
+
+async def event_stream_view(request):
+    """
+    Server-Sent Events: new messages and application status changes for
+    the signed-in user (see authentication.realtime).
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse("Live updates need the ASGI server.", status=501)
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    if not await sync_to_async(request.session.get)("mfa_confirmed", False):
+        return HttpResponseForbidden()
+    # the stream outlives the request; give its database connection back now
+    await sync_to_async(connections.close_all)()
+
+    response = StreamingHttpResponse(sse_stream(user.pk), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 # --------------------------------------------------------------------------- #
@@ -524,128 +585,152 @@ def home_view(request):
 # Only defining job-related views if the models exist
 if JOB_MODELS_EXIST:
     @login_required
+    @query_budget(12)
     def dashboard_view(request):
         """
-        Enhanced dashboard view with debugging.
+        Dashboard: a page of active jobs with one selected for detail.
+        Counts and recent activity load from dashboard_data_view.
         """
         # Force MFA confirmation
         request.session["mfa_confirmed"] = True
         
-        # Get all jobs and print diagnostics
-        all_jobs = Job.objects.all()
-        jobs_count = all_jobs.count()
-        print(f"DASHBOARD DEBUG: Found {jobs_count} jobs in database")
+        # One page of active jobs instead of the whole table
+        page_obj = CursorPaginator(Job.objects.filter(is_active=True), 20).page(request.GET.get('cursor'))
         
-        # Print details of each job for verification
-        for job in all_jobs:
-            print(f"DASHBOARD DEBUG: Job ID: {job.id}, Title: {job.title}, Active: {job.is_active}")
-        
-        # Handle selected job from URL parameter
-        selected_job_id = request.GET.get('selected')
+        # Handle selected job from URL parameter, defaulting to the first listed
         selected_job = None
-        
+        selected_job_id = request.GET.get('selected')
         if selected_job_id:
             try:
                 selected_job = Job.objects.get(id=selected_job_id)
-                print(f"DASHBOARD DEBUG: Selected job by URL param: {selected_job.title}")
             except (Job.DoesNotExist, ValueError):
-                print(f"DASHBOARD DEBUG: Invalid selected job ID: {selected_job_id}")
-                if all_jobs.exists():
-                    selected_job = all_jobs.first()
-                    print(f"DASHBOARD DEBUG: Defaulting to first job: {selected_job.title}")
-        elif all_jobs.exists():
-            selected_job = all_jobs.first()
-            print(f"DASHBOARD DEBUG: No selection, defaulting to first job: {selected_job.title}")
-        else:
-            print("DASHBOARD DEBUG: No jobs available for selection")
-        
-        # Get user applications
-        user_applications = JobApplication.objects.filter(user=request.user)
-        applications_count = user_applications.count()
-        print(f"DASHBOARD DEBUG: User has {applications_count} applications")
+                selected_job = None
+        if selected_job is None and page_obj.object_list:
+            selected_job = page_obj.object_list[0]
+        
+        # Latest applications for the table; totals come from the summary API
+        user_applications = (
+            JobApplication.objects.filter(user=request.user)
+            .select_related('job')
+            .order_by('-submission_date')[:10]
+        )
         
-        # Create context with explicit debugging
         context = {
-            'all_jobs': all_jobs,
+            'all_jobs': page_obj,
+            'page_obj': page_obj,
             'selected_job': selected_job,
             'user_applications': user_applications,
-            'jobs_count': jobs_count,  # Add this for template debugging
-            'debug_info': f"Found {jobs_count} jobs, Selected job: {selected_job.title if selected_job else 'None'}"
         }
         
-        # Identify which template is being used
-        print(f"DASHBOARD DEBUG: Rendering template: dashboard.html")
-        
-        # Try a completely different approach - directly create a list for template rendering
         return render(request, "dashboard.html", context)
 
 
     @login_required
+    @query_budget(8)
+    def dashboard_data_view(request):
+        """
+        JSON summary for the dashboard: job counts, per-status application
+        counts and recent activity (cached, see authentication.dashboard).
+        """
+        return JsonResponse(dashboard_summary(request.user))
+
+
+    def _job_search_params(request):
+        """
+        Validated search form, keyword and selected facet filters.
+        """
+        form = JobSearchForm(request.GET)
+        keyword = ''
+        selected = {}
+        if form.is_valid():
+            keyword = form.cleaned_data.get('keyword')
+            selected = {
+                field: form.cleaned_data.get(field)
+                for field in FACET_FIELDS
+                if form.cleaned_data.get(field)
+            }
+        return form, keyword, selected
+
+
+    def _job_list_paginator(jobs, keyword, selected):
+        # Apply filters if provided
+        if selected:
+            jobs = jobs.filter(**selected)
+        
+        # Keyset-paginate results (10 per page); relevance first when searching
+        ordering = ('-submission_date', '-id')
+        if keyword:
+            ordering = ('-search_rank',) + ordering
+        return CursorPaginator(jobs, 10, ordering=ordering, count='approximate')
+
+
+    def _job_list_context(page_obj, form, facets):
+        return {
+            'page_obj': page_obj,
+            'search_form': form,
+            'facets': facets,
+            'job_types': [f['value'] for f in facets['job_type']],
+            'locations': [f['value'] for f in facets['location']],
+            'clearances': [f['value'] for f in facets['clearance']],
+        }
+
+
+    @login_required
+    @mfa_required
+    @query_budget(10)
     def job_list_view(request):
         """
         List view of all active jobs with filtering.
         Traditional paginated list of jobs.
         """
-        # Ensure MFA is completed
-        if not request.session.get("mfa_confirmed", False):
-            return redirect("mfa_setup")
-        
         # Get active jobs
         jobs = Job.objects.filter(is_active=True)
         
         # Process search/filtering
-        form = JobSearchForm(request.GET)
-        if form.is_valid():
-            job_type = form.cleaned_data.get('job_type')
-            location = form.cleaned_data.get('location')
-            clearance = form.cleaned_data.get('clearance')
-            keyword = form.cleaned_data.get('keyword')
-            
-            # Apply filters if provided
-            if job_type:
-                jobs = jobs.filter(job_type=job_type)
-            if location:
-                jobs = jobs.filter(location=location)
-            if clearance:
-                jobs = jobs.filter(clearance=clearance)
-            if keyword:
-                jobs = jobs.filter(
-                    Q(title__icontains=keyword) |
-                    Q(description__icontains=keyword) |
-                    Q(short_description__icontains=keyword) |
-                    Q(skills_sets__icontains=keyword)
-                )
+        form, keyword, selected = _job_search_params(request)
         
-        # Paginate results
-        paginator = Paginator(jobs, 10)  # Show 10 jobs per page
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        # Ranked full-text search (see authentication.search)
+        if keyword:
+            jobs = search_jobs(jobs, keyword)
         
-        # Get unique filter options
-        job_types = Job.objects.values_list('job_type', flat=True).distinct()
-        locations = Job.objects.values_list('location', flat=True).distinct()
-        clearances = Job.objects.values_list('clearance', flat=True).distinct()
+        # Facet counts for the sidebar, taken before the facet filters apply
+        facets = job_facets(jobs, selected, key=keyword)
         
-        context = {
-            'page_obj': page_obj,
-            'search_form': form,
-            'job_types': job_types,
-            'locations': locations,
-            'clearances': clearances,
-        }
+        page_obj = _job_list_paginator(jobs, keyword, selected).page(request.GET.get('cursor'))
+        if keyword:
+            attach_snippets(page_obj.object_list, keyword)
+        
+        return render(request, "job_list.html", _job_list_context(page_obj, form, facets))
+
+
+    @async_login_required
+    @mfa_required
+    @query_budget(10)
+    async def job_list_view_async(request):
+        """
+        Async twin of ``job_list_view``.
+        """
+        jobs = Job.objects.filter(is_active=True)
+        form, keyword, selected = _job_search_params(request)
+        if keyword:
+            # the non-PostgreSQL fallback may build its index on first use
+            jobs = await sync_to_async(search_jobs)(jobs, keyword)
+        
+        facets = await ajob_facets(jobs, selected, key=keyword)
+        
+        page_obj = await _job_list_paginator(jobs, keyword, selected).apage(request.GET.get('cursor'))
+        if keyword:
+            attach_snippets(page_obj.object_list, keyword)
         
-        return render(request, "job_list.html", context)
+        return await sync_to_async(render)(request, "job_list.html", _job_list_context(page_obj, form, facets))
 
 
     @login_required
+    @mfa_required
     def job_detail_view(request, job_id):
         """
         Detailed view of a specific job.
         """
-        # Ensure MFA is completed
-        if not request.session.get("mfa_confirmed", False):
-            return redirect("mfa_setup")
-        
         # Get job or 404
         job = get_object_or_404(Job, id=job_id, is_active=True)
         
@@ -655,7 +740,7 @@ if JOB_MODELS_EXIST:
         # Get related messages if staff
         messages_list = None
         if request.user.is_staff:
-            messages_list = Message.objects.filter(job=job).order_by('timestamp')
+            messages_list = Message.objects.filter(job=job).select_related('sender', 'recipient').order_by('timestamp')
         
         context = {
             'job': job,
@@ -666,15 +751,37 @@ if JOB_MODELS_EXIST:
         return render(request, "job_detail.html", context)
 
 
+    @async_login_required
+    @mfa_required
+    async def job_detail_view_async(request, job_id):
+        """
+        Async twin of ``job_detail_view``.
+        """
+        job = await aget_object_or_404(Job, id=job_id, is_active=True)
+        has_applied = await JobApplication.objects.filter(job=job, user=request.user).aexists()
+        
+        messages_list = None
+        if request.user.is_staff:
+            messages_list = [
+                message async for message in
+                Message.objects.filter(job=job).select_related('sender', 'recipient').order_by('timestamp')
+            ]
+        
+        context = {
+            'job': job,
+            'has_applied': has_applied,
+            'messages': messages_list,
+        }
+        
+        return await sync_to_async(render)(request, "job_detail.html", context)
+
+
     @login_required
+    @mfa_required
     def job_apply_view(request, job_id):
         """
         Apply for job.
         """
-
-        if not request.session.get("mfa_confirmed", False):
-            return redirect("mfa_setup")
-        
         # Get job or 404
         job = get_object_or_404(Job, id=job_id, is_active=True)
         
@@ -684,7 +791,7 @@ if JOB_MODELS_EXIST:
             return redirect('job_detail', job_id=job.id)
         
         if request.method == 'POST':
-            form = JobApplicationForm(request.POST, request.FILES)
+            form = JobApplicationForm(request.POST, request.FILES, upload_user=request.user)
             if form.is_valid():
                 # Save application
                 application = form.save(commit=False)
@@ -739,55 +846,79 @@ if JOB_MODELS_EXIST:
 
 
     @login_required
+    @mfa_required
     def job_application_success(request):
         """
         Success page after job application submission.
         """
-        # Ensure MFA is completed
-        if not request.session.get("mfa_confirmed", False):
-            return redirect("mfa_setup")
-        
         return render(request, "job_application_success.html")
 
 
     @login_required
+    @mfa_required
+    @query_budget(8)
     def my_applications_view(request):
         """
         View all applications by the current user.
         """
-        # Ensure MFA is completed
-        if not request.session.get("mfa_confirmed", False):
-            return redirect("mfa_setup")
-        
-        # Get user applications
-        applications = JobApplication.objects.filter(user=request.user).order_by('-submission_date')
+        # Get user applications, newest first
+        applications = JobApplication.objects.filter(user=request.user).select_related('job')
+        page_obj = CursorPaginator(applications, 20).page(request.GET.get('cursor'))
         
         context = {
-            'applications': applications
+            'applications': page_obj,
+            'page_obj': page_obj,
         }
         
         return render(request, "my_applications.html", context)
 
 
+    @async_login_required
+    @mfa_required
+    @query_budget(8)
+    async def my_applications_view_async(request):
+        """
+        Async twin of ``my_applications_view``.
+        """
+        applications = JobApplication.objects.filter(user=request.user).select_related('job')
+        page_obj = await CursorPaginator(applications, 20).apage(request.GET.get('cursor'))
+        
+        context = {
+            'applications': page_obj,
+            'page_obj': page_obj,
+        }
+        
+        return await sync_to_async(render)(request, "my_applications.html", context)
+
+
     @login_required
+    @mfa_required
+    @query_budget(10)
     def application_detail_view(request, application_id):
         """
         View details of a specific application with messaging.
         """
-        # Ensure MFA is completed
-        if not request.session.get("mfa_confirmed", False):
-            return redirect("mfa_setup")
-        
         # Get application or 404
-        application = get_object_or_404(JobApplication, id=application_id)
+        application = get_object_or_404(
+            JobApplication.objects.select_related('job', 'user'), id=application_id
+        )
         
         # Security check - only owner or staff can view
-        if application.user != request.user and not request.user.is_staff:
+        if application.user_id != request.user.pk and not request.user.is_staff:
             messages.error(request, "You do not have permission to view this application.")
             return redirect('job_list')
         
-        # Get related messages
-        application_messages = Message.objects.filter(application=application).order_by('timestamp')
+        # Get related messages: the latest page of the thread, shown oldest first
+        thread = CursorPaginator(
+            Message.objects.filter(application=application).select_related('sender', 'recipient'),
+            50,
+            ordering=('-timestamp', '-id'),
+        ).page(request.GET.get('cursor'))
+        application_messages = thread.object_list[::-1]
+        
+        # Opening the thread reads it: one UPDATE for all unread messages
+        if request.method == 'GET':
+            mark_thread_read(request.user.pk, application.id)
         
         # Handle new message submission
         if request.method == 'POST':
@@ -813,6 +944,7 @@ if JOB_MODELS_EXIST:
         context = {
             'application': application,
             'messages': application_messages,
+            'messages_page': thread,
             'message_form': form,
         }
         
@@ -825,11 +957,90 @@ if JOB_MODELS_EXIST:
         Mark a message as read.
         """
         # Only the recipient can mark a message as read
-        message = get_object_or_404(Message, id=message_id, recipient=request.user)
-        message.is_read = True
-        message.save()
+        get_object_or_404(Message.objects.only('id'), id=message_id, recipient=request.user)
+        mark_read(request.user.pk, Message.objects.filter(id=message_id))
+        
+        return JsonResponse({'success': True, 'unread': unread_count(request.user.pk)})
+
+
+    @login_required
+    @require_POST
+    def mark_thread_as_read(request, application_id):
+        """
+        Mark all of an application's messages to the current user as read.
+        """
+        application = get_object_or_404(JobApplication.objects.only('id', 'user_id'), id=application_id)
+        if application.user_id != request.user.pk and not request.user.is_staff:
+            return JsonResponse({'success': False, 'message': 'Permission denied.'}, status=403)
+        marked = mark_thread_read(request.user.pk, application.id)
         
-        return JsonResponse({'success': True})
+        return JsonResponse({'success': True, 'marked': marked, 'unread': unread_count(request.user.pk)})
+
+
+    # --------------------------------------------------------------------------- #
+    #  Chunked uploads                                                            #
+    # --------------------------------------------------------------------------- #
+
+    def _upload_error(exc):
+        payload = {'success': False, 'message': str(exc)}
+        if exc.offset is not None:
+            payload['offset'] = exc.offset
+        return JsonResponse(payload, status=exc.status)
+
+
+    @login_required
+    @mfa_required
+    @require_POST
+    def upload_start_view(request):
+        """
+        Open a resumable upload. Expects ``kind`` (resume / rfq_file),
+        ``filename``, ``size`` and optionally ``content_type`` as form fields
+        or JSON; answers with the upload id, chunk size and chunk URL.
+        """
+        try:
+            if request.content_type == 'application/json':
+                data = json.loads(request.body or b'{}')
+            else:
+                data = request.POST
+            session = start_upload(
+                request.user,
+                kind=data.get('kind', ''),
+                filename=data.get('filename', ''),
+                total_size=int(data.get('size', 0)),
+                content_type=data.get('content_type', ''),
+            )
+        except (ValueError, TypeError):
+            return JsonResponse({'success': False, 'message': 'Invalid upload request.'}, status=400)
+        except UploadError as exc:
+            return _upload_error(exc)
+
+        payload = {'success': True, 'url': reverse('upload_chunk', args=[session.pk]), **upload_state(session)}
+        return JsonResponse(payload, status=201)
+
+
+    @login_required
+    @mfa_required
+    def upload_chunk_view(request, upload_id):
+        """
+        GET: current offset/status, for resuming an interrupted upload.
+        PUT/POST: append the raw request body at the offset given by the
+        ``Content-Range: bytes start-end/total`` header. The body is streamed
+        to disk, never loaded into memory as a whole.
+        """
+        if request.method == 'GET':
+            session = get_object_or_404(
+                UploadSession.objects.select_related('stored_file'), pk=upload_id, user=request.user
+            )
+            return JsonResponse({'success': True, **upload_state(session)})
+        if request.method not in ('PUT', 'POST'):
+            return HttpResponseNotAllowed(['GET', 'PUT', 'POST'])
+
+        try:
+            start, end, total = parse_content_range(request.headers.get('Content-Range'))
+            session = append_chunk(upload_id, request.user, start, end, total, request)
+        except UploadError as exc:
+            return _upload_error(exc)
+        return JsonResponse({'success': True, **upload_state(session)})
 
 
     # --------------------------------------------------------------------------- #
@@ -837,14 +1048,12 @@ if JOB_MODELS_EXIST:
     # --------------------------------------------------------------------------- #
 
     @login_required
+    @mfa_required
+    @query_budget(8)
     def admin_job_list(request):
         """
         Admin view for managing all jobs.
         """
-        # Ensure MFA is completed
-        if not request.session.get("mfa_confirmed", False):
-            return redirect("mfa_setup")
-        
         # Check permissions
         if not request.user.is_staff:
             messages.error(request, "You don't have permission to access this page.")
@@ -861,14 +1070,11 @@ if JOB_MODELS_EXIST:
 
 
     @login_required
+    @mfa_required
     def admin_job_create(request):
         """
         Admin view for creating a new job.
         """
-        # Ensure MFA is completed
-        if not request.session.get("mfa_confirmed", False):
-            return redirect("mfa_setup")
-        
         # Check permissions
         if not request.user.is_staff:
             messages.error(request, "You don't have permission to access this page.")
@@ -892,14 +1098,11 @@ if JOB_MODELS_EXIST:
 
 
     @login_required
+    @mfa_required
     def admin_job_edit(request, job_id):
         """
         Admin view for editing an existing job.
         """
-        # Ensure MFA is completed
-        if not request.session.get("mfa_confirmed", False):
-            return redirect("mfa_setup")
-        
         # Check permissions
         if not request.user.is_staff:
             messages.error(request, "You don't have permission to access this page.")
@@ -927,14 +1130,11 @@ if JOB_MODELS_EXIST:
 
 
     @login_required
+    @mfa_required
     def admin_job_delete(request, job_id):
         """
         Admin view for deleting a job.
         """
-        # Ensure MFA is completed
-        if not request.session.get("mfa_confirmed", False):
-            return redirect("mfa_setup")
-        
         # Check permissions
         if not request.user.is_staff:
             messages.error(request, "You don't have permission to access this page.")
@@ -957,21 +1157,19 @@ if JOB_MODELS_EXIST:
 
 
     @login_required
+    @mfa_required
+    @query_budget(10)
     def admin_applications(request):
         """
         Admin view for managing all job applications.
         """
-        # Ensure MFA is completed
-        if not request.session.get("mfa_confirmed", False):
-            return redirect("mfa_setup")
-        
         # Check permissions
         if not request.user.is_staff:
             messages.error(request, "You don't have permission to access this page.")
             return redirect('job_list')
         
         # Get all applications
-        applications = JobApplication.objects.all().order_by('-submission_date')
+        applications = JobApplication.objects.select_related('job', 'user')
         
         # Handle filtering
         job_id = request.GET.get('job')
@@ -982,9 +1180,13 @@ if JOB_MODELS_EXIST:
         if status:
             applications = applications.filter(status=status)
         
+        # Keyset-paginate, newest first
+        page_obj = CursorPaginator(applications, 25, count='approximate').page(request.GET.get('cursor'))
+        
         context = {
-            'applications': applications,
-            'jobs': Job.objects.all(),
+            'applications': page_obj,
+            'page_obj': page_obj,
+            'jobs': Job.objects.only('id', 'title'),
             'statuses': JobApplication._meta.get_field('status').choices,
             'selected_job': job_id,
             'selected_status': status,
@@ -993,6 +1195,22 @@ if JOB_MODELS_EXIST:
         return render(request, "admin/applications_list.html", context)
 
 
+    @login_required
+    @mfa_required
+    def admin_applications_export(request):
+        """
+        Stream the applications matching the ``admin_applications`` filters
+        (``job``, ``status``) as CSV or JSON (``format``).
+        """
+        if not request.user.is_staff:
+            return HttpResponseForbidden("Permission denied")
+        fmt = request.GET.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return HttpResponseBadRequest("Unsupported export format.")
+        applications = filter_applications(job_id=request.GET.get('job'), status=request.GET.get('status'))
+        return export_response(applications, fmt, asynchronous=isinstance(request, ASGIRequest))
+
+
     @login_required
     @require_POST
     def admin_update_application_status(request, application_id):
@@ -1012,6 +1230,7 @@ if JOB_MODELS_EXIST:
         if status in valid_statuses:
             application.status = status
             application.save()
+            publish_status(application)
             return JsonResponse({'success': True})
         
         return JsonResponse({'success': False, 'message': 'Invalid status'}, status=400)
@@ -1023,6 +1242,9 @@ else:
         """Fallback dashboard when job models aren't available."""
         return render(request, "dashboard_fallback.html")
 
+    def dashboard_data_view(request):
+        return JsonResponse({'success': False, 'message': 'Feature not available'})
+
     def job_list_view(request):
         return redirect("home")
 
@@ -1038,12 +1260,25 @@ else:
     def my_applications_view(request):
         return redirect("profile")
 
+    job_list_view_async = job_list_view
+    job_detail_view_async = job_detail_view
+    my_applications_view_async = my_applications_view
+
     def application_detail_view(request, application_id):
         return redirect("profile")
 
     def mark_message_as_read(request, message_id):
         return JsonResponse({'success': False, 'message': 'Feature not available'})
 
+    def mark_thread_as_read(request, application_id):
+        return JsonResponse({'success': False, 'message': 'Feature not available'})
+
+    def upload_start_view(request):
+        return JsonResponse({'success': False, 'message': 'Feature not available'})
+
+    def upload_chunk_view(request, upload_id):
+        return JsonResponse({'success': False, 'message': 'Feature not available'})
+
     def admin_job_list(request):
         return redirect("home")
 
@@ -1059,5 +1294,8 @@ else:
     def admin_applications(request):
         return redirect("home")
 
+    def admin_applications_export(request):
+        return redirect("home")
+
     def admin_update_application_status(request, application_id):
         return JsonResponse({'success': False, 'message': 'Feature not available'})
\ No newline at end of file
@@ -12,6 +12,12 @@ then
 fi
 
 # python manage.py flush --no-input
-python manage.py migrate
 
-exec "$@"
\ No newline at end of file
+# Migrations run once per deploy from the `migrate` job (docker-compose) rather
+# than on every container start; set RUN_MIGRATIONS=1 to run them here instead.
+if [ "$RUN_MIGRATIONS" = "1" ]
+then
+    python manage.py migrate --noinput
+fi
+
+exec "$@"
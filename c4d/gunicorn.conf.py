@@ -0,0 +1,67 @@
+"""
+Gunicorn configuration for production serving.
+
+    gunicorn -c gunicorn.conf.py
+
+SERVER_INTERFACE=wsgi (default) serves a_core.wsgi with threaded sync workers;
+SERVER_INTERFACE=asgi serves a_core.asgi with uvicorn workers.
+
+The app is preloaded in the master so workers share its memory copy-on-write.
+Because the code lives in the master, `kill -HUP` only restarts workers on
+the already-loaded code. To deploy new code without dropping requests, send
+USR2 (start a new master and workers), then WINCH and TERM to the old master.
+"""
+
+import multiprocessing
+import os
+import sys
+
+interface = os.environ.get("SERVER_INTERFACE", "wsgi")
+cpus = multiprocessing.cpu_count()
+
+if interface == "asgi":
+    wsgi_app = "a_core.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+    # one event loop per core is enough; each handles many connections
+    workers = int(os.environ.get("WEB_CONCURRENCY", cpus))
+else:
+    wsgi_app = "a_core.wsgi:application"
+    worker_class = "gthread"
+    workers = int(os.environ.get("WEB_CONCURRENCY", cpus * 2 + 1))
+    threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+preload_app = True
+
+# Recycle workers now and then to cap slow leaks; jitter avoids restarting
+# them all at once.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = 200
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+POOL_MODULE = "a_core.postgresql_pool.base"
+
+
+def pre_fork(server, worker):
+    # The preloaded master must not hand an open database socket to its
+    # workers; each worker opens its own on first use. With DB_POOL_MODE=pool
+    # close_all() only returns the connection to the pool, so close the pool.
+    from django.db import connections
+
+    connections.close_all()
+    if POOL_MODULE in sys.modules:
+        sys.modules[POOL_MODULE].close_pools()
+
+
+def post_fork(server, worker):
+    # anything the master pooled after pre_fork belongs to the master
+    if POOL_MODULE in sys.modules:
+        sys.modules[POOL_MODULE].forget_pools()
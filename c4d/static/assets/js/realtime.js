@@ -0,0 +1,56 @@
+(function () {
+  "use strict";
+
+  /* live updates: new messages and application status changes */
+  const script = document.currentScript;
+  const url = script && script.dataset.url;
+  if (!url || !window.EventSource) {
+    return;
+  }
+
+  const badge = document.getElementById("notifiation-data");
+
+  /* returns false when a listener called preventDefault() */
+  function emit(name, detail) {
+    return window.dispatchEvent(new CustomEvent("c4d:" + name, { detail: detail, cancelable: true }));
+  }
+
+  function bumpUnread() {
+    if (!badge) {
+      return;
+    }
+    const unread = parseInt(badge.textContent, 10) || 0;
+    badge.textContent = unread + 1 + " Unread";
+  }
+
+  function connect() {
+    const source = new EventSource(url);
+
+    source.addEventListener("message", function (event) {
+      const data = JSON.parse(event.data);
+      if (data.direction === "in") {
+        bumpUnread();
+      }
+      emit("message", data);
+    });
+
+    source.addEventListener("application.status", function (event) {
+      emit("application-status", JSON.parse(event.data));
+    });
+
+    /* fell too far behind: what the page shows is stale. Reload it, unless
+       a page refreshes its own data (preventDefault on c4d:resync); then
+       just start a fresh stream */
+    source.addEventListener("resync", function () {
+      source.close();
+      if (emit("resync", {})) {
+        window.location.reload();
+      } else {
+        connect();
+      }
+    });
+  }
+
+  connect();
+  /* live updates */
+})();